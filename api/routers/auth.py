@@ -5,17 +5,22 @@ Este módulo define los endpoints de la API relacionados con la autenticación,
 
 - Inicio de sesión (`/login`) que verifica email y contraseña, y retorna un token JWT.
 - Registro de usuarios (`/register`) que crea un nuevo usuario y retorna un token JWT.
+- Renovación (`/refresh`) que canjea un token de refresco por un nuevo par de
+  tokens sin verificar la contraseña.
+- Revocación (`/revoke`) de un token de refresco, p. ej. al cerrar sesión.
 
-Cada endpoint devuelve un token de acceso, tipo de token y tiempo de expiración en segundos.
+Cada endpoint devuelve un token de acceso, tipo de token, tiempo de expiración en segundos
+y un token de refresco. El token de refresco se rota en cada uso.
 """
 
 from fastapi import APIRouter, HTTPException, status
-from werkzeug.security import check_password_hash, generate_password_hash
 
 from core.dependencies import get_user_email
-from core.token import create_access_token
-from schemas.auth import LoginAuth, RegisterAuth, TokenResponse
-from schemas.user import UserInsert
+from core.hashing import password_hasher
+from core.token import create_access_token, user_claims
+from schemas.auth import LoginAuth, RefreshRequest, RegisterAuth, TokenResponse
+from schemas.user import UserClaims, UserInsert
+from services.token_service import token_service
 from services.user_service import user_service
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
@@ -35,6 +40,7 @@ async def login(login_data: LoginAuth):
     Raises:
         HTTPException: Si el email no existe (404).
         HTTPException: Si la contraseña es incorrecta (401).
+        HTTPException: Si el ejecutor de hash está saturado (503).
     """
     # 1. Buscar usuario por email
     user = await get_user_email(login_data.email)
@@ -44,19 +50,23 @@ async def login(login_data: LoginAuth):
         )
 
     # 2. Verificar contraseña
-    if not check_password_hash(user.password, login_data.password):
+    if not await password_hasher.verify(user.password, login_data.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid password."
         )
 
-    # 3. Crear token de acceso
-    access_token, access_token_expires = create_access_token(user.email)
+    # 3. Crear tokens de acceso y de refresco
+    access_token, access_token_expires = create_access_token(
+        user.email, user_claims(user)
+    )
+    refresh_token = await token_service.issue_refresh_token(user.id)
 
     # 4. Devolver respuesta
     return {
         "access_token": access_token,
         "token_type": "Bearer",
         "expire": int(access_token_expires.total_seconds()),
+        "refresh_token": refresh_token,
     }
 
 
@@ -77,6 +87,7 @@ async def register(register_data: RegisterAuth):
     Raises:
         HTTPException: Si el email ya está registrado (400).
         HTTPException: Si ocurre un error al registrar el usuario en la base de datos (500).
+        HTTPException: Si el ejecutor de hash está saturado (503).
     """
     # Verificar si el usuario ya existe
     existing_user = await get_user_email(register_data.email)
@@ -86,7 +97,7 @@ async def register(register_data: RegisterAuth):
         )
 
     # Hashear contraseña
-    hashed_password = generate_password_hash(register_data.password)
+    hashed_password = await password_hasher.hash(register_data.password)
 
     # Crear modelo de inserción
     user_insert = UserInsert(
@@ -104,12 +115,79 @@ async def register(register_data: RegisterAuth):
             detail="Error registering user.",
         )
 
-    # Crear token de acceso
-    access_token, access_token_expires = create_access_token(register_data.email)
+    # Crear tokens de acceso y de refresco
+    user = UserClaims(
+        id=new_id,
+        first_name=register_data.first_name,
+        last_name=register_data.last_name,
+        email=register_data.email,
+    )
+    access_token, access_token_expires = create_access_token(
+        user.email, user_claims(user)
+    )
+    refresh_token = await token_service.issue_refresh_token(new_id)
 
     # Respuesta final
     return {
         "access_token": access_token,
         "token_type": "Bearer",
         "expire": int(access_token_expires.total_seconds()),
+        "refresh_token": refresh_token,
+    }
+
+
+@router.post("/refresh", response_model=TokenResponse, status_code=status.HTTP_200_OK)
+async def refresh(refresh_data: RefreshRequest):
+    """
+    Canjea un token de refresco por un nuevo token de acceso.
+
+    No verifica la contraseña: una única sentencia revoca el token recibido,
+    emite uno nuevo y retorna el usuario. Reutilizar un token ya canjeado
+    revoca todos los tokens de refresco del usuario.
+
+    Args:
+        refresh_data (RefreshRequest): Token de refresco vigente.
+
+    Returns:
+        dict: Contiene el access_token, tipo de token, tiempo de expiración en
+        segundos y el nuevo refresh_token.
+
+    Raises:
+        HTTPException: Si el token no existe, está revocado o ha expirado (401).
+    """
+    rotated = await token_service.rotate_refresh_token(refresh_data.refresh_token)
+    if rotated is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token.",
+        )
+    user, refresh_token = rotated
+
+    access_token, access_token_expires = create_access_token(
+        user.email, user_claims(user)
+    )
+
+    return {
+        "access_token": access_token,
+        "token_type": "Bearer",
+        "expire": int(access_token_expires.total_seconds()),
+        "refresh_token": refresh_token,
     }
+
+
+@router.post("/revoke", status_code=status.HTTP_204_NO_CONTENT)
+async def revoke(refresh_data: RefreshRequest):
+    """
+    Revoca un token de refresco.
+
+    La operación es idempotente: revocar un token inexistente o ya revocado
+    también responde 204.
+
+    Args:
+        refresh_data (RefreshRequest): Token de refresco a revocar.
+
+    Returns:
+        int: Código de estado HTTP 204.
+    """
+    await token_service.revoke_refresh_token(refresh_data.refresh_token)
+    return status.HTTP_204_NO_CONTENT
@@ -0,0 +1,284 @@
+"""
+Módulo de rutas internas de observabilidad.
+
+Expone el estado de los componentes de rendimiento de la aplicación:
+- Pool de conexiones a PostgreSQL (tamaño, libres, en uso, en espera).
+- Caché de usuarios autenticados.
+- Caché de tokens verificados.
+- Caché de versiones de token.
+- Caché de consultas de productos.
+- Agrupación de consultas concurrentes (single-flight) de usuarios y productos.
+- Búsquedas de usuarios y versiones de token resueltas en lote.
+- Ejecutor de hash de contraseñas.
+- Registro de consultas lentas.
+
+Además, `metrics_router` publica `GET /metrics` en formato de texto de
+Prometheus: latencias por ruta y por etapa (ver `core.metrics`) y el estado
+de los mismos componentes.
+
+Solo se registran si `settings.metrics_enabled` está activo (no lo está por
+defecto) y no se publican en el esquema OpenAPI. Si `settings.metrics_token`
+está definido, exigen además ese token como `Authorization: Bearer`.
+"""
+
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
+
+from core.config import settings
+from core.dependencies import token_version_cache, user_cache
+from core.hashing import password_hasher
+from core.metrics import format_histogram, format_sample, request_metrics
+from core.token import token_cache
+from db.connnection import db_management
+from db.slow_queries import slow_query_log
+from services.product_cache import (product_cache, product_cache_listener,
+                                    product_flight)
+from services.user_service import (token_versions_by_id, user_flight,
+                                   users_by_email)
+
+
+def require_metrics_token(authorization: Optional[str] = Header(None)) -> None:
+    """
+    Comprueba el token de los endpoints internos, si hay uno configurado.
+
+    Args:
+        authorization (Optional[str]): Cabecera `Authorization` de la petición.
+
+    Raises:
+        HTTPException: 401 si falta el token o no coincide.
+    """
+    if settings.metrics_token is None:
+        return
+    expected = f"Bearer {settings.metrics_token}"
+    if authorization is None or not secrets.compare_digest(
+        authorization.encode(), expected.encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+router = APIRouter(
+    prefix="/internal",
+    tags=["Internal"],
+    include_in_schema=False,
+    dependencies=[Depends(require_metrics_token)],
+)
+metrics_router = APIRouter(
+    tags=["Internal"],
+    include_in_schema=False,
+    dependencies=[Depends(require_metrics_token)],
+)
+
+# Content-Type del formato de texto de Prometheus
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def product_cache_stats() -> dict:
+    """
+    Retorna el estado de la caché de consultas de productos.
+
+    Returns:
+        dict: Si está activa, sus contadores y si la escucha de
+        invalidaciones está conectada.
+    """
+    if product_cache is None:
+        return {"enabled": False}
+    stats = {"enabled": True, **product_cache.stats()}
+    if product_cache_listener is not None:
+        stats["listener_connected"] = product_cache_listener.connected
+    return stats
+
+
+@router.get("/stats", status_code=status.HTTP_200_OK)
+async def stats():
+    """
+    Retorna las estadísticas de los componentes internos.
+
+    Returns:
+        dict: Estadísticas del pool de conexiones, las cachés de usuarios, de
+        tokens, de versiones de token y de consultas de productos, el ejecutor de hash de contraseñas y el registro de
+        consultas lentas, la agrupación de consultas concurrentes y las
+        búsquedas en lote de usuarios y de versiones de token.
+    """
+    return {
+        "db_pool": db_management.stats(),
+        "user_cache": user_cache.stats(),
+        "token_cache": token_cache.stats(),
+        "token_version_cache": token_version_cache.stats(),
+        "product_cache": product_cache_stats(),
+        "password_hasher": password_hasher.stats(),
+        "slow_queries": slow_query_log.stats(),
+        "singleflight": {
+            flight.name: flight.stats() for flight in (user_flight, product_flight)
+        },
+        "batch_loaders": {
+            loader.name: loader.stats()
+            for loader in (users_by_email, token_versions_by_id)
+        },
+    }
+
+
+@metrics_router.get(
+    "/metrics", response_class=PlainTextResponse, status_code=status.HTTP_200_OK
+)
+async def metrics():
+    """
+    Retorna las métricas de la aplicación en formato de texto de Prometheus.
+
+    Returns:
+        PlainTextResponse: Latencias por ruta y etapa, estado del pool de
+        conexiones, de las cachés de usuarios y tokens y del ejecutor de hash.
+    """
+    pool = db_management.stats()
+    cache = user_cache.stats()
+    tokens = token_cache.stats()
+    versions = token_version_cache.stats()
+    products = product_cache_stats()
+    hasher = password_hasher.stats()
+
+    lines = request_metrics.render()
+    lines += format_sample(
+        "db_pool_connections",
+        "gauge",
+        "Connections in the PostgreSQL pool by state.",
+        [
+            ({"state": "idle"}, pool["idle"]),
+            ({"state": "in_use"}, pool["in_use"]),
+            ({"state": "total"}, pool["size"]),
+        ],
+    )
+    lines += format_sample(
+        "db_pool_waiters",
+        "gauge",
+        "Requests waiting for a connection.",
+        [({}, pool["waiters"])],
+    )
+    lines += format_sample(
+        "db_pool_acquire_timeouts_total",
+        "counter",
+        "Connection acquisitions that timed out.",
+        [({}, pool["acquire_timeouts"])],
+    )
+    lines += format_histogram(
+        "db_pool_acquire_wait_seconds",
+        "Time waiting for a pool connection.",
+        [({}, db_management.acquire_wait)],
+    )
+    lines += format_sample(
+        "user_cache_lookups_total",
+        "counter",
+        "Authenticated user cache lookups.",
+        [({"result": "hit"}, cache["hits"]), ({"result": "miss"}, cache["misses"])],
+    )
+    lines += format_sample(
+        "user_cache_entries",
+        "gauge",
+        "Users in the authentication cache.",
+        [({}, cache["size"])],
+    )
+    lines += format_sample(
+        "token_cache_lookups_total",
+        "counter",
+        "Verified token cache lookups.",
+        [({"result": "hit"}, tokens["hits"]), ({"result": "miss"}, tokens["misses"])],
+    )
+    lines += format_sample(
+        "token_cache_entries",
+        "gauge",
+        "Tokens in the verified token cache.",
+        [({}, tokens["size"])],
+    )
+    lines += format_sample(
+        "token_version_cache_lookups_total",
+        "counter",
+        "Token version cache lookups.",
+        [
+            ({"result": "hit"}, versions["hits"]),
+            ({"result": "miss"}, versions["misses"]),
+        ],
+    )
+    lines += format_sample(
+        "token_version_cache_entries",
+        "gauge",
+        "Users in the token version cache.",
+        [({}, versions["size"])],
+    )
+    if products["enabled"]:
+        lines += format_sample(
+            "product_cache_lookups_total",
+            "counter",
+            "Product query result cache lookups.",
+            [
+                ({"result": "hit"}, products["hits"]),
+                ({"result": "miss"}, products["misses"]),
+            ],
+        )
+        lines += format_sample(
+            "product_cache_invalidations_total",
+            "counter",
+            "Per-user product cache invalidations.",
+            [({}, products["invalidations"])],
+        )
+    lines += format_sample(
+        "password_hash_queue_depth",
+        "gauge",
+        "Password hash operations waiting.",
+        [({}, hasher["queue_depth"])],
+    )
+    lines += format_sample(
+        "password_hash_rejected_total",
+        "counter",
+        "Password hash operations rejected with 503.",
+        [({}, hasher["rejected"])],
+    )
+    lines += format_histogram(
+        "password_hash_duration_seconds",
+        "Password hash operation latency.",
+        [({}, password_hasher.latency)],
+    )
+    lines += format_sample(
+        "db_slow_queries_total",
+        "counter",
+        "Statements slower than the threshold.",
+        [({}, slow_query_log.slow_queries)],
+    )
+    lines += format_sample(
+        "singleflight_calls_total",
+        "counter",
+        "Lookups by outcome: executed or coalesced into an in-flight one.",
+        [
+            (labels, value)
+            for flight in (user_flight, product_flight)
+            for labels, value in (
+                ({"name": flight.name, "result": "executed"}, flight.calls),
+                ({"name": flight.name, "result": "coalesced"}, flight.coalesced),
+            )
+        ],
+    )
+    lines += format_sample(
+        "batch_loader_batches_total",
+        "counter",
+        "Batched lookup queries executed.",
+        [
+            ({"name": loader.name}, loader.batches)
+            for loader in (users_by_email, token_versions_by_id)
+        ],
+    )
+    lines += format_sample(
+        "batch_loader_keys_total",
+        "counter",
+        "Keys requested from batched lookups.",
+        [
+            ({"name": loader.name}, loader.keys)
+            for loader in (users_by_email, token_versions_by_id)
+        ],
+    )
+    return PlainTextResponse(
+        "\n".join(lines) + "\n", media_type=PROMETHEUS_CONTENT_TYPE
+    )
@@ -2,117 +2,498 @@
 Módulo de rutas para la gestión de productos.
 
 Este módulo define los endpoints de la API relacionados con productos, incluyendo:
-- Listado de productos del usuario.
+- Listado de productos del usuario, paginado por cursor.
+- Exportación completa del inventario en streaming (NDJSON o CSV).
 - Consulta de un producto por ID.
+- Consulta de varios productos por ID en una sola petición.
 - Búsqueda de productos con filtros.
+- Búsqueda de productos por nombre (prefijo, similitud o por relevancia).
 - Creación de nuevos productos.
+- Carga masiva (creación o actualización) de productos.
 - Actualización de productos existentes.
 - Eliminación de productos.
 
-Cada endpoint requiere autenticación mediante `get_current_user`.
+Cada endpoint requiere autenticación mediante `get_current_user` y usa una
+única conexión por petición (`get_db_connection`) para sus consultas. La
+autenticación se resuelve antes y no retiene ninguna.
+
+Los listados aceptan `limit` y `cursor`; cuando hay más resultados, el cursor
+de la siguiente página se devuelve en la cabecera `X-Next-Cursor`. Sus
+respuestas se serializan directamente a bytes JSON con `product_list_adapter`:
+`response_model` solo documenta el esquema y FastAPI no vuelve a validar cada
+producto.
+
+El listado (`GET /`) y el detalle (`GET /{product_id}`) devuelven un ETag y
+responden `304 Not Modified` si coincide con `If-None-Match` (ver
+`core.etag`). El del listado se calcula con `get_products_version` antes de
+leer las filas; el del detalle, a partir de la propia fila. La lectura por
+lotes (`GET /batch`) también lo devuelve, calculado a partir de sus filas.
 """
 
-from typing import List
-
-from fastapi import APIRouter, Depends, HTTPException, status
-
-from core.dependencies import get_current_user
-from schemas.product import (BaseProduct, ProductDelete, ProductFilter,
-                             ProductFilterBase, ProductInsert, ProductOut,
-                             ProductUpdate)
-from schemas.user import UserOut
+import csv
+import io
+from typing import AsyncIterator, Dict, List, Optional
+
+import asyncpg
+from fastapi import (APIRouter, Depends, Header, HTTPException, Query,
+                     Response, status)
+from fastapi.responses import StreamingResponse
+
+from core.config import settings
+from core.dependencies import get_current_user, get_db_connection
+from core.etag import etag_matches, make_etag, not_modified, set_etag
+from core.metrics import timed
+from core.pagination import (NEXT_CURSOR_HEADER, PRODUCT_ID_MAX,
+                             PRODUCT_ID_MIN, decode_cursor, paginate)
+from schemas.product import (BaseProduct, BulkProductOut, ExportFormat,
+                             ProductBatchOut, ProductDelete, ProductFilter,
+                             ProductFilterBase, ProductInsert,
+                             ProductMutationStatus, ProductOut, ProductUpdate,
+                             SearchMode, product_list_adapter)
+from schemas.user import UserClaims
 from services.product_service import product_service
 
 router = APIRouter(prefix="/products", tags=["Products"])
 
+# Columnas del CSV exportado, en el orden de ProductOut
+EXPORT_FIELDS = list(ProductOut.model_fields)
+# Columnas de texto libre del usuario, que pueden contener fórmulas
+EXPORT_TEXT_FIELDS = frozenset(
+    name for name, field in ProductOut.model_fields.items() if field.annotation is str
+)
+# Caracteres con los que una hoja de cálculo interpreta una celda como fórmula
+CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def page_limit(
+    limit: int = Query(
+        settings.products_page_size,
+        ge=1,
+        le=settings.products_max_page_size,
+        description="Maximum number of products per page",
+    ),
+) -> int:
+    """Valida y retorna el tamaño de página solicitado."""
+    return limit
+
+
+def batch_ids(
+    ids: List[str] = Query(
+        ...,
+        description="Product IDs, comma-separated and/or repeated (ids=1,2&ids=3)",
+    ),
+) -> List[int]:
+    """
+    Valida y retorna los IDs pedidos a la lectura por lotes.
+
+    Args:
+        ids (List[str]): Valores del parámetro `ids`.
+
+    Returns:
+        List[int]: IDs sin repetidos, en el orden de la petición.
+
+    Raises:
+        HTTPException: Si algún ID no es un entero de 32 bits, si no hay
+        ninguno o si hay más de `settings.products_batch_max_ids` (400).
+    """
+    product_ids: Dict[int, None] = {}
+    for value in ids:
+        for part in value.split(","):
+            part = part.strip()
+            if not part:
+                continue
+            try:
+                product_id = int(part)
+            except ValueError as exc:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Invalid product id: {part!r}.",
+                ) from exc
+            if not PRODUCT_ID_MIN <= product_id <= PRODUCT_ID_MAX:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Invalid product id: {part!r}.",
+                )
+            product_ids[product_id] = None
+            if len(product_ids) > settings.products_batch_max_ids:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=(
+                        f"At most {settings.products_batch_max_ids} "
+                        "product ids are allowed."
+                    ),
+                )
+    if not product_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At least one product id is required.",
+        )
+    return list(product_ids)
+
+
+def products_response(
+    products: List[ProductOut], next_cursor: Optional[str]
+) -> Response:
+    """
+    Serializa una página de productos a JSON sin pasar por `response_model`.
+
+    Args:
+        products (List[ProductOut]): Productos de la página.
+        next_cursor (Optional[str]): Cursor de la siguiente página, si la hay.
+
+    Returns:
+        Response: Respuesta JSON con la cabecera `X-Next-Cursor` si corresponde.
+    """
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    with timed("serialization"):
+        content = product_list_adapter.dump_json(products)
+    return Response(
+        content=content,
+        media_type="application/json",
+        headers=headers,
+    )
+
+
+async def ndjson_chunks(
+    products: AsyncIterator[ProductOut], chunk_size: int
+) -> AsyncIterator[str]:
+    """Agrupa los productos en bloques de líneas JSON (NDJSON)."""
+    lines: List[str] = []
+    async for product in products:
+        lines.append(product.model_dump_json())
+        if len(lines) >= chunk_size:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def csv_cell(value: str) -> str:
+    """
+    Neutraliza un texto que una hoja de cálculo ejecutaría como fórmula.
+
+    Args:
+        value (str): Texto de la celda.
+
+    Returns:
+        str: El texto, precedido de `'` si empieza por `=`, `+`, `-`, `@`,
+        tabulador o retorno de carro.
+    """
+    if value.startswith(CSV_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+async def csv_chunks(
+    products: AsyncIterator[ProductOut], chunk_size: int
+) -> AsyncIterator[str]:
+    """
+    Agrupa los productos en bloques CSV, empezando por la cabecera.
+
+    Las columnas de texto pasan por `csv_cell` para que abrir el archivo en
+    una hoja de cálculo no ejecute fórmulas escritas en los nombres.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+
+    rows = 0
+    async for product in products:
+        if rows % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        data = product.model_dump(mode="json")
+        for field in EXPORT_TEXT_FIELDS:
+            data[field] = csv_cell(data[field])
+        writer.writerow(data[field] for field in EXPORT_FIELDS)
+        rows += 1
+    yield buffer.getvalue()
+
 
 @router.get("/", response_model=List[ProductOut], status_code=status.HTTP_200_OK)
-async def get_products(current_user: UserOut = Depends(get_current_user)):
+async def get_products(
+    limit: int = Depends(page_limit),
+    cursor: Optional[str] = Query(None, description="Cursor of the next page"),
+    if_none_match: Optional[str] = Header(None),
+    current_user: UserClaims = Depends(get_current_user),
+    conn: asyncpg.Connection = Depends(get_db_connection),
+):
+    """
+    Retorna una página de productos del usuario actual.
+
+    El ETag depende de la versión de los productos del usuario y de la página
+    pedida; si el cliente ya la tiene, se responde 304 sin leer las filas.
+
+    Args:
+        limit (int): Tamaño de página.
+        cursor (Optional[str]): Cursor recibido en la página anterior.
+        if_none_match (Optional[str]): ETag de la copia que tiene el cliente.
+        current_user (UserClaims): Usuario autenticado.
+        conn (asyncpg.Connection): Conexión de la petición.
+
+    Returns:
+        Response: Lista de productos del usuario, con la cabecera
+        `X-Next-Cursor` si hay más páginas, o 304 si no ha cambiado.
+
+    Raises:
+        HTTPException: Si el cursor no es válido (400).
+    """
+    after_id = decode_cursor(cursor)
+    version = await product_service.get_products_version(current_user.id, conn)
+    etag = make_etag(current_user.id, version.version, limit, after_id)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    products = await product_service.get_products(
+        ProductFilter(user_id=current_user.id, limit=limit + 1, after_id=after_id),
+        conn,
+        version.version,
+    )
+    products, next_cursor = paginate(products, limit)
+    response = products_response(products, next_cursor)
+    set_etag(response, etag)
+    return response
+
+
+@router.get("/export", status_code=status.HTTP_200_OK)
+async def export_products(
+    export_format: ExportFormat = Query(
+        ExportFormat.NDJSON, alias="format", description="Export format"
+    ),
+    current_user: UserClaims = Depends(get_current_user),
+    conn: asyncpg.Connection = Depends(get_db_connection),
+):
+    """
+    Exporta todos los productos del usuario actual en streaming.
+
+    Las filas se leen con un cursor del servidor y se envían por bloques, por
+    lo que la memoria usada no depende del tamaño del inventario.
+
+    Args:
+        export_format (ExportFormat): Formato de salida (`ndjson` o `csv`).
+        current_user (UserClaims): Usuario autenticado.
+        conn (asyncpg.Connection): Conexión de la petición; se mantiene hasta
+            terminar el streaming.
+
+    Returns:
+        StreamingResponse: Inventario completo en el formato solicitado.
+    """
+    chunk_size = settings.export_chunk_size
+    products = product_service.iter_products(
+        ProductFilter(user_id=current_user.id), prefetch=chunk_size, conn=conn
+    )
+    if export_format is ExportFormat.CSV:
+        content = csv_chunks(products, chunk_size)
+        media_type = "text/csv"
+    else:
+        content = ndjson_chunks(products, chunk_size)
+        media_type = "application/x-ndjson"
+
+    return StreamingResponse(
+        content,
+        media_type=media_type,
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="products.{export_format.value}"'
+            )
+        },
+    )
+
+
+@router.get("/batch", response_model=ProductBatchOut, status_code=status.HTTP_200_OK)
+async def get_products_batch(
+    product_ids: List[int] = Depends(batch_ids),
+    if_none_match: Optional[str] = Header(None),
+    current_user: UserClaims = Depends(get_current_user),
+    conn: asyncpg.Connection = Depends(get_db_connection),
+):
+    """
+    Retorna varios productos del usuario actual por su ID en una sola consulta.
+
+    El ETag se calcula con los IDs pedidos y el ID y la última modificación
+    de cada producto encontrado.
+
+    Args:
+        product_ids (List[int]): IDs a consultar.
+        if_none_match (Optional[str]): ETag de la copia que tiene el cliente.
+        current_user (UserClaims): Usuario autenticado.
+        conn (asyncpg.Connection): Conexión de la petición.
+
+    Returns:
+        Response: Productos encontrados e IDs no encontrados, o 304 si no ha
+        cambiado nada.
     """
-    Retorna todos los productos del usuario actual.
+    products = await product_service.get_products_by_ids(
+        product_ids, current_user.id, conn
+    )
+    found = {product.id for product in products}
+    missing = [product_id for product_id in product_ids if product_id not in found]
+
+    etag = make_etag(
+        current_user.id,
+        product_ids,
+        [(p.id, p.updated_at or p.created_at) for p in products],
+    )
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    with timed("serialization"):
+        content = ProductBatchOut(items=products, missing=missing).model_dump_json()
+    response = Response(content=content, media_type="application/json")
+    set_etag(response, etag)
+    return response
+
+
+@router.get("/search", response_model=List[ProductOut], status_code=status.HTTP_200_OK)
+async def search_products(
+    q: str = Query(..., min_length=1, max_length=100, description="Text to search"),
+    mode: SearchMode = Query(SearchMode.RANKED, description="Search mode"),
+    limit: int = Query(
+        settings.products_search_limit,
+        ge=1,
+        le=settings.products_max_page_size,
+        description="Maximum number of results",
+    ),
+    current_user: UserClaims = Depends(get_current_user),
+    conn: asyncpg.Connection = Depends(get_db_connection),
+):
+    """
+    Busca productos del usuario actual por nombre.
+
+    Sin distinguir mayúsculas:
+    - `prefix`: nombres que empiezan por `q`, en orden alfabético.
+    - `fuzzy`: nombres con alguna palabra parecida a `q` (tolera errores de
+      escritura), de más a menos parecidos.
+    - `ranked`: nombres que contienen `q` o se le parecen; primero la
+      coincidencia exacta, después los prefijos y por último por similitud.
 
     Args:
-        current_user (UserOut): Usuario autenticado.
+        q (str): Texto a buscar.
+        mode (SearchMode): Modo de búsqueda.
+        limit (int): Máximo de resultados.
+        current_user (UserClaims): Usuario autenticado.
+        conn (asyncpg.Connection): Conexión de la petición.
 
     Returns:
-        List[ProductOut]: Lista de productos del usuario.
+        Response: Productos encontrados, en el orden del modo de búsqueda.
+
+    Raises:
+        HTTPException: Si `q` está vacío o solo tiene espacios (400).
     """
-    return await product_service.get_products(ProductFilter(user_id=current_user.id))
+    query = q.strip()
+    if not query:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Search query is required.",
+        )
+    products = await product_service.search_products(
+        current_user.id, query, mode, limit, conn
+    )
+    return products_response(products, None)
 
 
 @router.get("/{product_id}", response_model=ProductOut, status_code=status.HTTP_200_OK)
 async def get_product_by_id(
-    product_id: int, current_user: UserOut = Depends(get_current_user)
+    product_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    current_user: UserClaims = Depends(get_current_user),
+    conn: asyncpg.Connection = Depends(get_db_connection),
 ):
     """
     Retorna un producto por su ID del usuario actual.
 
+    El ETag se calcula con el ID y la última modificación del producto; si el
+    cliente ya lo tiene, se responde 304 sin serializarlo.
+
     Args:
         product_id (int): ID del producto a consultar.
-        current_user (UserOut): Usuario autenticado.
+        response (Response): Respuesta a la que se añade el ETag.
+        if_none_match (Optional[str]): ETag de la copia que tiene el cliente.
+        current_user (UserClaims): Usuario autenticado.
+        conn (asyncpg.Connection): Conexión de la petición.
 
     Returns:
-        ProductOut: Producto correspondiente al ID.
+        ProductOut: Producto correspondiente al ID, o 304 si no ha cambiado.
 
     Raises:
         HTTPException: Si el producto no se encuentra (404).
     """
     products = await product_service.get_products(
-        ProductFilter(id=product_id, user_id=current_user.id)
+        ProductFilter(id=product_id, user_id=current_user.id), conn
     )
     if not products:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Product not found"
         )
-    return products[0]
+    product = products[0]
+
+    etag = make_etag(product.id, product.updated_at or product.created_at)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    return product
 
 
 @router.post("/filter", response_model=List[ProductOut], status_code=status.HTTP_200_OK)
 async def get_search_products(
     product_filters: ProductFilterBase,
-    current_user: UserOut = Depends(get_current_user),
+    limit: int = Depends(page_limit),
+    cursor: Optional[str] = Query(None, description="Cursor of the next page"),
+    current_user: UserClaims = Depends(get_current_user),
+    conn: asyncpg.Connection = Depends(get_db_connection),
 ):
     """
-    Retorna productos filtrados según los criterios enviados.
+    Retorna una página de productos filtrados según los criterios enviados.
 
     Args:
         product_filters (ProductFilterBase): Filtros de búsqueda.
-        current_user (UserOut): Usuario autenticado.
+        limit (int): Tamaño de página.
+        cursor (Optional[str]): Cursor recibido en la página anterior.
+        current_user (UserClaims): Usuario autenticado.
+        conn (asyncpg.Connection): Conexión de la petición.
 
     Returns:
-        List[ProductOut]: Lista de productos que cumplen los filtros.
+        Response: Lista de productos que cumplen los filtros, con la cabecera
+        `X-Next-Cursor` si hay más páginas.
+
+    Raises:
+        HTTPException: Si el cursor no es válido (400).
     """
-    return await product_service.get_search_products(
-        ProductFilter(**product_filters.model_dump(), user_id=current_user.id)
+    products = await product_service.get_search_products(
+        ProductFilter(
+            **product_filters.model_dump(),
+            user_id=current_user.id,
+            limit=limit + 1,
+            after_id=decode_cursor(cursor),
+        ),
+        conn,
     )
+    products, next_cursor = paginate(products, limit)
+    return products_response(products, next_cursor)
 
 
 @router.post("/", response_model=ProductOut, status_code=status.HTTP_201_CREATED)
 async def create_product(
-    product_data: BaseProduct, current_user: UserOut = Depends(get_current_user)
+    product_data: BaseProduct,
+    current_user: UserClaims = Depends(get_current_user),
+    conn: asyncpg.Connection = Depends(get_db_connection),
 ):
     """
     Crea un nuevo producto para el usuario actual.
 
     Args:
         product_data (BaseProduct): Datos del producto a crear.
-        current_user (UserOut): Usuario autenticado.
+        current_user (UserClaims): Usuario autenticado.
+        conn (asyncpg.Connection): Conexión de la petición.
 
     Returns:
         ProductOut: Producto recién creado.
 
     Raises:
-        HTTPException: Si el producto ya existe (409) o falla el registro (500).
-        HTTPException: Si el producto creado no se encuentra (404).
+        HTTPException: Si el producto ya existe (409).
     """
-    product_exists = await product_service.get_products(
-        ProductFilter(user_id=current_user.id, name=product_data.name)
-    )
-    if product_exists:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT, detail="Product already exists!!"
-        )
-
     product_add = ProductInsert(
         name=product_data.name,
         stock=product_data.stock,
@@ -120,26 +501,66 @@ async def create_product(
         user_id=current_user.id,
     )
 
-    new_id = await product_service.insert_product(product_add)
-    if not new_id:
+    # Inserción y detección de duplicados en una sola sentencia
+    product = await product_service.create_product(product_add, conn)
+    if product is None:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Error registering product.",
+            status_code=status.HTTP_409_CONFLICT, detail="Product already exists!!"
         )
+    return product
 
-    products = await product_service.get_products(ProductFilter(id=new_id))
-    if not products:
+
+@router.post("/bulk", response_model=BulkProductOut, status_code=status.HTTP_200_OK)
+async def bulk_upsert_products(
+    products_data: List[BaseProduct],
+    current_user: UserClaims = Depends(get_current_user),
+    conn: asyncpg.Connection = Depends(get_db_connection),
+):
+    """
+    Crea o actualiza en bloque productos del usuario actual.
+
+    Los productos se identifican por nombre: si ya existe uno con el mismo
+    nombre se actualizan su stock y precio; si no, se crea.
+
+    Args:
+        products_data (List[BaseProduct]): Productos a crear o actualizar.
+        current_user (UserClaims): Usuario autenticado.
+        conn (asyncpg.Connection): Conexión de la petición.
+
+    Returns:
+        BulkProductOut: Totales y resultado de cada elemento
+        (created, updated o conflict).
+
+    Raises:
+        HTTPException: Si se envían más productos de los permitidos (400).
+    """
+    if len(products_data) > settings.bulk_max_items:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Product not found"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.bulk_max_items} products per request.",
         )
-    return products[0]
+
+    results = await product_service.bulk_upsert_products(
+        current_user.id, products_data, conn
+    )
+    totals = {mutation: 0 for mutation in ProductMutationStatus}
+    for result in results:
+        totals[result.status] += 1
+
+    return BulkProductOut(
+        created=totals[ProductMutationStatus.CREATED],
+        updated=totals[ProductMutationStatus.UPDATED],
+        conflicts=totals[ProductMutationStatus.CONFLICT],
+        results=results,
+    )
 
 
 @router.put("/{product_id}", status_code=status.HTTP_200_OK)
 async def update_product(
     product_id: int,
     product_data: BaseProduct,
-    current_user: UserOut = Depends(get_current_user),
+    current_user: UserClaims = Depends(get_current_user),
+    conn: asyncpg.Connection = Depends(get_db_connection),
 ):
     """
     Actualiza un producto existente del usuario actual.
@@ -147,7 +568,8 @@ async def update_product(
     Args:
         product_id (int): ID del producto a actualizar.
         product_data (BaseProduct): Nuevos datos del producto.
-        current_user (UserOut): Usuario autenticado.
+        current_user (UserClaims): Usuario autenticado.
+        conn (asyncpg.Connection): Conexión de la petición.
 
     Returns:
         dict: Mensaje de éxito de la actualización.
@@ -155,36 +577,20 @@ async def update_product(
     Raises:
         HTTPException: Si el producto no existe (404).
         HTTPException: Si el nombre del producto ya está registrado (400).
-        HTTPException: Si falla la actualización en base de datos (500).
     """
-    products = await product_service.get_products(
-        ProductFilter(user_id=current_user.id, id=product_id)
-    )
-    if not products:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Product not found"
-        )
-
-    if product_data.name != products[0].name:
-        products = await product_service.get_products(
-            ProductFilter(user_id=current_user.id, name=product_data.name)
-        )
-        product = products[0] if products else None
-        if product:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Product name already registered.",
-            )
-
     product_update = ProductUpdate(
         **product_data.model_dump(), id=product_id, user_id=current_user.id
     )
 
-    updated = await product_service.update_product(product_update)
-    if not updated:
+    result = await product_service.update_product(product_update, conn)
+    if result is ProductMutationStatus.NOT_FOUND:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Product not found"
+        )
+    if result is ProductMutationStatus.CONFLICT:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Error updating product.",
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Product name already registered.",
         )
 
     return {"message": "Product Update"}
@@ -192,39 +598,30 @@ async def update_product(
 
 @router.delete("/{product_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_product(
-    product_id: int, current_user: UserOut = Depends(get_current_user)
+    product_id: int,
+    current_user: UserClaims = Depends(get_current_user),
+    conn: asyncpg.Connection = Depends(get_db_connection),
 ):
     """
     Elimina un producto del usuario actual.
 
     Args:
         product_id (int): ID del producto a eliminar.
-        current_user (UserOut): Usuario autenticado.
+        current_user (UserClaims): Usuario autenticado.
+        conn (asyncpg.Connection): Conexión de la petición.
 
     Returns:
         int: Código de estado HTTP 204 si se elimina correctamente.
 
     Raises:
         HTTPException: Si el producto no existe (404).
-        HTTPException: Si falla la eliminación (500).
     """
-    products = await product_service.get_products(
-        ProductFilter(id=product_id, user_id=current_user.id)
+    result = await product_service.delete_product(
+        ProductDelete(id=product_id, user_id=current_user.id), conn
     )
-
-    if products:
-        deleted = await product_service.delete_product(
-            ProductDelete(id=products[0].id, user_id=current_user.id)
-        )
-
-        if deleted:
-            return status.HTTP_204_NO_CONTENT
-
+    if result is ProductMutationStatus.NOT_FOUND:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Error deleting product.",
+            status_code=status.HTTP_404_NOT_FOUND, detail="Product not found"
         )
 
-    raise HTTPException(
-        status_code=status.HTTP_404_NOT_FOUND, detail="Product not found"
-    )
+    return status.HTTP_204_NO_CONTENT
@@ -5,17 +5,27 @@ Este módulo define los endpoints de la API relacionados con el perfil del usuar
 - Consulta de la información del perfil del usuario actual.
 - Actualización de los datos del perfil, incluyendo nombre, apellido, email y contraseña.
 
-Cada endpoint requiere autenticación mediante `get_current_user`.
+Cada endpoint requiere autenticación mediante `get_current_user` (la actualización,
+mediante `get_current_user_record`, que carga el hash de la contraseña).
 La actualización de contraseña valida la contraseña actual antes de aplicar los cambios.
+Ninguno retiene una conexión durante la autenticación ni durante el hash de la
+contraseña: la actualización toma una del pool solo para las escrituras.
+Cambiar el email o la contraseña incrementa la versión de los tokens del usuario,
+lo que revoca los tokens de acceso emitidos antes.
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from werkzeug.security import check_password_hash, generate_password_hash
 
-from core.dependencies import get_current_user, get_user_email
-from core.token import create_access_token
+from core.dependencies import (get_current_user, get_current_user_record,
+                               get_user_email, invalidate_user,
+                               token_version_cache)
+from core.hashing import password_hasher
+from core.token import create_access_token, user_claims
+from db.connnection import db_management
 from schemas.auth import TokenResponse
-from schemas.user import ProfileUpdate, UserBase, UserOut, UserUpdate
+from schemas.user import (ProfileUpdate, UserBase, UserClaims, UserOut,
+                          UserUpdate)
+from services.token_service import token_service
 from services.user_service import user_service
 
 router = APIRouter(prefix="/profile", tags=["Profile"])
@@ -23,25 +33,35 @@ router = APIRouter(prefix="/profile", tags=["Profile"])
 
 @router.put("/me", response_model=TokenResponse, status_code=status.HTTP_200_OK)
 async def profile_update(
-    user_data: ProfileUpdate, current_user: UserOut = Depends(get_current_user)
+    user_data: ProfileUpdate,
+    current_user: UserOut = Depends(get_current_user_record),
 ):
     """
     Actualiza la información del perfil del usuario actual.
 
     - Valida si se actualiza el email y que no exista ya en la base de datos.
     - Valida la contraseña actual antes de actualizarla.
+    - Invalida el usuario en la caché de autenticación y actualiza la versión
+      de sus tokens, que cambia con el email o la contraseña.
+    - Si cambia la contraseña, revoca los tokens de refresco del usuario y
+      emite uno nuevo.
     - Genera un nuevo token de acceso tras la actualización.
 
+    La conexión para las escrituras se adquiere después de verificar y
+    calcular los hashes de la contraseña, que pueden tardar.
+
     Args:
         user_data (ProfileUpdate): Datos a actualizar.
         current_user (UserOut): Usuario autenticado.
 
     Returns:
-        dict: Contiene el access_token, tipo y tiempo de expiración en segundos.
+        dict: Contiene el access_token, tipo y tiempo de expiración en segundos,
+        y el nuevo refresh_token si cambió la contraseña.
 
     Raises:
         HTTPException: Si el email ya existe, la contraseña es incorrecta
                        o falla la actualización en base de datos.
+        HTTPException: Si el ejecutor de hash está saturado (503).
     """
     # Validar actualización de email
     if user_data.email and (user_data.email != current_user.email):
@@ -54,16 +74,19 @@ async def profile_update(
 
     # Validar actualización de contraseña
     if user_data.password:
-        check_password = check_password_hash(current_user.password, user_data.password)
+        check_password = await password_hasher.verify(
+            current_user.password, user_data.password
+        )
         if not check_password:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Old password is incorrect!!",
             )
-        user_data.new_password = generate_password_hash(user_data.new_password)
+        if user_data.new_password:
+            user_data.new_password = await password_hasher.hash(user_data.new_password)
 
     # Preparar datos para actualización
-    password_updated = user_data.password or current_user.password
+    password_updated = user_data.new_password or current_user.password
     email_updated = user_data.email or current_user.email
     user_update = UserUpdate(
         first_name=user_data.first_name,
@@ -73,31 +96,57 @@ async def profile_update(
         password=password_updated,
     )
 
-    # Actualizar usuario en base de datos
-    updated = await user_service.update_user(user_update)
-    if not updated:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Error updating user.",
-        )
+    async with db_management.get_connection() as conn:
+        # Actualizar usuario en base de datos
+        updated = await user_service.update_user(user_update, conn)
+        if not updated:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Error updating user.",
+            )
+
+        # Invalidar el usuario en caché (email anterior y nuevo)
+        invalidate_user(current_user.email, email_updated)
+
+        # La versión de los tokens la incrementa la base de datos si cambió el
+        # email o la contraseña; se actualiza ya en caché para rechazar los
+        # tokens anteriores en este proceso
+        token_version = await user_service.get_token_version(current_user.id, conn)
+        token_version_cache.set(current_user.id, token_version)
+
+        # Un cambio de contraseña cierra las demás sesiones
+        refresh_token = None
+        if user_data.new_password:
+            await token_service.revoke_user_tokens(current_user.id, conn)
+            refresh_token = await token_service.issue_refresh_token(current_user.id, conn)
 
     # Generar nuevo token
-    access_token, access_token_expires = create_access_token(email_updated)
+    user = UserClaims(
+        id=current_user.id,
+        first_name=user_data.first_name,
+        last_name=user_data.last_name,
+        email=email_updated,
+        token_version=token_version,
+    )
+    access_token, access_token_expires = create_access_token(
+        email_updated, user_claims(user)
+    )
 
     return {
         "access_token": access_token,
         "token_type": "Bearer",
         "expire": int(access_token_expires.total_seconds()),
+        "refresh_token": refresh_token,
     }
 
 
 @router.get("/me", response_model=UserBase, status_code=status.HTTP_200_OK)
-async def profile(current_user: UserOut = Depends(get_current_user)):
+async def profile(current_user: UserClaims = Depends(get_current_user)):
     """
     Obtiene la información del perfil del usuario actual.
 
     Args:
-        current_user (UserOut): Usuario autenticado.
+        current_user (UserClaims): Usuario autenticado.
 
     Returns:
         UserBase: Datos básicos del usuario.
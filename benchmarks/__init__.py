@@ -0,0 +1,25 @@
+"""
+Benchmarks de la API.
+
+Se ejecutan como módulos desde la raíz del proyecto, p. ej.
+`python -m benchmarks.load`. Al importar el paquete se completan con valores
+de prueba las variables de entorno obligatorias de `core.config.Settings`
+que no estén definidas, para poder ejecutarlos sin un `.env`.
+"""
+
+import os
+
+# Variables mínimas para cargar la configuración
+BENCHMARK_ENV = {
+    "SECRET_KEY_JWT": "benchmark-secret-key",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "30",
+    "ACCESS_TOKEN_EXPIRE_MINUTES_REFRESH": "1440",
+    "DATABASE_URL": "postgresql://localhost/benchmark",
+    "ALLOWED_ORIGINS": "*",
+    "ALLOWED_CREDENTIALS": "false",
+    "ALLOWED_METHODS": "*",
+    "ALLOWED_HEADERS": "*",
+}
+
+for key, value in BENCHMARK_ENV.items():
+    os.environ.setdefault(key, value)
@@ -0,0 +1,397 @@
+"""
+Backend en memoria que imita a PostgreSQL para los benchmarks.
+
+Implementa los contratos de las funciones almacenadas del registro de
+sentencias (`db.statements.STATEMENTS`) sobre diccionarios en memoria, con un
+pool de conexiones de tamaño fijo y una latencia opcional por sentencia que
+simula la ida y vuelta de red. Sirve para medir el coste de la aplicación
+(validación, autenticación, serialización, contención del pool) sin una base
+de datos.
+
+La semántica de filtrado sigue la de las funciones almacenadas: igualdad en
+`get_products`, búsqueda parcial sin distinguir mayúsculas por nombre en
+`get_search_products`, y fechas a partir de la indicada. En
+`search_products` la similitud por palabras de pg_trgm se aproxima como la
+fracción de trigramas del texto presentes en el nombre.
+
+Solo resuelve las sentencias del registro. La carga masiva
+(`POST /products/bulk`, SQL ad hoc en una transacción) y la exportación
+(`GET /products/export`, cursor del servidor) no están en el benchmark de
+carga por eso; cualquier SQL que no sea del registro lanza `ValueError`.
+"""
+
+import asyncio
+import re
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from db.statements import STATEMENTS
+
+# Umbral por defecto de `pg_trgm.word_similarity_threshold`
+WORD_SIMILARITY_THRESHOLD = 0.6
+
+
+def _trigrams(text: str) -> Set[str]:
+    """Trigramas de cada palabra, como en pg_trgm ("  w", " wo", ..., "rd ")."""
+    grams: Set[str] = set()
+    for word in re.findall(r"[^\W_]+", text.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _word_similarity(query: str, name: str) -> float:
+    query_grams = _trigrams(query)
+    if not query_grams:
+        return 0.0
+    return len(query_grams & _trigrams(name)) / len(query_grams)
+
+
+class FakeStore:
+    """
+    Tablas `users`, `products` y `refresh_tokens` en memoria.
+
+    Atributos:
+        users (Dict[int, Dict[str, Any]]): Usuarios por ID.
+        products (Dict[int, Dict[str, Any]]): Productos por ID.
+        refresh_tokens (Dict[str, Dict[str, Any]]): Tokens de refresco por hash.
+        product_versions (Dict[int, int]): Contador de cambios de los
+            productos por ID de usuario.
+    """
+
+    def __init__(self) -> None:
+        self.users: Dict[int, Dict[str, Any]] = {}
+        self.products: Dict[int, Dict[str, Any]] = {}
+        self.refresh_tokens: Dict[str, Dict[str, Any]] = {}
+        self.product_versions: Dict[int, int] = {}
+        self._user_seq = 0
+        self._product_seq = 0
+
+    @staticmethod
+    def _now() -> datetime:
+        return datetime.now(timezone.utc)
+
+    def _filter_products(
+        self,
+        name: Optional[str],
+        stock: Optional[int],
+        price: Optional[Decimal],
+        product_id: Optional[int],
+        created_at: Optional[datetime],
+        updated_at: Optional[datetime],
+        user_id: Optional[int],
+        limit: Optional[int],
+        after_id: Optional[int],
+        name_match: Callable[[str, str], bool],
+    ) -> List[Dict[str, Any]]:
+        rows = []
+        for row in sorted(self.products.values(), key=lambda p: p["id"]):
+            if after_id is not None and row["id"] <= after_id:
+                continue
+            if (
+                (name is None or name_match(row["name"], name))
+                and (stock is None or row["stock"] == stock)
+                and (price is None or row["price"] == price)
+                and (product_id is None or row["id"] == product_id)
+                and (created_at is None or row["created_at"] >= created_at)
+                and (
+                    updated_at is None
+                    or (
+                        row["updated_at"] is not None
+                        and row["updated_at"] >= updated_at
+                    )
+                )
+                and (user_id is None or row["user_id"] == user_id)
+            ):
+                rows.append(dict(row))
+                if limit is not None and len(rows) >= limit:
+                    break
+        return rows
+
+    def get_products(self, *args: Any) -> List[Dict[str, Any]]:
+        return self._filter_products(
+            *args, name_match=lambda value, name: value == name
+        )
+
+    def get_search_products(self, *args: Any) -> List[Dict[str, Any]]:
+        return self._filter_products(
+            *args, name_match=lambda value, name: name.lower() in value.lower()
+        )
+
+    def search_products(
+        self, user_id: int, query: str, mode: str, limit: int
+    ) -> List[Dict[str, Any]]:
+        query = query.strip().lower()
+        ranked = []
+        for row in self.products.values():
+            if row["user_id"] != user_id:
+                continue
+            name = row["name"].lower()
+            similarity = _word_similarity(query, name)
+            if mode == "prefix":
+                if name.startswith(query):
+                    ranked.append(((name, row["id"]), row))
+            elif similarity >= WORD_SIMILARITY_THRESHOLD or (
+                mode != "fuzzy" and query in name
+            ):
+                if mode == "fuzzy":
+                    key = (-similarity, row["id"])
+                else:
+                    key = (
+                        name != query,
+                        not name.startswith(query),
+                        -similarity,
+                        row["id"],
+                    )
+                ranked.append((key, row))
+        ranked.sort(key=lambda item: item[0])
+        return [dict(row) for _, row in ranked[:limit]]
+
+    def get_products_version(self, user_id: int) -> List[Dict[str, Any]]:
+        return [{"version": self.product_versions.get(user_id, 0)}]
+
+    def get_products_by_ids(
+        self, product_ids: List[int], user_id: int
+    ) -> List[Dict[str, Any]]:
+        return [
+            dict(self.products[i])
+            for i in sorted(set(product_ids))
+            if i in self.products and self.products[i]["user_id"] == user_id
+        ]
+
+    def get_users(
+        self,
+        first_name: Optional[str],
+        last_name: Optional[str],
+        email: Optional[str],
+        user_id: Optional[int],
+    ) -> List[Dict[str, Any]]:
+        return [
+            dict(row)
+            for row in self.users.values()
+            if (first_name is None or row["first_name"] == first_name)
+            and (last_name is None or row["last_name"] == last_name)
+            and (email is None or row["email"] == email)
+            and (user_id is None or row["id"] == user_id)
+        ]
+
+    def insert_user(
+        self,
+        first_name: Optional[str],
+        last_name: Optional[str],
+        email: str,
+        password: str,
+    ) -> int:
+        self._user_seq += 1
+        self.users[self._user_seq] = {
+            "id": self._user_seq,
+            "first_name": first_name,
+            "last_name": last_name,
+            "email": email,
+            "password": password,
+            "created_at": self._now(),
+            "updated_at": None,
+            "token_version": 0,
+        }
+        return self._user_seq
+
+    def update_user(
+        self,
+        first_name: Optional[str],
+        last_name: Optional[str],
+        email: str,
+        user_id: int,
+        password: str,
+    ) -> bool:
+        row = self.users.get(user_id)
+        if row is None:
+            return False
+        if row["email"] != email or row["password"] != password:
+            row["token_version"] += 1
+        row.update(
+            first_name=first_name,
+            last_name=last_name,
+            email=email,
+            password=password,
+            updated_at=self._now(),
+        )
+        return True
+
+    def get_users_by_emails(self, emails: List[str]) -> List[Dict[str, Any]]:
+        wanted = set(emails)
+        return [dict(row) for row in self.users.values() if row["email"] in wanted]
+
+    def get_user_token_versions(self, user_ids: List[int]) -> List[Dict[str, Any]]:
+        return [
+            {"id": i, "token_version": self.users[i]["token_version"]}
+            for i in set(user_ids)
+            if i in self.users
+        ]
+
+    def insert_refresh_token(
+        self, user_id: int, token_hash: str, expires_at: datetime
+    ) -> None:
+        self.refresh_tokens[token_hash] = {
+            "user_id": user_id,
+            "expires_at": expires_at,
+            "revoked_at": None,
+            "replaced_by": None,
+        }
+
+    def rotate_refresh_token(
+        self, token_hash: str, new_token_hash: str, expires_at: datetime
+    ) -> List[Dict[str, Any]]:
+        token = self.refresh_tokens.get(token_hash)
+        if token is None:
+            return []
+        if token["replaced_by"] is not None:
+            self.revoke_user_refresh_tokens(token["user_id"])
+            return []
+        if token["revoked_at"] is not None or token["expires_at"] <= self._now():
+            return []
+        self.insert_refresh_token(token["user_id"], new_token_hash, expires_at)
+        token.update(revoked_at=self._now(), replaced_by=new_token_hash)
+        return [dict(self.users[token["user_id"]])]
+
+    def revoke_refresh_token(self, token_hash: str) -> bool:
+        token = self.refresh_tokens.get(token_hash)
+        if token is None or token["revoked_at"] is not None:
+            return False
+        token["revoked_at"] = self._now()
+        return True
+
+    def revoke_user_refresh_tokens(self, user_id: int) -> int:
+        revoked = 0
+        for token in self.refresh_tokens.values():
+            if token["user_id"] == user_id and token["revoked_at"] is None:
+                token["revoked_at"] = self._now()
+                revoked += 1
+        return revoked
+
+    def _name_taken(self, name: str, user_id: int, exclude_id: int = 0) -> bool:
+        return any(
+            row["user_id"] == user_id
+            and row["name"] == name
+            and row["id"] != exclude_id
+            for row in self.products.values()
+        )
+
+    def _bump_product_version(self, user_id: int) -> None:
+        self.product_versions[user_id] = self.product_versions.get(user_id, 0) + 1
+
+    def _insert_product(
+        self, name: str, stock: int, price: Decimal, user_id: int
+    ) -> int:
+        self._product_seq += 1
+        self.products[self._product_seq] = {
+            "id": self._product_seq,
+            "name": name,
+            "stock": stock,
+            "price": price,
+            "user_id": user_id,
+            "created_at": self._now(),
+            "updated_at": None,
+        }
+        self._bump_product_version(user_id)
+        return self._product_seq
+
+    def create_product(
+        self, name: str, stock: int, price: Decimal, user_id: int
+    ) -> List[Dict[str, Any]]:
+        if self._name_taken(name, user_id):
+            return []
+        product_id = self._insert_product(name, stock, price, user_id)
+        return [dict(self.products[product_id])]
+
+    def update_product(
+        self, name: str, stock: int, price: Decimal, user_id: int, product_id: int
+    ) -> str:
+        row = self.products.get(product_id)
+        if row is None or row["user_id"] != user_id:
+            return "not_found"
+        if self._name_taken(name, user_id, exclude_id=product_id):
+            return "conflict"
+        row.update(name=name, stock=stock, price=price, updated_at=self._now())
+        self._bump_product_version(user_id)
+        return "updated"
+
+    def delete_product(self, product_id: int, user_id: int) -> bool:
+        row = self.products.get(product_id)
+        if row is None or row["user_id"] != user_id:
+            return False
+        del self.products[product_id]
+        self._bump_product_version(user_id)
+        return True
+
+    def pg_notify(self, channel: str, payload: str) -> None:
+        """No hay otros procesos a los que notificar."""
+
+
+class FakeConnection:
+    """
+    Conexión que resuelve las sentencias del registro contra un `FakeStore`.
+
+    Atributos:
+        store (FakeStore): Datos en memoria.
+        latency (float): Segundos de espera simulados por sentencia.
+    """
+
+    # SQL del registro -> nombre de la sentencia (y del método del store)
+    _names = {sql: name for name, sql in STATEMENTS.items()}
+
+    def __init__(self, store: FakeStore, latency: float) -> None:
+        self.store = store
+        self.latency = latency
+
+    async def _call(self, sql: str, args: Any) -> Any:
+        name = self._names.get(sql)
+        if name is None:
+            raise ValueError(f"Fake backend does not support: {sql[:60]}")
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return getattr(self.store, name)(*args)
+
+    async def fetch(self, sql: str, *args: Any) -> List[Dict[str, Any]]:
+        return await self._call(sql, args)
+
+    async def fetchrow(self, sql: str, *args: Any) -> Optional[Dict[str, Any]]:
+        rows = await self._call(sql, args)
+        return rows[0] if rows else None
+
+    async def fetchval(self, sql: str, *args: Any) -> Any:
+        return await self._call(sql, args)
+
+    def is_in_transaction(self) -> bool:
+        return False
+
+
+class FakePool:
+    """
+    Pool de tamaño fijo de `FakeConnection`, con la interfaz que usa
+    `DBManagement`.
+
+    Atributos:
+        size (int): Número de conexiones.
+    """
+
+    def __init__(self, store: FakeStore, size: int, latency: float) -> None:
+        self.size = size
+        self._idle: "asyncio.Queue[FakeConnection]" = asyncio.Queue()
+        for _ in range(size):
+            self._idle.put_nowait(FakeConnection(store, latency))
+
+    async def acquire(self, timeout: Optional[float] = None) -> FakeConnection:
+        return await asyncio.wait_for(self._idle.get(), timeout)
+
+    async def release(self, conn: FakeConnection) -> None:
+        self._idle.put_nowait(conn)
+
+    def get_size(self) -> int:
+        return self.size
+
+    def get_idle_size(self) -> int:
+        return self._idle.qsize()
+
+    async def close(self) -> None:
+        """No hay recursos que liberar."""
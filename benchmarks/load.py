@@ -0,0 +1,447 @@
+"""
+Benchmark de carga de extremo a extremo de la API.
+
+Arranca `main.app` en el mismo proceso y la ataca a través del transporte
+ASGI de httpx (sin red ni servidor), con varios usuarios virtuales
+concurrentes que ejecutan una mezcla ponderada de operaciones: login,
+renovación del token de acceso, listado, sondeo condicional del listado
+(`If-None-Match`, como un panel que refresca periódicamente), filtrado,
+lectura por lotes de IDs, búsqueda por nombre, creación, actualización y
+eliminación de productos. La carga masiva y la exportación no forman parte
+de la mezcla: el backend "fake" no las implementa.
+
+Backends:
+- "fake" (por defecto): `benchmarks.fake_db`, en memoria, con latencia
+  opcional por sentencia. Mide el coste de la aplicación.
+- "postgres": una base real indicada con `--dsn`, con las migraciones ya
+  aplicadas (`python -m db.migrate`). Cada ejecución crea sus propios usuarios.
+
+El resultado es un JSON con el rendimiento global y, por endpoint, número de
+peticiones, errores, peticiones por segundo y latencias p50/p95/p99, pensado
+para comparar ejecuciones.
+
+Uso:
+    python -m benchmarks.load --users 20 --duration 10 --output before.json
+    python -m benchmarks.load --backend postgres --dsn postgresql://... --users 20
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+# Peso de cada operación en la mezcla por defecto
+DEFAULT_MIX = "list=40,filter=20,create=15,update=15,delete=5,login=5"
+
+PASSWORD = "benchmark-password"
+
+
+def parse_mix(mix: str) -> Dict[str, int]:
+    """
+    Interpreta una mezcla de operaciones con el formato "op=peso,...".
+
+    Args:
+        mix (str): Mezcla de operaciones.
+
+    Returns:
+        Dict[str, int]: Peso de cada operación.
+
+    Raises:
+        ValueError: Si una operación no existe.
+    """
+    weights = {}
+    for item in mix.split(","):
+        operation, _, weight = item.partition("=")
+        if operation not in VirtualUser.OPERATIONS:
+            raise ValueError(f"Unknown operation: {operation}")
+        weights[operation] = int(weight)
+    return weights
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Retorna el percentil `fraction` (0-1) por rango más cercano."""
+    index = max(int(round(fraction * len(values) + 0.5)) - 1, 0)
+    return values[min(index, len(values) - 1)]
+
+
+class Recorder:
+    """
+    Acumula la latencia y el resultado de cada petición por endpoint.
+
+    Atributos:
+        latencies (Dict[str, List[float]]): Segundos de cada petición.
+        errors (Dict[str, int]): Respuestas con un código no esperado.
+    """
+
+    def __init__(self) -> None:
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+
+    def record(self, endpoint: str, elapsed: float, ok: bool) -> None:
+        self.latencies.setdefault(endpoint, []).append(elapsed)
+        if not ok:
+            self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def report(self, duration: float) -> Dict[str, Any]:
+        """
+        Resume las peticiones registradas.
+
+        Args:
+            duration (float): Segundos de la fase medida.
+
+        Returns:
+            Dict[str, Any]: Totales y métricas por endpoint.
+        """
+        endpoints = {}
+        for endpoint, values in sorted(self.latencies.items()):
+            values = sorted(values)
+            endpoints[endpoint] = {
+                "count": len(values),
+                "errors": self.errors.get(endpoint, 0),
+                "throughput_rps": round(len(values) / duration, 2),
+                "mean_ms": round(sum(values) / len(values) * 1000, 3),
+                "p50_ms": round(percentile(values, 0.50) * 1000, 3),
+                "p95_ms": round(percentile(values, 0.95) * 1000, 3),
+                "p99_ms": round(percentile(values, 0.99) * 1000, 3),
+                "max_ms": round(values[-1] * 1000, 3),
+            }
+        total = sum(item["count"] for item in endpoints.values())
+        return {
+            "duration_s": round(duration, 3),
+            "requests": total,
+            "errors": sum(self.errors.values()),
+            "throughput_rps": round(total / duration, 2),
+            "endpoints": endpoints,
+        }
+
+
+class VirtualUser:
+    """
+    Usuario virtual que ejecuta operaciones sobre sus propios productos.
+
+    Atributos:
+        client (httpx.AsyncClient): Cliente contra la aplicación.
+        email (str): Email del usuario.
+        rng (random.Random): Generador para elegir operaciones y productos.
+    """
+
+    # Operación de la mezcla -> método que la ejecuta
+    OPERATIONS = {
+        "list": "list_products",
+        "poll": "poll_products",
+        "filter": "filter_products",
+        "batch": "batch_products",
+        "search": "search_products",
+        "create": "create_product",
+        "update": "update_product",
+        "delete": "delete_product",
+        "login": "login",
+        "refresh": "refresh",
+    }
+
+    def __init__(
+        self, client: httpx.AsyncClient, email: str, rng: random.Random
+    ) -> None:
+        self.client = client
+        self.email = email
+        self.rng = rng
+        self.headers: Dict[str, str] = {}
+        self.refresh_token: Optional[str] = None
+        self.etag: Optional[str] = None
+        self.product_ids: List[int] = []
+        self._counter = 0
+
+    async def _request(
+        self,
+        recorder: Optional[Recorder],
+        endpoint: str,
+        expected: Tuple[int, ...],
+        method: str,
+        url: str,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        headers = {**self.headers, **kwargs.pop("headers", {})}
+        start = time.perf_counter()
+        response = await self.client.request(method, url, headers=headers, **kwargs)
+        if recorder is not None:
+            recorder.record(
+                endpoint, time.perf_counter() - start, response.status_code in expected
+            )
+        return response
+
+    def _next_name(self) -> str:
+        self._counter += 1
+        return f"bench-{self._counter}"
+
+    def _set_tokens(self, response: httpx.Response) -> None:
+        body = response.json()
+        self.headers = {"Authorization": f"Bearer {body['access_token']}"}
+        self.refresh_token = body["refresh_token"]
+
+    async def setup(self, products: int) -> None:
+        """Registra al usuario y crea sus productos iniciales (sin medir)."""
+        response = await self._request(
+            None,
+            "",
+            (201,),
+            "POST",
+            "/auth/register",
+            json={
+                "email": self.email,
+                "password": PASSWORD,
+                "confirm_password": PASSWORD,
+            },
+        )
+        response.raise_for_status()
+        self._set_tokens(response)
+        for _ in range(products):
+            await self.create_product(None)
+
+    async def login(self, recorder: Optional[Recorder]) -> None:
+        await self._request(
+            recorder,
+            "POST /auth/login",
+            (200,),
+            "POST",
+            "/auth/login",
+            json={"email": self.email, "password": PASSWORD},
+        )
+
+    async def refresh(self, recorder: Optional[Recorder]) -> None:
+        response = await self._request(
+            recorder,
+            "POST /auth/refresh",
+            (200,),
+            "POST",
+            "/auth/refresh",
+            json={"refresh_token": self.refresh_token},
+        )
+        if response.status_code == 200:
+            self._set_tokens(response)
+
+    async def list_products(self, recorder: Optional[Recorder]) -> None:
+        await self._request(
+            recorder,
+            "GET /products/",
+            (200,),
+            "GET",
+            "/products/",
+            params={"limit": 50},
+        )
+
+    async def poll_products(self, recorder: Optional[Recorder]) -> None:
+        response = await self._request(
+            recorder,
+            "GET /products/ (conditional)",
+            (200, 304),
+            "GET",
+            "/products/",
+            params={"limit": 50},
+            headers={"If-None-Match": self.etag or ""},
+        )
+        self.etag = response.headers.get("etag", self.etag)
+
+    async def filter_products(self, recorder: Optional[Recorder]) -> None:
+        await self._request(
+            recorder,
+            "POST /products/filter",
+            (200,),
+            "POST",
+            "/products/filter",
+            params={"limit": 50},
+            json={"name": "bench"},
+        )
+
+    async def batch_products(self, recorder: Optional[Recorder]) -> None:
+        ids = self.rng.sample(self.product_ids, min(20, len(self.product_ids)))
+        await self._request(
+            recorder,
+            "GET /products/batch",
+            (200,),
+            "GET",
+            "/products/batch",
+            params={"ids": ",".join(str(i) for i in ids) or "0"},
+        )
+
+    async def search_products(self, recorder: Optional[Recorder]) -> None:
+        await self._request(
+            recorder,
+            "GET /products/search",
+            (200,),
+            "GET",
+            "/products/search",
+            params={"q": f"bench-{self.rng.randint(1, 9)}", "mode": "ranked"},
+        )
+
+    async def create_product(self, recorder: Optional[Recorder]) -> None:
+        response = await self._request(
+            recorder,
+            "POST /products/",
+            (201,),
+            "POST",
+            "/products/",
+            json={
+                "name": self._next_name(),
+                "stock": self.rng.randint(0, 100),
+                "price": f"{self.rng.randint(1, 10000) / 100:.2f}",
+            },
+        )
+        if response.status_code == 201:
+            self.product_ids.append(response.json()["id"])
+
+    async def update_product(self, recorder: Optional[Recorder]) -> None:
+        if not self.product_ids:
+            await self.create_product(recorder)
+            return
+        product_id = self.rng.choice(self.product_ids)
+        await self._request(
+            recorder,
+            "PUT /products/{product_id}",
+            (200,),
+            "PUT",
+            f"/products/{product_id}",
+            json={
+                "name": self._next_name(),
+                "stock": self.rng.randint(0, 100),
+                "price": "9.99",
+            },
+        )
+
+    async def delete_product(self, recorder: Optional[Recorder]) -> None:
+        if not self.product_ids:
+            await self.create_product(recorder)
+            return
+        product_id = self.product_ids.pop(self.rng.randrange(len(self.product_ids)))
+        await self._request(
+            recorder,
+            "DELETE /products/{product_id}",
+            (204,),
+            "DELETE",
+            f"/products/{product_id}",
+        )
+
+    async def run(
+        self, recorder: Recorder, weights: Dict[str, int], deadline: float
+    ) -> None:
+        """Ejecuta operaciones de la mezcla hasta `deadline`."""
+        methods = [getattr(self, self.OPERATIONS[name]) for name in weights]
+        while time.perf_counter() < deadline:
+            method = self.rng.choices(methods, weights=list(weights.values()))[0]
+            await method(recorder)
+
+
+async def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Prepara el backend, ejecuta la carga y retorna el informe.
+
+    Args:
+        args (argparse.Namespace): Opciones de la línea de comandos.
+
+    Returns:
+        Dict[str, Any]: Informe de la ejecución.
+    """
+    if args.backend == "postgres":
+        if not args.dsn:
+            raise SystemExit("--dsn is required with --backend postgres")
+        os.environ["DATABASE_URL"] = args.dsn
+
+    # La configuración se lee al importar la aplicación
+    from core.config import settings
+    from core.hashing import password_hasher
+    from db.connnection import db_management
+    from main import app
+
+    weights = parse_mix(args.mix)
+    pool_size = args.pool_size if args.backend == "fake" else None
+    pool_size = pool_size or settings.db_pool_max_size
+    rng = random.Random(args.seed)
+    run_id = uuid.uuid4().hex[:8]
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        if args.backend == "postgres":
+            lifespan = app.router.lifespan_context(app)
+            await lifespan.__aenter__()
+        else:
+            from benchmarks.fake_db import FakePool, FakeStore
+
+            db_management.pool = FakePool(
+                FakeStore(),
+                size=pool_size,
+                latency=args.fake_latency_ms / 1000,
+            )
+
+        try:
+            users = [
+                VirtualUser(
+                    client,
+                    f"bench-{run_id}-{index}@example.com",
+                    random.Random(rng.random()),
+                )
+                for index in range(args.users)
+            ]
+            await asyncio.gather(*(user.setup(args.products) for user in users))
+
+            recorder = Recorder()
+            start = time.perf_counter()
+            deadline = start + args.duration
+            await asyncio.gather(
+                *(user.run(recorder, weights, deadline) for user in users)
+            )
+            duration = time.perf_counter() - start
+        finally:
+            if args.backend == "postgres":
+                await lifespan.__aexit__(None, None, None)
+            else:
+                db_management.pool = None
+                password_hasher.shutdown()
+
+    report = {
+        "backend": args.backend,
+        "users": args.users,
+        "mix": weights,
+        "fake_latency_ms": args.fake_latency_ms if args.backend == "fake" else None,
+        "pool_size": pool_size,
+    }
+    report.update(recorder.report(duration))
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--backend", choices=("fake", "postgres"), default="fake")
+    parser.add_argument("--dsn", help="PostgreSQL DSN for the postgres backend")
+    parser.add_argument("--users", type=int, default=10, help="Concurrent users")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds")
+    parser.add_argument(
+        "--products", type=int, default=20, help="Products created per user on setup"
+    )
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Weighted operation mix")
+    parser.add_argument(
+        "--fake-latency-ms", type=float, default=0.5, help="Fake per-statement latency"
+    )
+    parser.add_argument(
+        "--pool-size", type=int, help="Fake pool size (default db_pool_max_size)"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_benchmark(args))
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""
+Microbenchmarks del coste de CPU por petición.
+
+Mide de forma aislada las operaciones que se repiten en cada petición:
+
+- Creación y verificación de JWT (`core.token`), con y sin la caché de
+  tokens verificados, y reconstrucción del usuario a partir de los claims
+  (modo sin estado).
+- Construcción de `ProductOut` y `UserOut` a partir de filas como las de
+  asyncpg, y validación de un listado con `product_list_adapter`.
+- Construcción de parámetros con `ProductFilter.model_dump()`.
+- Validación de `RegisterAuth` y `ProfileUpdate`.
+
+Para cada caso informa de operaciones por segundo (mejor de varias rondas
+con `timeit`) y de la memoria reservada por operación (pico medido con
+`tracemalloc`). Con `--check` compara contra `micro_thresholds.json` y
+termina con código 1 si algún caso baja de su mínimo de ops/s o supera su
+máximo de bytes; con `--update-thresholds` regenera ese fichero a partir de
+la ejecución actual con un margen de tolerancia.
+
+Uso:
+    python -m benchmarks.micro
+    python -m benchmarks.micro --check
+    python -m benchmarks.micro --update-thresholds
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import timeit
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from fastapi import HTTPException
+
+from core.token import (claims_user, create_access_token, token_cache,
+                        user_claims, verify_token)
+from schemas.auth import RegisterAuth
+from schemas.product import ProductFilter, ProductOut, product_list_adapter
+from schemas.user import ProfileUpdate, UserClaims, UserOut
+
+THRESHOLDS_PATH = Path(__file__).with_name("micro_thresholds.json")
+
+# Margen al regenerar umbrales: ops/s mínimas y bytes máximos relativos
+OPS_TOLERANCE = 0.5
+BYTES_TOLERANCE = 1.5
+
+CREATED = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+PRODUCT_ROW = {
+    "name": "Product 1",
+    "stock": 10,
+    "price": Decimal("19.99"),
+    "user_id": 1,
+    "id": 1,
+    "created_at": CREATED,
+    "updated_at": CREATED + timedelta(days=1),
+}
+
+PRODUCT_ROWS = [dict(PRODUCT_ROW, id=i, name=f"Product {i}") for i in range(100)]
+PRODUCTS = product_list_adapter.validate_python(PRODUCT_ROWS)
+
+USER_ROW = {
+    "id": 1,
+    "first_name": "Ada",
+    "last_name": "Lovelace",
+    "email": "ada@example.com",
+    "password": "scrypt:32768:8:1$salt$" + "0" * 128,
+    "created_at": CREATED,
+    "updated_at": None,
+    "token_version": 0,
+}
+
+CLAIMS = user_claims(UserClaims(**USER_ROW))
+TOKEN, _ = create_access_token("ada@example.com", CLAIMS)
+CREDENTIALS_ERROR = HTTPException(status_code=401)
+
+
+def verify_token_uncached() -> Dict[str, Any]:
+    """Verifica el token sin pasar por la caché de tokens verificados."""
+    token_cache.clear()
+    return verify_token(TOKEN, CREDENTIALS_ERROR)
+
+
+def _cases() -> List[Tuple[str, Callable[[], Any]]]:
+    """Retorna los casos a medir como (nombre, función sin argumentos)."""
+    return [
+        (
+            "token.create_access_token",
+            lambda: create_access_token("ada@example.com", CLAIMS),
+        ),
+        ("token.verify_token_cached", lambda: verify_token(TOKEN, CREDENTIALS_ERROR)),
+        ("token.verify_token_uncached", verify_token_uncached),
+        (
+            "token.claims_user",
+            lambda: claims_user(verify_token(TOKEN, CREDENTIALS_ERROR)),
+        ),
+        ("product.ProductOut_from_row", lambda: ProductOut(**dict(PRODUCT_ROW))),
+        (
+            "product.list_adapter_100_rows",
+            lambda: product_list_adapter.validate_python(
+                [dict(row) for row in PRODUCT_ROWS]
+            ),
+        ),
+        (
+            "product.dump_json_100_rows",
+            lambda: product_list_adapter.dump_json(PRODUCTS),
+        ),
+        (
+            "product.ProductFilter_params",
+            lambda: list(
+                ProductFilter(user_id=1, limit=101, after_id=50).model_dump().values()
+            ),
+        ),
+        ("user.UserOut_from_row", lambda: UserOut(**dict(USER_ROW))),
+        (
+            "auth.RegisterAuth_validate",
+            lambda: RegisterAuth(
+                email="ada@example.com",
+                password="secret-password",
+                confirm_password="secret-password",
+                first_name="Ada",
+            ),
+        ),
+        (
+            "user.ProfileUpdate_validate",
+            lambda: ProfileUpdate(
+                first_name="Ada",
+                email="ada@example.com",
+                password="old-password",
+                new_password="new-password",
+                new_confirm_password="new-password",
+            ),
+        ),
+    ]
+
+
+def ops_per_second(func: Callable[[], Any], rounds: int, min_time: float) -> float:
+    """
+    Mide las operaciones por segundo de `func`.
+
+    Args:
+        func (Callable[[], Any]): Operación a medir.
+        rounds (int): Rondas de medición; se toma la más rápida.
+        min_time (float): Segundos mínimos por ronda.
+
+    Returns:
+        float: Operaciones por segundo en la mejor ronda.
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    number = max(number, int(number * min_time / 0.2))
+    best = min(timer.repeat(repeat=rounds, number=number))
+    return number / best
+
+
+def bytes_per_op(func: Callable[[], Any], samples: int = 20) -> int:
+    """
+    Mide la memoria reservada por una operación con tracemalloc.
+
+    Args:
+        func (Callable[[], Any]): Operación a medir.
+        samples (int): Repeticiones; se toma la mediana.
+
+    Returns:
+        int: Pico de bytes reservados durante una operación.
+    """
+    func()  # calentamiento: cachés y objetos perezosos fuera de la medida
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(samples):
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            func()
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - current)
+    finally:
+        tracemalloc.stop()
+    return int(statistics.median(peaks))
+
+
+def run(rounds: int, min_time: float) -> Dict[str, Dict[str, float]]:
+    """
+    Ejecuta todos los casos.
+
+    Returns:
+        Dict[str, Dict[str, float]]: ops/s y bytes por operación de cada caso.
+    """
+    return {
+        name: {
+            "ops_per_sec": round(ops_per_second(func, rounds, min_time), 1),
+            "bytes_per_op": bytes_per_op(func),
+        }
+        for name, func in _cases()
+    }
+
+
+def check(
+    results: Dict[str, Dict[str, float]], thresholds: Dict[str, Dict[str, float]]
+) -> List[str]:
+    """
+    Compara los resultados con los umbrales.
+
+    Returns:
+        List[str]: Descripción de cada regresión encontrada.
+    """
+    failures = []
+    for name, limits in thresholds.items():
+        result = results.get(name)
+        if result is None:
+            continue
+        if result["ops_per_sec"] < limits["min_ops_per_sec"]:
+            failures.append(
+                f"{name}: {result['ops_per_sec']:,.0f} ops/s "
+                f"< {limits['min_ops_per_sec']:,.0f}"
+            )
+        if result["bytes_per_op"] > limits["max_bytes_per_op"]:
+            failures.append(
+                f"{name}: {result['bytes_per_op']:,} B/op "
+                f"> {limits['max_bytes_per_op']:,}"
+            )
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--rounds", type=int, default=5, help="Timing rounds")
+    parser.add_argument(
+        "--min-time", type=float, default=0.2, help="Minimum seconds per round"
+    )
+    parser.add_argument("--check", action="store_true", help="Fail on regressions")
+    parser.add_argument(
+        "--update-thresholds", action="store_true", help="Rewrite the thresholds file"
+    )
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    args = parser.parse_args()
+
+    results = run(args.rounds, args.min_time)
+    for name, result in results.items():
+        print(
+            f"{name:<32} {result['ops_per_sec']:>14,.0f} ops/s "
+            f"{result['bytes_per_op']:>10,} B/op"
+        )
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2) + "\n")
+
+    if args.update_thresholds:
+        thresholds = {
+            name: {
+                "min_ops_per_sec": round(result["ops_per_sec"] * OPS_TOLERANCE),
+                "max_bytes_per_op": round(result["bytes_per_op"] * BYTES_TOLERANCE),
+            }
+            for name, result in results.items()
+        }
+        THRESHOLDS_PATH.write_text(json.dumps(thresholds, indent=2) + "\n")
+        print(f"Thresholds written to {THRESHOLDS_PATH}")
+
+    if args.check:
+        failures = check(results, json.loads(THRESHOLDS_PATH.read_text()))
+        for failure in failures:
+            print(f"REGRESSION {failure}", file=sys.stderr)
+        if failures:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
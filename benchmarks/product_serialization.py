@@ -0,0 +1,118 @@
+"""
+Benchmark de serialización de listados de productos.
+
+Compara, sobre filas sintéticas con la forma que devuelven las funciones
+almacenadas, las dos rutas que puede seguir `GET /products/`:
+
+- "before": `ProductOut(**row)` por fila y después el `serialize_response`
+  de FastAPI con `response_model=List[ProductOut]` (segunda validación) y
+  `JSONResponse`.
+- "after": `product_list_adapter` validando la lista completa de una vez y
+  serializándola directamente a bytes JSON.
+
+Uso:
+    python -m benchmarks.product_serialization --rows 1000 --repeat 20
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Callable, Dict, List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from schemas.product import ProductOut, product_list_adapter
+
+RESPONSE_FIELD = create_model_field(
+    name="Response_get_products", type_=List[ProductOut], mode="serialization"
+)
+
+
+def make_rows(count: int) -> List[Dict[str, Any]]:
+    """
+    Genera filas como las que retorna `get_products`.
+
+    Args:
+        count (int): Número de filas.
+
+    Returns:
+        List[Dict[str, Any]]: Filas con los tipos que entrega asyncpg.
+    """
+    created = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "name": f"Product {i}",
+            "stock": i % 500,
+            "price": Decimal(f"{i % 1000}.{i % 100:02d}"),
+            "user_id": 1,
+            "id": i + 1,
+            "created_at": created + timedelta(minutes=i),
+            "updated_at": None if i % 2 else created + timedelta(days=1, minutes=i),
+        }
+        for i in range(count)
+    ]
+
+
+async def before(rows: List[Dict[str, Any]]) -> bytes:
+    """Validación por fila, segunda validación de FastAPI y JSONResponse."""
+    products = [ProductOut(**dict(row)) for row in rows]
+    content = await serialize_response(field=RESPONSE_FIELD, response_content=products)
+    return JSONResponse(content).body
+
+
+async def after(rows: List[Dict[str, Any]]) -> bytes:
+    """Validación de la lista en una sola pasada y serialización a bytes."""
+    products = product_list_adapter.validate_python([dict(row) for row in rows])
+    return product_list_adapter.dump_json(products)
+
+
+async def measure(
+    func: Callable[[List[Dict[str, Any]]], Any],
+    rows: List[Dict[str, Any]],
+    repeat: int,
+) -> float:
+    """
+    Ejecuta `func` `repeat` veces y retorna las filas por segundo de la mejor.
+
+    Args:
+        func (Callable): Ruta de serialización a medir.
+        rows (List[Dict[str, Any]]): Filas de entrada.
+        repeat (int): Repeticiones.
+
+    Returns:
+        float: Filas por segundo en la repetición más rápida.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await func(rows)
+        best = min(best, time.perf_counter() - started)
+    return len(rows) / best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--rows", type=int, default=1000, help="Rows per response")
+    parser.add_argument("--repeat", type=int, default=20, help="Repetitions")
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    # Ambas rutas deben producir el mismo documento JSON
+    assert json.loads(asyncio.run(before(rows))) == json.loads(asyncio.run(after(rows)))
+
+    results = {
+        "before": asyncio.run(measure(before, rows, args.repeat)),
+        "after": asyncio.run(measure(after, rows, args.repeat)),
+    }
+    for name, rows_per_second in results.items():
+        print(f"{name:>7}: {rows_per_second:>12,.0f} rows/s")
+    print(f"speedup: {results['after'] / results['before']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+"""
+Benchmark de la búsqueda de productos por nombre sobre PostgreSQL.
+
+Genera un catálogo sintético de un único usuario (por defecto 1.000.000 de
+productos: el peor caso para las búsquedas, que se acotan por usuario) con
+nombres formados por palabras de un vocabulario fijo, y mide la latencia de
+cada tipo de consulta ejecutando las sentencias del registro:
+
+- "substring": `get_search_products` (ILIKE '%...%', la de
+  `POST /products/filter`).
+- "prefix", "fuzzy" y "ranked": los modos de `search_products`
+  (`GET /products/search`). Las consultas "fuzzy" llevan un error de
+  escritura.
+
+Requiere las migraciones aplicadas, incluida la 0009 (pg_trgm y sus
+índices). Los productos se crean con un usuario propio y se eliminan al
+terminar, salvo con `--keep`; con `--user-id` se reutiliza un catálogo
+conservado antes sin volver a generarlo.
+
+El resultado es un JSON con, por tipo de consulta, número de consultas,
+filas medias devueltas y latencias media, p50/p95/p99 y máxima; con
+`--explain`, también el plan (EXPLAIN ANALYZE) de una consulta de cada tipo.
+
+Uso:
+    python -m benchmarks.search --dsn postgresql://... --output search.json
+    python -m benchmarks.search --dsn postgresql://... --products 100000 --keep
+    python -m benchmarks.search --dsn postgresql://... --user-id 42 --explain
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Tuple
+
+import asyncpg
+
+from benchmarks.load import percentile
+from db.statements import STATEMENTS
+
+ADJECTIVES = (
+    "cordless compact heavy light magnetic digital manual electric "
+    "industrial portable precision reinforced rotary adjustable folding "
+    "insulated quick universal waterproof flexible"
+).split()
+NOUNS = (
+    "drill hammer wrench screwdriver saw chisel clamp pliers sander grinder "
+    "level ladder toolbox socket ratchet caliper trowel scraper stapler "
+    "multimeter flashlight extension cable hose valve bracket hinge bolt "
+    "washer anchor"
+).split()
+# Sustantivos para las consultas con errores: en las palabras cortas un error
+# deja muy pocos trigramas en común
+LONG_NOUNS = [noun for noun in NOUNS if len(noun) >= 6]
+MATERIALS = (
+    "steel aluminium brass copper titanium carbon nylon rubber oak bamboo"
+).split()
+
+# Nombre: adjetivo + sustantivo + material + número de fila (único por usuario)
+GENERATE_SQL = """
+INSERT INTO products (name, stock, price, user_id)
+SELECT
+    initcap(($1::TEXT[])[1 + floor(random() * cardinality($1))::INTEGER])
+        || ' ' || ($2::TEXT[])[1 + floor(random() * cardinality($2))::INTEGER]
+        || ' ' || ($3::TEXT[])[1 + floor(random() * cardinality($3))::INTEGER]
+        || ' ' || i,
+    floor(random() * 1000)::INTEGER,
+    round((random() * 1000)::NUMERIC, 2),
+    $4::INTEGER
+FROM generate_series($5::INTEGER, $6::INTEGER) AS i;
+"""
+
+
+def typo(word: str, rng: random.Random) -> str:
+    """Introduce un error de escritura: omite, cambia o intercambia una letra."""
+    index = rng.randrange(1, len(word) - 1)
+    kind = rng.choice(("delete", "replace", "swap"))
+    if kind == "delete":
+        return word[:index] + word[index + 1:]
+    if kind == "replace":
+        return word[:index] + rng.choice("aeiou") + word[index + 1:]
+    return word[:index - 1] + word[index] + word[index - 1] + word[index + 1:]
+
+
+def query_types(
+    user_id: int, limit: int
+) -> Dict[str, Tuple[str, Callable[[random.Random], List[Any]]]]:
+    """
+    Retorna, por tipo de consulta, la sentencia y un generador de argumentos.
+
+    Args:
+        user_id (int): Usuario propietario del catálogo.
+        limit (int): Máximo de filas por consulta.
+
+    Returns:
+        Dict[str, Tuple[str, Callable[[random.Random], List[Any]]]]: SQL del
+        registro y función que genera los argumentos de una consulta.
+    """
+
+    def search(mode: str, make_query: Callable[[random.Random], str]):
+        return (
+            STATEMENTS["search_products"],
+            lambda rng: [user_id, make_query(rng), mode, limit],
+        )
+
+    return {
+        "substring": (
+            STATEMENTS["get_search_products"],
+            # name, stock, price, id, created_at, updated_at, user_id, limit, after_id
+            lambda rng: [rng.choice(NOUNS), *[None] * 5, user_id, limit, None],
+        ),
+        "prefix": search(
+            "prefix", lambda rng: rng.choice(ADJECTIVES)[:rng.randint(2, 4)]
+        ),
+        "fuzzy": search("fuzzy", lambda rng: typo(rng.choice(LONG_NOUNS), rng)),
+        "ranked": search(
+            "ranked", lambda rng: f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)}"
+        ),
+    }
+
+
+async def generate(
+    conn: asyncpg.Connection, products: int, batch_size: int, seed: float
+) -> int:
+    """
+    Crea el usuario del benchmark y su catálogo sintético.
+
+    Args:
+        conn (asyncpg.Connection): Conexión a la base de datos.
+        products (int): Número de productos.
+        batch_size (int): Productos insertados por sentencia.
+        seed (float): Semilla de `random()` en PostgreSQL (entre -1 y 1).
+
+    Returns:
+        int: ID del usuario creado.
+    """
+    email = f"search-bench-{uuid.uuid4().hex[:8]}@example.com"
+    user_id = await conn.fetchval(STATEMENTS["insert_user"], None, None, email, "-")
+    await conn.execute("SELECT setseed($1::FLOAT8);", seed)
+    for start in range(1, products + 1, batch_size):
+        end = min(start + batch_size - 1, products)
+        await conn.execute(
+            GENERATE_SQL, ADJECTIVES, NOUNS, MATERIALS, user_id, start, end
+        )
+        print(f"generated {end}/{products} products", file=sys.stderr)
+    await conn.execute("ANALYZE products;")
+    return user_id
+
+
+async def measure(
+    conn: asyncpg.Connection,
+    sql: str,
+    make_args: Callable[[random.Random], List[Any]],
+    queries: int,
+    warmup: int,
+    rng: random.Random,
+) -> Dict[str, Any]:
+    """
+    Ejecuta una sentencia con argumentos aleatorios y resume sus latencias.
+
+    Args:
+        conn (asyncpg.Connection): Conexión a la base de datos.
+        sql (str): Sentencia a ejecutar.
+        make_args (Callable[[random.Random], List[Any]]): Generador de
+            argumentos.
+        queries (int): Consultas medidas.
+        warmup (int): Consultas previas sin medir (caché de planes y datos).
+        rng (random.Random): Generador de los argumentos.
+
+    Returns:
+        Dict[str, Any]: Consultas, filas medias y latencias en milisegundos.
+    """
+    for _ in range(warmup):
+        await conn.fetch(sql, *make_args(rng))
+
+    latencies: List[float] = []
+    rows = 0
+    for _ in range(queries):
+        args = make_args(rng)
+        start = time.perf_counter()
+        result = await conn.fetch(sql, *args)
+        latencies.append(time.perf_counter() - start)
+        rows += len(result)
+
+    latencies.sort()
+    return {
+        "count": queries,
+        "avg_rows": round(rows / queries, 2),
+        "mean_ms": round(sum(latencies) / queries * 1000, 3),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3),
+    }
+
+
+async def explain(conn: asyncpg.Connection, sql: str, args: List[Any]) -> List[str]:
+    """
+    Retorna el plan de ejecución (EXPLAIN ANALYZE) de una consulta.
+
+    `search_products` es PL/pgSQL, por lo que el plan de la llamada solo
+    muestra un `Function Scan`. Los planes de sus consultas internas se
+    añaden con `auto_explain` si la sesión puede cargarlo (suele requerir
+    superusuario).
+
+    Args:
+        conn (asyncpg.Connection): Conexión a la base de datos.
+        sql (str): Sentencia a analizar.
+        args (List[Any]): Argumentos de la sentencia.
+
+    Returns:
+        List[str]: Líneas del plan de la llamada y de los planes anidados.
+    """
+    nested: List[str] = []
+
+    def collect(_conn: asyncpg.Connection, message: Any) -> None:
+        nested.extend(message.message.splitlines())
+
+    conn.add_log_listener(collect)
+    try:
+        async with conn.transaction():
+            try:
+                async with conn.transaction():
+                    await conn.execute("LOAD 'auto_explain';")
+                    await conn.execute(
+                        "SET LOCAL auto_explain.log_min_duration = 0;"
+                        "SET LOCAL auto_explain.log_nested_statements = on;"
+                        "SET LOCAL auto_explain.log_analyze = on;"
+                        "SET LOCAL client_min_messages = log;"
+                    )
+            except asyncpg.PostgresError:
+                pass
+            plan = await conn.fetch(f"EXPLAIN (ANALYZE, BUFFERS) {sql}", *args)
+    finally:
+        conn.remove_log_listener(collect)
+    return [row[0] for row in plan] + nested
+
+
+async def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Prepara el catálogo, ejecuta las consultas y retorna el informe.
+
+    Args:
+        args (argparse.Namespace): Opciones de la línea de comandos.
+
+    Returns:
+        Dict[str, Any]: Informe de la ejecución.
+    """
+    rng = random.Random(args.seed)
+    conn = await asyncpg.connect(args.dsn)
+    user_id = args.user_id
+    try:
+        if user_id is None:
+            user_id = await generate(
+                conn, args.products, args.batch_size, rng.uniform(-1, 1)
+            )
+        products = await conn.fetchval(
+            "SELECT count(*) FROM products WHERE user_id = $1;", user_id
+        )
+
+        results: Dict[str, Any] = {}
+        plans: Dict[str, List[str]] = {}
+        for name, (sql, make_args) in query_types(user_id, args.limit).items():
+            print(f"measuring {name}", file=sys.stderr)
+            results[name] = await measure(
+                conn, sql, make_args, args.queries, args.warmup, rng
+            )
+            if args.explain:
+                plans[name] = await explain(conn, sql, make_args(rng))
+    finally:
+        if not args.keep and args.user_id is None and user_id is not None:
+            await conn.execute("DELETE FROM products WHERE user_id = $1;", user_id)
+            await conn.execute("DELETE FROM users WHERE id = $1;", user_id)
+        await conn.close()
+
+    report: Dict[str, Any] = {
+        "products": products,
+        "user_id": user_id if args.keep or args.user_id is not None else None,
+        "limit": args.limit,
+        "queries": results,
+    }
+    if args.explain:
+        report["plans"] = plans
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--dsn", required=True, help="PostgreSQL DSN")
+    parser.add_argument(
+        "--products", type=int, default=1_000_000, help="Products to generate"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=100_000, help="Products per INSERT"
+    )
+    parser.add_argument(
+        "--user-id", type=int, help="Reuse the catalog of this user (no generation)"
+    )
+    parser.add_argument(
+        "--keep", action="store_true", help="Keep the generated catalog"
+    )
+    parser.add_argument("--queries", type=int, default=200, help="Queries per type")
+    parser.add_argument("--warmup", type=int, default=20, help="Unmeasured queries")
+    parser.add_argument("--limit", type=int, default=20, help="Rows per query")
+    parser.add_argument(
+        "--explain", action="store_true", help="Include one plan per query type"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_benchmark(args))
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
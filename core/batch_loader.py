@@ -0,0 +1,191 @@
+"""
+Agrupación de búsquedas por clave de peticiones concurrentes ("DataLoader").
+
+`BatchLoader.load` no consulta la base de datos por cada clave: las claves
+pedidas dentro de la misma ventana (una vuelta del event loop, o `window`
+segundos) se resuelven con una sola consulta `= ANY($1)`, y cada llamada
+recibe el valor de su clave.
+
+La primera llamada de cada lote (líder) espera la ventana y ejecuta la
+consulta con la conexión que recibió, que está libre mientras espera, o con
+una del pool. Las llamadas sin conexión (p. ej. las de la autenticación) no
+ocupan ninguna mientras esperan: el lote solo toma una del pool mientras se
+ejecuta su consulta.
+
+Cancelación (igual que en `core.singleflight`):
+
+- Si se cancela una llamada que espera, solo se cancela su espera.
+- Si se cancela el líder, se cancela el lote. Las demás llamadas no reciben
+  la cancelación: vuelven a pedir su clave en un lote nuevo.
+
+La consulta de un lote se ejecuta después de que todas sus llamadas se
+unieron a él, así que nunca devuelve datos anteriores a una escritura que
+terminó antes de pedir la clave. Las llamadas con una conexión dentro de una
+transacción no se agrupan: deben ver sus propias escrituras sin confirmar, y
+las demás peticiones no.
+
+El valor se comparte entre todas las llamadas con la misma clave: no debe
+modificarse.
+"""
+
+import asyncio
+from typing import (Any, Awaitable, Callable, Dict, Generic, Hashable, List,
+                    Mapping, Optional, TypeVar)
+
+import asyncpg
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class _Batch(Generic[K, V]):
+    """Claves de un lote y futuro con sus resultados."""
+
+    __slots__ = ("keys", "future")
+
+    def __init__(self, future: "asyncio.Future[Mapping[K, V]]") -> None:
+        # Diccionario como conjunto ordenado: las claves repetidas se piden una vez
+        self.keys: Dict[K, None] = {}
+        self.future = future
+
+
+class BatchLoader(Generic[K, V]):
+    """
+    Resuelve en lotes las búsquedas por clave hechas en la misma ventana.
+
+    Atributos:
+        name (str): Nombre con el que se publican sus métricas.
+        load_many (Callable[[List[K], Optional[asyncpg.Connection]],
+            Awaitable[Mapping[K, V]]]): Consulta de un lote; retorna los
+            valores encontrados por clave.
+        window (float): Segundos que el líder espera a otras claves; con 0,
+            una vuelta del event loop.
+        max_batch_size (int): Máximo de claves por lote; al llenarse, las
+            siguientes abren otro.
+        batches (int): Lotes ejecutados.
+        keys (int): Claves pedidas en total.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        load_many: Callable[
+            [List[K], Optional[asyncpg.Connection]], Awaitable[Mapping[K, V]]
+        ],
+        window: float = 0.0,
+        max_batch_size: int = 256,
+    ) -> None:
+        self.name = name
+        self.load_many = load_many
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self.batches = 0
+        self.keys = 0
+        self._pending: Optional[_Batch[K, V]] = None
+
+    async def load(
+        self, key: K, conn: Optional[asyncpg.Connection] = None
+    ) -> Optional[V]:
+        """
+        Retorna el valor de una clave, consultándolo junto con las de su lote.
+
+        Args:
+            key (K): Clave a buscar.
+            conn (Optional[asyncpg.Connection]): Conexión de la petición; se
+                usa si esta llamada ejecuta el lote. Si es None se toma una
+                del pool.
+
+        Returns:
+            Optional[V]: El valor encontrado, o None si no existe.
+        """
+        self.keys += 1
+        if conn is not None and conn.is_in_transaction():
+            self.batches += 1
+            return (await self.load_many([key], conn)).get(key)
+
+        while self._pending is not None:
+            results = await self._join(self._pending, key)
+            if results is not None:
+                return results.get(key)
+
+        batch: _Batch[K, V] = _Batch(asyncio.get_running_loop().create_future())
+        # Evita el aviso de excepción no recuperada si nadie esperaba
+        batch.future.add_done_callback(_consume_exception)
+        batch.keys[key] = None
+        self._pending = batch
+        return (await self._lead(batch, conn)).get(key)
+
+    async def _join(self, batch: _Batch[K, V], key: K) -> Optional[Mapping[K, V]]:
+        """
+        Añade una clave a un lote pendiente y espera sus resultados.
+
+        Args:
+            batch (_Batch[K, V]): Lote abierto por otra llamada.
+            key (K): Clave a buscar.
+
+        Returns:
+            Optional[Mapping[K, V]]: Resultados del lote, o None si se canceló
+            su líder (no esta llamada) y hay que pedir la clave en otro lote.
+        """
+        batch.keys[key] = None
+        if len(batch.keys) >= self.max_batch_size:
+            self._pending = None
+        try:
+            return await asyncio.shield(batch.future)
+        except asyncio.CancelledError:
+            task = asyncio.current_task()
+            if batch.future.cancelled() and not (task and task.cancelling()):
+                return None
+            raise
+
+    async def _lead(
+        self, batch: _Batch[K, V], conn: Optional[asyncpg.Connection]
+    ) -> Mapping[K, V]:
+        """
+        Espera la ventana, ejecuta la consulta del lote y publica sus
+        resultados a las llamadas que esperan.
+
+        Args:
+            batch (_Batch[K, V]): Lote abierto por esta llamada.
+            conn (Optional[asyncpg.Connection]): Conexión de la petición; si es
+                None se toma una del pool.
+
+        Returns:
+            Mapping[K, V]: Valores encontrados por clave.
+        """
+        try:
+            await asyncio.sleep(self.window)
+            if self._pending is batch:
+                self._pending = None
+            self.batches += 1
+            results = await self.load_many(list(batch.keys), conn)
+        except asyncio.CancelledError:
+            batch.future.cancel()
+            raise
+        except BaseException as exc:
+            batch.future.set_exception(exc)
+            raise
+        finally:
+            if self._pending is batch:
+                self._pending = None
+        batch.future.set_result(results)
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna los contadores del agrupador.
+
+        Returns:
+            Dict[str, Any]: Lotes ejecutados, claves pedidas y media de claves
+            por lote.
+        """
+        return {
+            "batches": self.batches,
+            "keys": self.keys,
+            "avg_keys_per_batch": self.keys / self.batches if self.batches else 0.0,
+        }
+
+
+def _consume_exception(future: "asyncio.Future[Any]") -> None:
+    if not future.cancelled():
+        future.exception()
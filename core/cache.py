@@ -0,0 +1,107 @@
+"""
+Caché en memoria para datos de acceso frecuente.
+
+Define la clase `TTLCache`, un diccionario acotado en tamaño con expiración
+por tiempo (TTL) y desalojo LRU. Lleva contadores de aciertos, fallos y
+desalojos para poder medir su efectividad.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+
+class TTLCache(Generic[V]):
+    """
+    Caché LRU con expiración por entrada.
+
+    No es segura entre hilos: está pensada para usarse desde el event loop,
+    donde no hay concurrencia real entre corrutinas al acceder a ella.
+
+    Atributos:
+        maxsize (int): Número máximo de entradas antes de desalojar la menos usada.
+        ttl (float): Segundos de vida por defecto de cada entrada.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, V]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[V]:
+        """
+        Retorna el valor asociado a la clave si existe y no ha expirado.
+
+        Args:
+            key (Hashable): Clave a consultar.
+
+        Returns:
+            Optional[V]: El valor almacenado o None si no existe o expiró.
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: V, ttl: Optional[float] = None) -> None:
+        """
+        Almacena un valor, desalojando la entrada menos usada si se llena.
+
+        Args:
+            key (Hashable): Clave de la entrada.
+            value (V): Valor a almacenar.
+            ttl (Optional[float]): Segundos de vida; por defecto `self.ttl`.
+        """
+        if self.maxsize <= 0:
+            return
+
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: Hashable) -> None:
+        """Invalida la entrada asociada a la clave, si existe."""
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Elimina todas las entradas sin reiniciar los contadores."""
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna los contadores de uso de la caché.
+
+        Returns:
+            Dict[str, Any]: Tamaño actual, máximo, aciertos, fallos,
+            desalojos y tasa de aciertos.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
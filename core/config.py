@@ -6,6 +6,8 @@ usando Pydantic y dotenv. Permite acceder a claves secretas, URLs de base
 de datos y otros parámetros de configuración de manera tipada y validada.
 """
 
+from typing import Literal, Optional
+
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings
 
@@ -25,6 +27,60 @@ class Settings(BaseSettings):
         allowed_methods (str): Metodos permitidos para dominios permitidos
         allowed_headers (str): headers HTTP que el front puede enviar 
         database_url (str): URL de conexión a la base de datos PostgreSQL.
+        user_cache_max_size (int): Máximo de usuarios autenticados en caché.
+        user_cache_ttl_seconds (int): Segundos que un usuario permanece en caché.
+        token_cache_max_size (int): Máximo de tokens verificados en caché.
+        token_cache_ttl_seconds (int): Segundos máximos que un token verificado
+            permanece en caché (nunca más allá de su expiración).
+        auth_stateless (bool): Autentica las peticiones con los datos del
+            usuario incluidos en el JWT, sin consultar la base de datos salvo
+            para comprobar la versión del token (ver `core.dependencies`).
+        token_version_cache_max_size (int): Máximo de versiones de token en caché.
+        token_version_cache_ttl_seconds (int): Segundos que una versión de token
+            permanece en caché; acota lo que tarda en rechazarse un token
+            revocado por otro proceso.
+        user_batch_window_seconds (float): Segundos que se esperan otras
+            búsquedas de usuarios para resolverlas en una sola consulta; con 0,
+            una vuelta del event loop (ver `core.batch_loader`).
+        user_batch_max_size (int): Máximo de usuarios por consulta agrupada.
+        password_hash_workers (int): Hilos dedicados a calcular hashes de contraseñas.
+        password_hash_queue_size (int): Operaciones de hash que pueden esperar en cola.
+        products_page_size (int): Tamaño de página por defecto en listados de productos.
+        products_max_page_size (int): Tamaño de página máximo permitido.
+        products_batch_max_ids (int): IDs máximos por petición a
+            `GET /products/batch`.
+        products_search_limit (int): Resultados por defecto de
+            `GET /products/search`.
+        export_chunk_size (int): Filas por bloque leídas y enviadas al exportar productos.
+        bulk_max_items (int): Máximo de productos aceptados por carga masiva.
+        product_cache_backend (str): Caché de consultas de productos: "memory",
+            "redis" o "none" (ver `services.product_cache`).
+        product_cache_max_size (int): Máximo de resultados en la caché en memoria.
+        product_cache_ttl_seconds (int): Segundos que un resultado permanece en caché.
+        product_cache_redis_url (Optional[str]): URL del servidor compatible con
+            Redis para el almacenamiento "redis".
+        product_cache_channel (str): Canal de NOTIFY con el que se difunden las
+            invalidaciones entre workers.
+        db_pool_min_size (int): Conexiones mínimas del pool de PostgreSQL.
+        db_pool_max_size (int): Conexiones máximas del pool de PostgreSQL.
+        db_pool_acquire_timeout (float): Segundos máximos de espera por una conexión.
+        db_pool_max_queries (int): Consultas tras las que se recicla una conexión.
+        db_pool_max_inactive_connection_lifetime (float): Segundos que una
+            conexión inactiva permanece abierta.
+        db_statement_timeout_ms (int): statement_timeout de PostgreSQL (0 = sin límite).
+        db_statement_cache_size (int): Sentencias preparadas en caché por conexión.
+        db_statement_mode (str): Uso de sentencias preparadas: "session",
+            "pgbouncer" o "unprepared" (ver `db.statements`).
+        db_slow_query_ms (int): Milisegundos a partir de los que una consulta
+            se registra como lenta (0 = desactivado).
+        db_slow_query_explain_rate (float): Fracción de consultas lentas de
+            solo lectura de las que se captura EXPLAIN (ANALYZE, BUFFERS).
+        metrics_enabled (bool): Expone los endpoints internos de métricas
+            (desactivado por defecto).
+        metrics_token (Optional[str]): Si se define, los endpoints internos
+            exigen la cabecera `Authorization: Bearer <token>`.
+        json_decimal_mode (str): Salida JSON de los Decimal: "string" o
+            "number" (ver `core.responses`).
     """
 
     secret_key_jwt: str
@@ -37,6 +93,48 @@ class Settings(BaseSettings):
     allowed_methods : str
     allowed_headers : str
 
+    user_cache_max_size: int = 1024
+    user_cache_ttl_seconds: int = 60
+    token_cache_max_size: int = 4096
+    token_cache_ttl_seconds: int = 300
+    auth_stateless: bool = False
+    token_version_cache_max_size: int = 4096
+    token_version_cache_ttl_seconds: int = 30
+    user_batch_window_seconds: float = 0.0
+    user_batch_max_size: int = 256
+
+    password_hash_workers: int = 2
+    password_hash_queue_size: int = 32
+
+    products_page_size: int = 100
+    products_max_page_size: int = 1000
+    products_batch_max_ids: int = 100
+    products_search_limit: int = 20
+    export_chunk_size: int = 500
+    bulk_max_items: int = 5000
+
+    product_cache_backend: Literal["memory", "redis", "none"] = "memory"
+    product_cache_max_size: int = 1024
+    product_cache_ttl_seconds: int = 30
+    product_cache_redis_url: Optional[str] = None
+    product_cache_channel: str = "product_cache"
+
+    db_pool_min_size: int = 1
+    db_pool_max_size: int = 5
+    db_pool_acquire_timeout: float = 5.0
+    db_pool_max_queries: int = 50000
+    db_pool_max_inactive_connection_lifetime: float = 300.0
+    db_statement_timeout_ms: int = 0
+    db_statement_cache_size: int = 100
+    db_statement_mode: Literal["session", "pgbouncer", "unprepared"] = "session"
+    db_slow_query_ms: int = 500
+    db_slow_query_explain_rate: float = 0.0
+
+    metrics_enabled: bool = False
+    metrics_token: Optional[str] = None
+
+    json_decimal_mode: Literal["string", "number"] = "string"
+
     class Config:
         """
         Configuración interna de Pydantic.
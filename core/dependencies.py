@@ -4,39 +4,149 @@ Dependencias de seguridad y autenticación para la API.
 Este módulo define las funciones relacionadas con la obtención
 del usuario autenticado a partir del token JWT, utilizando
 FastAPI y el esquema OAuth2.
+
+Los usuarios autenticados se guardan en una caché en memoria por proceso,
+indexada por el `sub` del token, para no consultar la base de datos en cada
+petición. Cualquier cambio sobre un usuario debe invalidarlo con
+`invalidate_user`.
+
+Con `settings.auth_stateless`, `get_current_user` construye el usuario con los
+claims del token (`core.token.claims_user`) y solo comprueba que la versión
+del token siga vigente, consultándola en `token_version_cache` y, si no está,
+en la base de datos. En ambos modos un token con una versión antigua (emitido
+antes de cambiar el email o la contraseña) se rechaza.
+`get_current_user_record` retorna siempre el registro completo, con el hash de
+la contraseña, para los endpoints que lo necesitan.
+
+La autenticación no retiene ninguna conexión: solo si el usuario (o la
+versión de sus tokens) no está en caché se toma una del pool para consultarlo
+y se libera enseguida. `get_db_connection` adquiere una única conexión por
+petición, compartida por los servicios que la reciban, y solo deben
+declararla los handlers que consultan la base de datos.
 """
 
-from typing import Optional
+from typing import AsyncGenerator, Optional
 
+import asyncpg
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 
-from schemas.user import UserFilter, UserOut
-from services.user_service import UserService
+from db.connnection import db_management
+from schemas.user import UserClaims, UserOut
+from services.user_service import UserService, user_flight
 
-from .token import verify_token
+from .cache import TTLCache
+from .config import settings
+from .metrics import timed
+from .token import claims_user, verify_token
 
 # Esquema OAuth2 utilizado para obtener el token de acceso (Bearer)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
+# Caché de usuarios autenticados indexada por el `sub` (email) del token
+user_cache: TTLCache[UserOut] = TTLCache(
+    maxsize=settings.user_cache_max_size, ttl=settings.user_cache_ttl_seconds
+)
+
+# Caché de la versión vigente de los tokens indexada por el ID del usuario
+token_version_cache: TTLCache[int] = TTLCache(
+    maxsize=settings.token_version_cache_max_size,
+    ttl=settings.token_version_cache_ttl_seconds,
+)
+
+
+def invalidate_user(*emails: Optional[str]) -> None:
+    """
+    Elimina de la caché de usuarios autenticados las entradas indicadas y
+    desvincula sus consultas en curso.
+
+    Args:
+        *emails (Optional[str]): Emails (sub del token) a invalidar.
+    """
+    for email in emails:
+        if email:
+            user_cache.pop(email)
+            user_flight.forget(email)
+
+
+async def get_db_connection() -> AsyncGenerator[asyncpg.Connection, None]:
+    """
+    Adquiere una conexión del pool para toda la petición.
+
+    FastAPI cachea la dependencia por petición, por lo que todas las
+    dependencias y handlers que la declaran reciben la misma conexión. Se
+    libera al terminar de enviar la respuesta (también en respuestas en
+    streaming).
+
+    Las transacciones se abren explícitamente en el handler con
+    `conn.transaction()`: al liberarse después de enviar la respuesta, un
+    commit en esta dependencia podría fallar cuando el cliente ya recibió
+    una respuesta exitosa.
 
-async def get_user_email(email: str) -> Optional[UserOut]:
+    Yields:
+        asyncpg.Connection: Conexión de la petición.
+    """
+    async with db_management.get_connection() as conn:
+        yield conn
+
+
+async def get_user_email(
+    email: str, conn: Optional[asyncpg.Connection] = None
+) -> Optional[UserOut]:
     """
     Obtiene un usuario a partir de su correo electrónico.
 
+    Las búsquedas de peticiones concurrentes se resuelven en una sola
+    consulta (ver `services.user_service.users_by_email`).
+
     Args:
         email (str): Correo electrónico del usuario.
+        conn (Optional[asyncpg.Connection]): Conexión de la petición; si es
+            None se toma una del pool.
 
     Returns:
         Optional[UserOut]: El usuario encontrado o None si no existe.
     """
-    users = await UserService.get_users(UserFilter(email=email))
-    return users[0] if users else None
+    return await UserService.get_user_by_email(email, conn)
 
 
-async def get_current_user(token=Depends(oauth2_scheme)) -> UserOut:
+def credentials_exception() -> HTTPException:
+    """Retorna la excepción para credenciales no válidas."""
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+async def get_token_version(
+    user_id: int, conn: Optional[asyncpg.Connection] = None
+) -> Optional[int]:
     """
-    Retorna el usuario actual autenticado a partir del token JWT.
+    Obtiene la versión vigente de los tokens de un usuario.
+
+    Args:
+        user_id (int): ID del usuario.
+        conn (Optional[asyncpg.Connection]): Conexión de la petición; si es
+            None se toma una del pool.
+
+    Returns:
+        Optional[int]: Versión vigente, o None si el usuario no existe.
+    """
+    version = token_version_cache.get(user_id)
+    if version is None:
+        version = await UserService.get_token_version(user_id, conn)
+        if version is not None:
+            token_version_cache.set(user_id, version)
+    return version
+
+
+async def get_current_user_record(token=Depends(oauth2_scheme)) -> UserOut:
+    """
+    Retorna el registro completo del usuario autenticado.
+
+    Si no está en caché se consulta con una conexión del pool que se libera
+    al terminar la consulta.
 
     Args:
         token (str): Token JWT proporcionado en la cabecera Authorization.
@@ -45,16 +155,48 @@ async def get_current_user(token=Depends(oauth2_scheme)) -> UserOut:
         UserOut: El usuario autenticado correspondiente al token.
 
     Raises:
-        HTTPException: Si el token no es válido o el usuario no existe.
+        HTTPException: Si el token no es válido o está revocado (401).
+        HTTPException: Si el usuario no existe (404).
     """
-    credendial_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-
-    email = verify_token(token, credendial_exception)
-    user = await get_user_email(email)
-    if user is None:
-        raise HTTPException(status_code=404, detail="User not exists!!")
+    claims = verify_token(token, credentials_exception())
+    email = claims["sub"]
+    with timed("user_lookup"):
+        user = user_cache.get(email)
+        if user is None:
+            user = await get_user_email(email)
+            if user is None:
+                raise HTTPException(status_code=404, detail="User not exists!!")
+            user_cache.set(email, user)
+    if claims.get("ver", 0) != user.token_version:
+        raise credentials_exception()
     return user
+
+
+async def get_current_user(token=Depends(oauth2_scheme)) -> UserClaims:
+    """
+    Retorna el usuario actual autenticado a partir del token JWT.
+
+    Con `settings.auth_stateless` el usuario se toma de los claims del token
+    y solo se comprueba su versión; en otro caso se carga su registro. En
+    ambos casos solo se usa una conexión del pool si el dato no está en caché.
+
+    Args:
+        token (str): Token JWT proporcionado en la cabecera Authorization.
+
+    Returns:
+        UserClaims: El usuario autenticado correspondiente al token.
+
+    Raises:
+        HTTPException: Si el token no es válido o está revocado (401).
+        HTTPException: Si el usuario no existe (404).
+    """
+    if settings.auth_stateless:
+        claims = verify_token(token, credentials_exception())
+        user = claims_user(claims)
+        if user is not None:
+            with timed("user_lookup"):
+                version = await get_token_version(user.id)
+            if version != user.token_version:
+                raise credentials_exception()
+            return user
+    return await get_current_user_record(token)
@@ -0,0 +1,82 @@
+"""
+Utilidades de peticiones condicionales (ETag / If-None-Match).
+
+Los ETag se calculan a partir de una versión barata de obtener (p. ej. el
+contador de cambios de los productos de un usuario o la última modificación
+de un producto) y de los parámetros que afectan a la representación, sin
+serializar la respuesta. Si el cliente envía en `If-None-Match` el ETag
+vigente, se responde `304 Not Modified` sin cuerpo.
+
+Los ETag incluyen `settings.json_decimal_mode`, ya que cambia la
+representación de los precios.
+"""
+
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Response, status
+
+from core.config import settings
+
+# Cabeceras que acompañan a las respuestas con ETag: el cliente (o su caché)
+# debe revalidar siempre, y la respuesta es propia del usuario autenticado
+ETAG_HEADER = "ETag"
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Calcula un ETag fuerte a partir de los valores que determinan la respuesta.
+
+    Args:
+        *parts (Any): Versión de los datos y parámetros de la petición.
+
+    Returns:
+        str: ETag entre comillas.
+    """
+    raw = "|".join(str(part) for part in (settings.json_decimal_mode, *parts))
+    return f'"{hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Indica si la cabecera `If-None-Match` incluye el ETag indicado.
+
+    Usa la comparación débil que exige RFC 9110 para `If-None-Match`: se
+    ignora el prefijo `W/`.
+
+    Args:
+        if_none_match (Optional[str]): Valor de la cabecera recibida.
+        etag (str): ETag vigente.
+
+    Returns:
+        bool: True si el cliente ya tiene la representación vigente.
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def set_etag(response: Response, etag: str) -> None:
+    """Añade el ETag y la política de revalidación a una respuesta."""
+    response.headers[ETAG_HEADER] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+
+def not_modified(etag: str) -> Response:
+    """
+    Construye la respuesta `304 Not Modified` para un ETag vigente.
+
+    Args:
+        etag (str): ETag vigente.
+
+    Returns:
+        Response: Respuesta sin cuerpo con las cabeceras del ETag.
+    """
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_etag(response, etag)
+    return response
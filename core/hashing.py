@@ -0,0 +1,143 @@
+"""
+Hash de contraseñas fuera del event loop.
+
+`generate_password_hash` y `check_password_hash` de werkzeug son funciones de
+derivación de claves deliberadamente lentas. Ejecutarlas dentro de un handler
+asíncrono bloquea el event loop de uvicorn y detiene al resto de peticiones.
+
+Este módulo define `PasswordHasher`, que las ejecuta en un pool de hilos de
+tamaño fijo con una cola acotada. Cuando la cola está llena rechaza la
+operación con un 503 en lugar de acumular trabajo.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, TypeVar
+
+from fastapi import HTTPException, status
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from core.config import settings
+from core.metrics import Histogram
+
+T = TypeVar("T")
+
+
+class PasswordHasher:
+    """
+    Ejecutor acotado para operaciones de hash de contraseñas.
+
+    Atributos:
+        max_workers (int): Hilos que calculan hashes en paralelo.
+        max_queue (int): Operaciones que pueden esperar a un hilo libre.
+        wait_time (Histogram): Tiempo en cola antes de empezar a calcular.
+        latency (Histogram): Tiempo total de cada operación.
+        rejected (int): Operaciones rechazadas por cola llena.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int) -> None:
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="password-hash"
+        )
+        self._pending = 0
+        self.rejected = 0
+        self.wait_time = Histogram()
+        self.latency = Histogram()
+
+    async def _run(self, func: Callable[..., T], *args: Any) -> T:
+        """
+        Ejecuta `func` en el pool de hilos respetando el límite de la cola.
+
+        Raises:
+            HTTPException: Si la cola está llena (503).
+        """
+        if self._pending >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server busy, try again later.",
+                headers={"Retry-After": "1"},
+            )
+
+        submitted = time.perf_counter()
+        started = submitted
+
+        def task() -> T:
+            nonlocal started
+            started = time.perf_counter()
+            return func(*args)
+
+        def release() -> None:
+            self._pending -= 1
+            self.wait_time.observe(started - submitted)
+            self.latency.observe(time.perf_counter() - submitted)
+
+        loop = asyncio.get_running_loop()
+        future = self._executor.submit(task)
+        self._pending += 1
+        # La plaza se libera cuando termina el hilo (o se descarta la tarea
+        # aún en cola), no cuando se cancela quien la espera: el trabajo ya
+        # enviado sigue ocupando el pool
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(release))
+        return await asyncio.wrap_future(future, loop=loop)
+
+    async def hash(self, password: str) -> str:
+        """
+        Genera el hash de una contraseña.
+
+        Args:
+            password (str): Contraseña en texto plano.
+
+        Returns:
+            str: Hash de la contraseña.
+        """
+        return await self._run(generate_password_hash, password)
+
+    async def verify(self, password_hash: str, password: str) -> bool:
+        """
+        Comprueba una contraseña contra su hash.
+
+        Args:
+            password_hash (str): Hash almacenado.
+            password (str): Contraseña en texto plano.
+
+        Returns:
+            bool: True si la contraseña coincide.
+        """
+        return await self._run(check_password_hash, password_hash, password)
+
+    def queue_depth(self) -> int:
+        """Retorna las operaciones que esperan un hilo libre."""
+        return max(self._pending - self.max_workers, 0)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna las métricas del ejecutor.
+
+        Returns:
+            Dict[str, Any]: Operaciones en curso, profundidad de cola,
+            rechazos e histogramas de espera y latencia.
+        """
+        return {
+            "workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": min(self._pending, self.max_workers),
+            "queue_depth": self.queue_depth(),
+            "rejected": self.rejected,
+            "wait_time": self.wait_time.snapshot(),
+            "latency": self.latency.snapshot(),
+        }
+
+    def shutdown(self) -> None:
+        """Detiene el pool de hilos esperando las operaciones en curso."""
+        self._executor.shutdown(wait=True)
+
+
+# Instancia del ejecutor para uso en otros módulos
+password_hasher = PasswordHasher(
+    max_workers=settings.password_hash_workers,
+    max_queue=settings.password_hash_queue_size,
+)
@@ -0,0 +1,290 @@
+"""
+Primitivas de métricas en memoria.
+
+Define la clase `Histogram`, que acumula observaciones (normalmente
+latencias en segundos) en buckets fijos acumulativos, compatibles con el
+formato de histogramas de Prometheus.
+
+También define la medición por etapas de cada petición: el middleware
+`core.middleware.TimingMiddleware` abre un registro local a la petición
+(`start_request`) y el código del camino crítico marca sus etapas con
+`timed("sql")`, `timed("jwt")`, etc. Fuera de una petición `timed` no hace
+nada. Al terminar, `RequestMetrics` agrega la duración total y la de cada
+etapa en histogramas por ruta, y los expone en formato de texto de
+Prometheus.
+
+Las etapas pueden solaparse (p. ej. "sql" dentro de "user_lookup") y una
+etapa que se repite en la petición acumula su tiempo.
+"""
+
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import (Any, Dict, Iterable, Iterator, List, Optional, Sequence,
+                    Tuple)
+
+# Buckets por defecto en segundos, de 1 ms a 10 s
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class Histogram:
+    """
+    Histograma de buckets fijos.
+
+    Atributos:
+        buckets (Tuple[float, ...]): Límites superiores (inclusive) de cada bucket.
+        count (int): Número total de observaciones.
+        sum (float): Suma de todas las observaciones.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Registra una observación."""
+        self._counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> Dict[str, int]:
+        """
+        Retorna los conteos acumulados por límite superior.
+
+        Returns:
+            Dict[str, int]: Conteo de observaciones <= cada límite, más "+Inf".
+        """
+        result: Dict[str, int] = {}
+        total = 0
+        for bound, count in zip(self.buckets, self._counts):
+            total += count
+            result[repr(bound)] = total
+        result["+Inf"] = self.count
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Retorna un resumen serializable del histograma.
+
+        Returns:
+            Dict[str, Any]: count, sum, media y buckets acumulados.
+        """
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "avg": self.sum / self.count if self.count else 0.0,
+            "buckets": self.cumulative(),
+        }
+
+
+# Segundos acumulados por etapa de la petición en curso
+_request_stages: ContextVar[Optional[Dict[str, float]]] = ContextVar(
+    "request_stages", default=None
+)
+
+
+def start_request() -> Tuple[Dict[str, float], Token]:
+    """
+    Abre el registro de etapas de una petición en el contexto actual.
+
+    Returns:
+        Tuple[Dict[str, float], Token]: Registro de etapas y token para
+        restaurar el contexto con `end_request`.
+    """
+    stages: Dict[str, float] = {}
+    return stages, _request_stages.set(stages)
+
+
+def end_request(token: Token) -> None:
+    """Cierra el registro de etapas abierto con `start_request`."""
+    _request_stages.reset(token)
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    """
+    Mide el bloque como parte de la etapa `stage` de la petición en curso.
+
+    Args:
+        stage (str): Nombre de la etapa (p. ej. "sql", "jwt").
+    """
+    stages = _request_stages.get()
+    if stages is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stages[stage] = stages.get(stage, 0.0) + time.perf_counter() - start
+
+
+def _escape(value: str) -> str:
+    """Escapa el valor de una etiqueta de Prometheus."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    """Formatea un conjunto de etiquetas de Prometheus."""
+    pairs = ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items())
+    return "{" + pairs + "}"
+
+
+def format_histogram(
+    name: str, help_text: str, series: Iterable[Tuple[Dict[str, str], Histogram]]
+) -> List[str]:
+    """
+    Formatea histogramas en texto de Prometheus.
+
+    Args:
+        name (str): Nombre de la métrica.
+        help_text (str): Descripción de la métrica.
+        series (Iterable[Tuple[Dict[str, str], Histogram]]): Etiquetas e
+            histograma de cada serie.
+
+    Returns:
+        List[str]: Líneas de la métrica.
+    """
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for labels, histogram in series:
+        for bound, count in histogram.cumulative().items():
+            lines.append(f"{name}_bucket{_labels({**labels, 'le': bound})} {count}")
+        lines.append(f"{name}_sum{_labels(labels)} {histogram.sum}")
+        lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+    return lines
+
+
+def format_sample(
+    name: str,
+    metric_type: str,
+    help_text: str,
+    series: Iterable[Tuple[Dict[str, str], float]],
+) -> List[str]:
+    """
+    Formatea contadores o gauges en texto de Prometheus.
+
+    Args:
+        name (str): Nombre de la métrica.
+        metric_type (str): "counter" o "gauge".
+        help_text (str): Descripción de la métrica.
+        series (Iterable[Tuple[Dict[str, str], float]]): Etiquetas y valor de
+            cada serie.
+
+    Returns:
+        List[str]: Líneas de la métrica.
+    """
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+    for labels, value in series:
+        lines.append(f"{name}{_labels(labels) if labels else ''} {value}")
+    return lines
+
+
+class RequestMetrics:
+    """
+    Agregado de latencias por ruta y por etapa.
+
+    Las rutas se identifican por su plantilla (`/products/{product_id}`), no
+    por la URL, para acotar el número de series.
+
+    Atributos:
+        requests (Dict[Tuple[str, str], Histogram]): Duración total por
+            (método, ruta).
+        stages (Dict[Tuple[str, str, str], Histogram]): Duración por
+            (método, ruta, etapa).
+        responses (Dict[Tuple[str, str, str], int]): Respuestas por
+            (método, ruta, código de estado).
+    """
+
+    def __init__(self) -> None:
+        self.requests: Dict[Tuple[str, str], Histogram] = {}
+        self.stages: Dict[Tuple[str, str, str], Histogram] = {}
+        self.responses: Dict[Tuple[str, str, str], int] = {}
+
+    def observe(
+        self,
+        method: str,
+        route: str,
+        status_code: int,
+        elapsed: float,
+        stages: Dict[str, float],
+    ) -> None:
+        """
+        Registra una petición terminada.
+
+        Args:
+            method (str): Método HTTP.
+            route (str): Plantilla de la ruta.
+            status_code (int): Código de estado de la respuesta.
+            elapsed (float): Duración total en segundos.
+            stages (Dict[str, float]): Segundos acumulados por etapa.
+        """
+        key = (method, route)
+        histogram = self.requests.get(key)
+        if histogram is None:
+            histogram = self.requests[key] = Histogram()
+        histogram.observe(elapsed)
+
+        for stage, seconds in stages.items():
+            stage_key = (method, route, stage)
+            histogram = self.stages.get(stage_key)
+            if histogram is None:
+                histogram = self.stages[stage_key] = Histogram()
+            histogram.observe(seconds)
+
+        response_key = (method, route, str(status_code))
+        self.responses[response_key] = self.responses.get(response_key, 0) + 1
+
+    def render(self) -> List[str]:
+        """
+        Retorna las métricas de peticiones en texto de Prometheus.
+
+        Returns:
+            List[str]: Líneas de las métricas.
+        """
+        lines = format_histogram(
+            "http_request_duration_seconds",
+            "Total request latency by route.",
+            (
+                ({"method": method, "route": route}, histogram)
+                for (method, route), histogram in sorted(self.requests.items())
+            ),
+        )
+        lines += format_histogram(
+            "http_request_stage_duration_seconds",
+            "Time spent in each request stage by route.",
+            (
+                ({"method": method, "route": route, "stage": stage}, histogram)
+                for (method, route, stage), histogram in sorted(self.stages.items())
+            ),
+        )
+        lines += format_sample(
+            "http_responses_total",
+            "counter",
+            "Responses by route and status code.",
+            (
+                ({"method": method, "route": route, "status": code}, count)
+                for (method, route, code), count in sorted(self.responses.items())
+            ),
+        )
+        return lines
+
+
+# Instancia del agregado para uso en otros módulos
+request_metrics = RequestMetrics()
@@ -0,0 +1,58 @@
+"""
+Middlewares de la aplicación.
+
+Define `TimingMiddleware`, un middleware ASGI puro (sin `BaseHTTPMiddleware`,
+que añade una tarea y copias de la respuesta por petición) que mide cada
+petición HTTP y sus etapas (ver `core.metrics.timed`) y las agrega en
+`request_metrics`.
+
+La petición se cuenta al terminar de enviar la respuesta, por lo que las
+respuestas en streaming incluyen el tiempo de envío.
+"""
+
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.metrics import RequestMetrics, end_request, start_request
+
+# Ruta con la que se agrupan las peticiones que no coinciden con ninguna
+UNMATCHED_ROUTE = "unmatched"
+
+
+class TimingMiddleware:
+    """
+    Middleware ASGI que registra la latencia por ruta y por etapa.
+
+    Atributos:
+        app (ASGIApp): Aplicación envuelta.
+        metrics (RequestMetrics): Agregado donde se registran las peticiones.
+    """
+
+    def __init__(self, app: ASGIApp, metrics: RequestMetrics) -> None:
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        stages, token = start_request()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            end_request(token)
+            # El router guarda en el scope la ruta que atendió la petición
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            self.metrics.observe(scope["method"], route, status_code, elapsed, stages)
@@ -0,0 +1,95 @@
+"""
+Utilidades de paginación por cursor (keyset).
+
+Los listados se recorren ordenados por `id` y cada página indica, mediante un
+cursor opaco, el último `id` entregado. Así el coste de cada página no depende
+de cuántas filas hay antes de ella.
+"""
+
+import base64
+import binascii
+import json
+from typing import List, Optional, Protocol, Tuple, TypeVar
+
+from fastapi import HTTPException, status
+
+# Cabecera de respuesta que transporta el cursor de la siguiente página
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Rango de los IDs de producto (INTEGER de PostgreSQL)
+PRODUCT_ID_MIN = -(2**31)
+PRODUCT_ID_MAX = 2**31 - 1
+
+
+class _HasId(Protocol):
+    id: int
+
+
+T = TypeVar("T", bound=_HasId)
+
+
+def encode_cursor(last_id: int) -> str:
+    """
+    Codifica el último `id` entregado en un cursor opaco.
+
+    Args:
+        last_id (int): ID del último elemento de la página.
+
+    Returns:
+        str: Cursor en base64 url-safe.
+    """
+    raw = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[int]:
+    """
+    Decodifica un cursor opaco y retorna el `id` a partir del cual continuar.
+
+    Args:
+        cursor (Optional[str]): Cursor recibido del cliente.
+
+    Returns:
+        Optional[int]: ID del último elemento ya entregado, o None si no hay cursor.
+
+    Raises:
+        HTTPException: Si el cursor no es válido o su ID no es un entero de
+            32 bits (400).
+    """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        last_id = json.loads(raw)["id"]
+    except (binascii.Error, ValueError, KeyError, TypeError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor."
+        ) from exc
+    # bool es subclase de int: {"id": true} no es un cursor válido
+    if (
+        not isinstance(last_id, int)
+        or isinstance(last_id, bool)
+        or not PRODUCT_ID_MIN <= last_id <= PRODUCT_ID_MAX
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor."
+        )
+    return last_id
+
+
+def paginate(items: List[T], limit: int) -> Tuple[List[T], Optional[str]]:
+    """
+    Recorta una consulta hecha con `limit + 1` filas y calcula el siguiente cursor.
+
+    Args:
+        items (List[T]): Elementos obtenidos, ordenados por `id`.
+        limit (int): Tamaño de página solicitado.
+
+    Returns:
+        Tuple[List[T], Optional[str]]: La página y el cursor de la siguiente,
+        o None si no hay más elementos.
+    """
+    if len(items) <= limit:
+        return items, None
+    page = items[:limit]
+    return page, encode_cursor(page[-1].id)
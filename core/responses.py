@@ -0,0 +1,87 @@
+"""
+Respuestas JSON de la aplicación.
+
+Define `FastJSONResponse`, la clase de respuesta por defecto de la API, que
+serializa con orjson en lugar de `json` de la librería estándar, y la política
+de salida de los valores `Decimal` (precios), configurable con
+`settings.json_decimal_mode`:
+
+- "string" (por defecto): `"19.99"`, sin pérdida de precisión.
+- "number": `19.99`, como número JSON. Es exacto hasta 15 cifras
+  significativas, suficiente para columnas NUMERIC de precios.
+
+Los campos que deban seguir esta política se declaran con `JSONDecimal`, de
+modo que la salida es la misma por cualquier camino de serialización
+(`response_model`, `TypeAdapter.dump_json`, exportaciones).
+
+Una ruta puede volver a la respuesta estándar con `response_class=JSONResponse`.
+"""
+
+from decimal import Decimal
+from typing import Annotated, Any, Union
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, PlainSerializer
+
+from core.config import settings
+from core.metrics import timed
+
+# Opciones de orjson: fechas UTC con sufijo "Z", igual que Pydantic
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def json_decimal(value: Decimal) -> Union[str, int, float]:
+    """
+    Convierte un Decimal a su representación JSON según `json_decimal_mode`.
+
+    Args:
+        value (Decimal): Valor a convertir.
+
+    Returns:
+        Union[str, int, float]: Cadena en modo "string"; número en modo "number".
+    """
+    if settings.json_decimal_mode == "string":
+        return str(value)
+    if value == value.to_integral_value():
+        return int(value)
+    return float(value)
+
+
+# Decimal que se serializa a JSON según `json_decimal_mode`. En modo "string"
+# es el Decimal de siempre, para no añadir una llamada Python por valor.
+if settings.json_decimal_mode == "string":
+    JSONDecimal = Decimal
+else:
+    JSONDecimal = Annotated[  # type: ignore[misc]
+        Decimal, PlainSerializer(json_decimal, when_used="json")
+    ]
+
+
+def _default(obj: Any) -> Any:
+    """
+    Serializa los tipos que orjson no conoce.
+
+    Raises:
+        TypeError: Si el tipo no es serializable.
+    """
+    if isinstance(obj, BaseModel):
+        # model_dump respeta los campos excluidos (p. ej. UserOut.password)
+        return obj.model_dump()
+    if isinstance(obj, Decimal):
+        return json_decimal(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    Respuesta JSON serializada con orjson.
+
+    Acepta el contenido ya preparado por FastAPI y también modelos Pydantic,
+    Decimal y fechas sin convertir, para las respuestas que se construyen
+    directamente en los handlers.
+    """
+
+    def render(self, content: Any) -> bytes:
+        with timed("serialization"):
+            return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
@@ -0,0 +1,230 @@
+"""
+Caché de resultados de consultas con invalidación por espacio de nombres.
+
+`ResultCache` guarda resultados bajo claves agrupadas en espacios de nombres
+(p. ej. un usuario). Cada espacio tiene una generación que forma parte de la
+clave: invalidar un espacio cambia su generación, de modo que todas sus
+entradas dejan de ser alcanzables a la vez y acaban desalojadas por tamaño o
+por TTL, sin recorrer la caché.
+
+La generación se lee antes de ejecutar la consulta. Si una escritura invalida
+el espacio mientras la consulta está en curso, el resultado se guarda con la
+generación anterior y nunca se sirve.
+
+El almacenamiento es intercambiable (`ResultCacheBackend`):
+
+- `MemoryBackend`: `TTLCache` del proceso. Cada worker tiene su propia copia,
+  por lo que las invalidaciones deben difundirse al resto de procesos
+  (ver `services.product_cache`).
+- `RedisBackend`: cualquier cliente compatible con Redis (`get`, `set` con
+  `ex`, `incr`), compartido entre procesos. Las generaciones viven en el
+  propio Redis, así que no necesita difusión.
+"""
+
+import itertools
+import math
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from core.cache import TTLCache
+
+
+class ResultCacheBackend(ABC):
+    """
+    Almacenamiento de una `ResultCache`.
+
+    Atributos:
+        shared (bool): Si el almacenamiento es común a todos los procesos.
+    """
+
+    shared = False
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        """Retorna el valor de la clave, o None si no existe o expiró."""
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        """Guarda un valor durante `ttl` segundos."""
+
+    @abstractmethod
+    async def generation(self, namespace: Hashable) -> Hashable:
+        """Retorna la generación vigente del espacio de nombres."""
+
+    @abstractmethod
+    async def invalidate(self, namespace: Hashable) -> None:
+        """Cambia la generación del espacio de nombres."""
+
+    @abstractmethod
+    async def clear(self) -> None:
+        """Invalida todas las entradas."""
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna estadísticas propias del almacenamiento."""
+        return {}
+
+
+class MemoryBackend(ResultCacheBackend):
+    """
+    Almacenamiento en memoria del proceso.
+
+    Las generaciones salen de un contador global, así que una generación
+    desalojada se sustituye por una nueva que nunca coincide con una anterior.
+
+    Atributos:
+        entries (TTLCache[Any]): Resultados guardados.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.entries: TTLCache[Any] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._generations: TTLCache[int] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._counter = itertools.count(1)
+
+    async def get(self, key: str) -> Optional[Any]:
+        return self.entries.get(key)
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        self.entries.set(key, value, ttl=ttl)
+
+    async def generation(self, namespace: Hashable) -> Hashable:
+        generation = self._generations.get(namespace)
+        if generation is None:
+            generation = next(self._counter)
+            self._generations.set(namespace, generation)
+        return generation
+
+    async def invalidate(self, namespace: Hashable) -> None:
+        self._generations.set(namespace, next(self._counter))
+
+    async def clear(self) -> None:
+        self.entries.clear()
+        self._generations.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"size": len(self.entries), "maxsize": self.entries.maxsize}
+
+
+class RedisBackend(ResultCacheBackend):
+    """
+    Almacenamiento en un servidor compatible con Redis.
+
+    Los valores se codifican con `dumps`/`loads`; las generaciones son
+    contadores `INCR` sin expiración.
+
+    Atributos:
+        client (Any): Cliente asíncrono con `get`, `set(..., ex=...)` e `incr`
+            (p. ej. `redis.asyncio.Redis`).
+        prefix (str): Prefijo de todas las claves.
+    """
+
+    shared = True
+
+    def __init__(
+        self,
+        client: Any,
+        dumps: Callable[[Any], bytes],
+        loads: Callable[[bytes], Any],
+        prefix: str = "result_cache",
+    ) -> None:
+        self.client = client
+        self.prefix = prefix
+        self._dumps = dumps
+        self._loads = loads
+
+    async def get(self, key: str) -> Optional[Any]:
+        raw = await self.client.get(f"{self.prefix}:{key}")
+        return None if raw is None else self._loads(raw)
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        await self.client.set(
+            f"{self.prefix}:{key}", self._dumps(value), ex=max(1, math.ceil(ttl))
+        )
+
+    async def generation(self, namespace: Hashable) -> Hashable:
+        raw = await self.client.get(f"{self.prefix}:gen:{namespace}")
+        return int(raw) if raw is not None else 0
+
+    async def invalidate(self, namespace: Hashable) -> None:
+        await self.client.incr(f"{self.prefix}:gen:{namespace}")
+
+    async def clear(self) -> None:
+        """No hace nada: las generaciones compartidas siguen siendo válidas."""
+
+
+class ResultCache:
+    """
+    Caché de resultados con invalidación por espacio de nombres.
+
+    Atributos:
+        backend (ResultCacheBackend): Almacenamiento de los resultados.
+        ttl (float): Segundos de vida de cada resultado.
+        hits (int): Consultas resueltas desde la caché.
+        misses (int): Consultas que fueron a la base de datos.
+        invalidations (int): Invalidaciones de espacios de nombres.
+    """
+
+    def __init__(self, backend: ResultCacheBackend, ttl: float) -> None:
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    async def get_or_load(
+        self,
+        namespace: Hashable,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """
+        Retorna el resultado guardado o lo obtiene con `loader` y lo guarda.
+
+        El resultado guardado se comparte entre llamadas: no debe modificarse.
+
+        Args:
+            namespace (Hashable): Espacio de nombres (p. ej. el ID del usuario).
+            key (str): Clave del resultado dentro del espacio.
+            loader (Callable[[], Awaitable[Any]]): Consulta a ejecutar si no
+                está en caché.
+
+        Returns:
+            Any: Resultado de la consulta.
+        """
+        generation = await self.backend.generation(namespace)
+        full_key = f"{namespace}:{generation}:{key}"
+        value = await self.backend.get(full_key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        value = await loader()
+        await self.backend.set(full_key, value, self.ttl)
+        return value
+
+    async def invalidate(self, namespace: Hashable) -> None:
+        """Invalida todos los resultados del espacio de nombres."""
+        self.invalidations += 1
+        await self.backend.invalidate(namespace)
+
+    async def clear(self) -> None:
+        """Invalida todos los resultados."""
+        await self.backend.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna los contadores de la caché.
+
+        Returns:
+            Dict[str, Any]: Almacenamiento, aciertos, fallos, tasa de aciertos,
+            invalidaciones y estadísticas del almacenamiento.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+            **self.backend.stats(),
+        }
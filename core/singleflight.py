@@ -0,0 +1,124 @@
+"""
+Agrupación de llamadas concurrentes idénticas ("single-flight").
+
+`SingleFlight.do` ejecuta una sola vez una consulta para todas las corrutinas
+que la piden con la misma clave mientras está en curso: la primera (líder) la
+ejecuta y las demás esperan su resultado o su excepción.
+
+Cancelación:
+
+- Si se cancela una corrutina que espera, solo se cancela su espera
+  (`asyncio.shield`); la consulta del líder continúa.
+- Si se cancela el líder, se cancela su consulta (usa la conexión de su
+  petición, que se libera). Las que esperaban no reciben la cancelación:
+  vuelven a intentarlo y una de ellas pasa a ser el nuevo líder.
+
+Las claves son tuplas cuyo primer elemento es un espacio de nombres (p. ej.
+el usuario). Tras una escritura, `forget` desvincula las consultas en curso
+de ese espacio, para que quien llegue después no reciba un resultado leído
+antes de la escritura.
+
+El resultado se comparte entre todas las corrutinas: no debe modificarse.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Agrupa las llamadas concurrentes con la misma clave.
+
+    Atributos:
+        name (str): Nombre con el que se publican sus métricas.
+        calls (int): Consultas ejecutadas (como líder).
+        coalesced (int): Llamadas que esperaron la consulta de otra.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.calls = 0
+        self.coalesced = 0
+        self._in_flight: Dict[Tuple[Hashable, ...], "asyncio.Future[Any]"] = {}
+
+    async def do(
+        self, key: Tuple[Hashable, ...], func: Callable[[], Awaitable[T]]
+    ) -> T:
+        """
+        Ejecuta `func` o espera a la ejecución en curso con la misma clave.
+
+        Args:
+            key (Tuple[Hashable, ...]): Clave de la llamada; el primer elemento
+                es su espacio de nombres.
+            func (Callable[[], Awaitable[T]]): Consulta a ejecutar.
+
+        Returns:
+            T: Resultado de la consulta.
+        """
+        while True:
+            future = self._in_flight.get(key)
+            if future is None:
+                break
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                task = asyncio.current_task()
+                if future.cancelled() and not (task and task.cancelling()):
+                    # Se canceló el líder, no esta corrutina: reintentar
+                    continue
+                raise
+
+        future = asyncio.get_running_loop().create_future()
+        # Evita el aviso de excepción no recuperada si nadie esperaba
+        future.add_done_callback(_consume_exception)
+        self._in_flight[key] = future
+        self.calls += 1
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    def forget(self, namespace: Hashable) -> None:
+        """
+        Desvincula las llamadas en curso de un espacio de nombres.
+
+        Quienes ya las esperan siguen recibiendo su resultado; las llamadas
+        posteriores ejecutan una consulta nueva.
+
+        Args:
+            namespace (Hashable): Primer elemento de las claves a desvincular.
+        """
+        for key in [key for key in self._in_flight if key[0] == namespace]:
+            del self._in_flight[key]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna los contadores de la agrupación.
+
+        Returns:
+            Dict[str, Any]: Consultas ejecutadas, llamadas agrupadas y
+            consultas en curso.
+        """
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._in_flight),
+        }
+
+
+def _consume_exception(future: "asyncio.Future[Any]") -> None:
+    if not future.cancelled():
+        future.exception()
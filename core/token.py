@@ -2,60 +2,172 @@
 Proporciona funciones para crear y verificar tokens de acceso
 utilizando la librería `python-jose`. Los tokens incluyen la
 información del usuario (`sub`) y una fecha de expiración.
+
+Los tokens de acceso de un usuario llevan además su ID, sus datos de
+presentación y la versión de sus tokens (`user_claims`), lo que permite
+autenticar sin consultar la base de datos (`settings.auth_stateless`).
+
+Los tokens ya verificados se guardan en `token_cache`, indexados por el
+SHA-256 del token, con sus claims decodificados. Así las peticiones repetidas con
+el mismo token no repiten la verificación HMAC ni el parseo JSON. Una entrada
+nunca vive más allá del `exp` del token, y los tokens inválidos no se guardan.
+
+Los tokens de refresco son opacos (no JWT): una cadena aleatoria de la que la
+base de datos solo guarda su SHA-256 (ver `services.token_service`).
 """
 
+import hashlib
+import secrets
+import time
 from datetime import datetime, timedelta, timezone
-from typing import Tuple
+from typing import Any, Dict, Optional, Tuple
 
 from jose import ExpiredSignatureError, JWTError, jwt
 
+from core.cache import TTLCache
 from core.config import settings
+from core.metrics import timed
+from schemas.user import UserClaims
 
+# Caché de tokens verificados: SHA-256 del token -> claims
+token_cache: TTLCache[Dict[str, Any]] = TTLCache(
+    maxsize=settings.token_cache_max_size, ttl=settings.token_cache_ttl_seconds
+)
 
-def create_access_token(sub: str) -> Tuple[str, timedelta]:
+
+def create_access_token(
+    sub: str, claims: Optional[Dict[str, Any]] = None
+) -> Tuple[str, timedelta]:
     """
     Crea un token JWT con la información del usuario.
 
     Args:
         sub (str): Identificador del sujeto (normalmente el email o ID del usuario).
+        claims (Optional[Dict[str, Any]]): Claims adicionales (ver `user_claims`).
 
     Returns:
         Tuple[str, timedelta]: El token generado y el tiempo de expiración.
     """
-    to_encode = {"sub": sub}
     expire_delta = timedelta(minutes=settings.access_token_expire_minutes)
-    if expire_delta:
-        expire = datetime.now(timezone.utc) + expire_delta
-    else:
-        expire = datetime.now(timezone.utc) + timedelta(
-            minutes=settings.access_token_expires_minutes_refresh
-        )
-    to_encode.update({"exp": expire})
+    expire = datetime.now(timezone.utc) + expire_delta
+    to_encode = {**(claims or {}), "sub": sub, "exp": expire}
     encode_jwt = jwt.encode(to_encode, settings.secret_key_jwt, algorithm="HS256")
     return encode_jwt, expire_delta
 
 
-def verify_token(token: str, credential_exception: Exception) -> str:
+def create_refresh_token() -> Tuple[str, str, datetime]:
+    """
+    Crea un token de refresco opaco.
+
+    Returns:
+        Tuple[str, str, datetime]: El token para el cliente, su hash para la
+        base de datos y su fecha de expiración
+        (`access_token_expire_minutes_refresh`).
+    """
+    token = secrets.token_urlsafe(32)
+    expires_at = datetime.now(timezone.utc) + timedelta(
+        minutes=settings.access_token_expire_minutes_refresh
+    )
+    return token, hash_refresh_token(token), expires_at
+
+
+def hash_refresh_token(token: str) -> str:
     """
-    Verifica la validez de un token JWT y retorna el campo 'sub' si es válido.
+    Calcula el hash con el que se guarda un token de refresco.
+
+    El token tiene 256 bits aleatorios, así que basta un SHA-256 sin sal ni
+    función de derivación lenta.
+
+    Args:
+        token (str): Token de refresco en claro.
+
+    Returns:
+        str: SHA-256 del token en hexadecimal.
+    """
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def user_claims(user: UserClaims) -> Dict[str, Any]:
+    """
+    Retorna los claims con los que un token de acceso identifica al usuario.
+
+    Args:
+        user (UserClaims): Usuario autenticado.
+
+    Returns:
+        Dict[str, Any]: ID ("uid"), nombre ("given_name"), apellido
+        ("family_name") y versión de los tokens ("ver").
+    """
+    return {
+        "uid": user.id,
+        "given_name": user.first_name,
+        "family_name": user.last_name,
+        "ver": user.token_version,
+    }
+
+
+def claims_user(claims: Dict[str, Any]) -> Optional[UserClaims]:
+    """
+    Reconstruye el usuario a partir de los claims de un token verificado.
+
+    Los claims están firmados por la aplicación, así que el modelo se
+    construye sin volver a validarlos.
+
+    Args:
+        claims (Dict[str, Any]): Claims retornados por `verify_token`.
+
+    Returns:
+        Optional[UserClaims]: El usuario, o None si el token no incluye su ID
+        (tokens emitidos antes de incluirlo).
+    """
+    if "uid" not in claims:
+        return None
+    return UserClaims.model_construct(
+        id=claims["uid"],
+        email=claims["sub"],
+        first_name=claims.get("given_name"),
+        last_name=claims.get("family_name"),
+        token_version=claims.get("ver", 0),
+    )
+
+
+def verify_token(token: str, credential_exception: Exception) -> Dict[str, Any]:
+    """
+    Verifica la validez de un token JWT y retorna sus claims si es válido.
+
+    Consulta primero `token_cache`; si el token no está, lo decodifica y lo
+    guarda hasta su expiración (como máximo `token_cache_ttl_seconds`).
 
     Args:
         token (str): Token JWT recibido en la cabecera de autorización.
         credential_exception (Exception): Excepción a lanzar en caso de error.
 
     Returns:
-        str: El valor del campo 'sub' (identificador del usuario autenticado).
+        Dict[str, Any]: Claims del token; 'sub' identifica al usuario autenticado.
 
     Raises:
         credential_exception: Si el token ha expirado, es inválido o no contiene 'sub'.
     """
+    key = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(key)
+    if payload is not None:
+        return payload
+
     try:
-        payload = jwt.decode(token, settings.secret_key_jwt, algorithms=["HS256"])
-        sub = payload.get("sub")
-        if sub is None:
+        with timed("jwt"):
+            payload = jwt.decode(
+                token, settings.secret_key_jwt, algorithms=["HS256"]
+            )
+        if payload.get("sub") is None:
             raise credential_exception
     except ExpiredSignatureError as exc:
         raise credential_exception from exc
     except JWTError as exc:
         raise credential_exception from exc
-    return sub
+
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        remaining = exp - time.time()
+        if remaining > 0:
+            token_cache.set(key, payload, ttl=min(remaining, token_cache.ttl))
+    return payload
@@ -3,15 +3,35 @@ Módulo de gestión de conexiones a PostgreSQL utilizando asyncpg.
 
 Proporciona una clase `DBManagement` que maneja un pool de conexiones
 asíncronas, permitiendo conectarse, desconectarse y obtener conexiones
-de manera segura mediante un context manager.
+de manera segura mediante un context manager. Una conexión ya adquirida
+puede reutilizarse para que varias consultas de una petición compartan
+la misma conexión.
+
+Los parámetros del pool se leen de `core.config.Settings`. La espera por una
+conexión está acotada por `db_pool_acquire_timeout`; al superarse se lanza
+`PoolAcquireTimeout`, que la API traduce a un 503. `DBManagement.stats()`
+expone el estado del pool y el histograma de espera.
+
+Las conexiones del pool preparan las sentencias del registro
+(`db.statements`) según `db_statement_mode`. El registro de consultas lentas
+(`db.slow_queries`) usa el mismo pool para capturar planes de ejecución.
 """
 
+import asyncio
+import time
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator, Optional
+from typing import Any, AsyncGenerator, Dict, Optional
 
 import asyncpg
 
 from core.config import settings
+from core.metrics import Histogram, timed
+from db.slow_queries import slow_query_log
+from db.statements import statement_registry
+
+
+class PoolAcquireTimeout(Exception):
+    """No se obtuvo una conexión del pool dentro del tiempo permitido."""
 
 
 class DBManagement:
@@ -19,33 +39,109 @@ class DBManagement:
 
     def __init__(self) -> None:
         self.pool: Optional[asyncpg.Pool] = None
+        self.acquire_wait = Histogram()
+        self.acquire_timeouts = 0
+        self._waiting = 0
+        self._in_use = 0
 
     async def connect_to_db(self) -> None:
         """Crea el pool de conexiones a PostgreSQL."""
+        server_settings = {}
+        if settings.db_statement_timeout_ms:
+            server_settings["statement_timeout"] = str(settings.db_statement_timeout_ms)
+
+        statement_cache_size = statement_registry.statement_cache_size(
+            settings.db_statement_cache_size
+        )
+
         self.pool = await asyncpg.create_pool(
             settings.database_url,
-            min_size=1,
-            max_size=5,
+            min_size=settings.db_pool_min_size,
+            max_size=settings.db_pool_max_size,
+            max_queries=settings.db_pool_max_queries,
+            max_inactive_connection_lifetime=(
+                settings.db_pool_max_inactive_connection_lifetime
+            ),
+            statement_cache_size=statement_cache_size,
+            server_settings=server_settings,
+            init=statement_registry.init_connection,
         )
+        slow_query_log.pool = self.pool
         print("Conectado a PostgreSQL")
 
     async def disconnect_from_db(self) -> None:
         """Cierra el pool de conexiones a PostgreSQL."""
         if self.pool:
+            slow_query_log.pool = None
             await self.pool.close()
             print("Conexión a PostgreSQL cerrada")
 
     @asynccontextmanager
-    async def get_connection(self) -> AsyncGenerator[asyncpg.Connection, None]:
-        """Obtiene una conexión del pool como context manager."""
+    async def get_connection(
+        self, conn: Optional[asyncpg.Connection] = None
+    ) -> AsyncGenerator[asyncpg.Connection, None]:
+        """
+        Obtiene una conexión del pool como context manager.
+
+        Si se recibe una conexión ya adquirida (por ejemplo, la de la petición
+        en curso) se reutiliza tal cual y no se libera al salir.
+
+        Args:
+            conn (Optional[asyncpg.Connection]): Conexión existente a reutilizar.
+
+        Raises:
+            RuntimeError: Si el pool no está inicializado.
+            PoolAcquireTimeout: Si no hay conexión libre dentro del tiempo límite.
+        """
+        if conn is not None:
+            yield conn
+            return
+
         if self.pool is None:
             raise RuntimeError("Pool de conexiones no inicializado")
 
-        conn = await self.pool.acquire()
+        start = time.perf_counter()
+        self._waiting += 1
+        try:
+            with timed("pool_acquire"):
+                conn = await self.pool.acquire(
+                    timeout=settings.db_pool_acquire_timeout
+                )
+        except asyncio.TimeoutError as exc:
+            self.acquire_timeouts += 1
+            raise PoolAcquireTimeout(
+                "Tiempo de espera agotado al obtener una conexión"
+            ) from exc
+        finally:
+            self._waiting -= 1
+            self.acquire_wait.observe(time.perf_counter() - start)
+
+        self._in_use += 1
         try:
             yield conn
         finally:
+            self._in_use -= 1
             await self.pool.release(conn)
 
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna el estado actual del pool.
+
+        Returns:
+            Dict[str, Any]: Tamaño, conexiones libres y en uso, peticiones en
+            espera, timeouts y el histograma de espera por conexión.
+        """
+        pool = self.pool
+        return {
+            "size": pool.get_size() if pool else 0,
+            "min_size": settings.db_pool_min_size,
+            "max_size": settings.db_pool_max_size,
+            "idle": pool.get_idle_size() if pool else 0,
+            "in_use": self._in_use,
+            "waiters": self._waiting,
+            "acquire_timeouts": self.acquire_timeouts,
+            "acquire_wait": self.acquire_wait.snapshot(),
+        }
+
 
 db_management = DBManagement()
@@ -0,0 +1,48 @@
+"""
+Aplicación de migraciones SQL.
+
+Ejecuta en orden los archivos `db/migrations/NNNN_descripcion.sql` que aún no
+se han aplicado, registrando cada versión en la tabla `schema_migrations`.
+Cada migración se aplica dentro de su propia transacción.
+
+Uso:
+    python -m db.migrate
+"""
+
+import asyncio
+from pathlib import Path
+
+import asyncpg
+
+from core.config import settings
+
+MIGRATIONS_DIR = Path(__file__).parent / "migrations"
+
+
+async def migrate() -> None:
+    """Aplica las migraciones pendientes sobre `settings.database_url`."""
+    conn = await asyncpg.connect(settings.database_url)
+    try:
+        await conn.execute(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "version TEXT PRIMARY KEY, "
+            "applied_at TIMESTAMPTZ NOT NULL DEFAULT NOW());"
+        )
+        rows = await conn.fetch("SELECT version FROM schema_migrations;")
+        applied = {row["version"] for row in rows}
+
+        for path in sorted(MIGRATIONS_DIR.glob("*.sql")):
+            if path.stem in applied:
+                continue
+            async with conn.transaction():
+                await conn.execute(path.read_text(encoding="utf-8"))
+                await conn.execute(
+                    "INSERT INTO schema_migrations (version) VALUES ($1);", path.stem
+                )
+            print(f"Migración aplicada: {path.name}")
+    finally:
+        await conn.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
@@ -0,0 +1,9 @@
+-- Unicidad del nombre de producto por usuario.
+--
+-- Permite resolver duplicados en la base de datos con
+-- `ON CONFLICT (user_id, name)` en lugar de consultarlos antes de insertar.
+-- Si ya existen productos duplicados para un mismo usuario la migración
+-- falla y deben depurarse antes de aplicarla.
+
+CREATE UNIQUE INDEX IF NOT EXISTS products_user_id_name_key
+    ON products (user_id, name);
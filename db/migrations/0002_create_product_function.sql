@@ -0,0 +1,21 @@
+-- Creación de productos en una sola sentencia.
+--
+-- Inserta el producto y lo retorna completo. Si ya existe uno con el mismo
+-- nombre para el usuario (índice products_user_id_name_key) no retorna filas,
+-- lo que la API interpreta como conflicto sin consultas previas y sin
+-- condiciones de carrera entre creaciones concurrentes.
+
+CREATE OR REPLACE FUNCTION create_product(
+    p_name TEXT,
+    p_stock INTEGER,
+    p_price NUMERIC,
+    p_user_id INTEGER
+)
+RETURNS SETOF products
+LANGUAGE sql
+AS $$
+    INSERT INTO products (name, stock, price, user_id)
+    VALUES (p_name, p_stock, p_price, p_user_id)
+    ON CONFLICT (user_id, name) DO NOTHING
+    RETURNING *;
+$$;
@@ -0,0 +1,48 @@
+-- Actualización y eliminación de productos en una sola sentencia.
+--
+-- Ambas funciones comprueban la propiedad del producto (id + user_id) en la
+-- misma sentencia que lo modifica. update_product delega la unicidad del
+-- nombre en el índice products_user_id_name_key.
+--
+-- update_product retorna 'updated', 'not_found' o 'conflict'.
+-- delete_product retorna TRUE si eliminó el producto.
+
+CREATE OR REPLACE FUNCTION update_product(
+    p_name TEXT,
+    p_stock INTEGER,
+    p_price NUMERIC,
+    p_user_id INTEGER,
+    p_id INTEGER
+)
+RETURNS TEXT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_id INTEGER;
+BEGIN
+    UPDATE products
+    SET name = p_name, stock = p_stock, price = p_price, updated_at = NOW()
+    WHERE id = p_id AND user_id = p_user_id
+    RETURNING id INTO v_id;
+
+    IF v_id IS NULL THEN
+        RETURN 'not_found';
+    END IF;
+    RETURN 'updated';
+EXCEPTION
+    WHEN unique_violation THEN
+        RETURN 'conflict';
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION delete_product(p_id INTEGER, p_user_id INTEGER)
+RETURNS BOOLEAN
+LANGUAGE sql
+AS $$
+    WITH deleted AS (
+        DELETE FROM products
+        WHERE id = p_id AND user_id = p_user_id
+        RETURNING id
+    )
+    SELECT EXISTS (SELECT 1 FROM deleted);
+$$;
@@ -0,0 +1,108 @@
+-- Tokens de refresco.
+--
+-- Solo se guarda el SHA-256 (hex) de cada token; el token en claro se
+-- entrega una única vez al cliente. Cada uso rota el token: el anterior queda
+-- revocado y se emite uno nuevo en la misma sentencia.
+--
+-- Si se presenta un token que ya fue rotado (reutilización de un token
+-- robado), se revocan todos los tokens activos del usuario. Los tokens
+-- revocados de forma explícita (cierre de sesión, cambio de contraseña)
+-- simplemente dejan de ser válidos.
+--
+-- rotate_refresh_token retorna el usuario dueño del token, o ninguna fila si
+-- el token no existe, está revocado o ha expirado.
+
+CREATE TABLE IF NOT EXISTS refresh_tokens (
+    id BIGSERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+    token_hash TEXT NOT NULL UNIQUE,
+    expires_at TIMESTAMPTZ NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    revoked_at TIMESTAMPTZ,
+    replaced_by BIGINT REFERENCES refresh_tokens (id) ON DELETE SET NULL
+);
+
+CREATE INDEX IF NOT EXISTS refresh_tokens_user_id_idx
+    ON refresh_tokens (user_id)
+    WHERE revoked_at IS NULL;
+
+CREATE OR REPLACE FUNCTION insert_refresh_token(
+    p_user_id INTEGER,
+    p_token_hash TEXT,
+    p_expires_at TIMESTAMPTZ
+)
+RETURNS VOID
+LANGUAGE sql
+AS $$
+    INSERT INTO refresh_tokens (user_id, token_hash, expires_at)
+    VALUES (p_user_id, p_token_hash, p_expires_at);
+$$;
+
+CREATE OR REPLACE FUNCTION rotate_refresh_token(
+    p_token_hash TEXT,
+    p_new_token_hash TEXT,
+    p_expires_at TIMESTAMPTZ
+)
+RETURNS SETOF users
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_token refresh_tokens%ROWTYPE;
+    v_new_id BIGINT;
+BEGIN
+    SELECT * INTO v_token
+    FROM refresh_tokens
+    WHERE token_hash = p_token_hash
+    FOR UPDATE;
+
+    IF NOT FOUND THEN
+        RETURN;
+    END IF;
+
+    IF v_token.replaced_by IS NOT NULL THEN
+        UPDATE refresh_tokens
+        SET revoked_at = NOW()
+        WHERE user_id = v_token.user_id AND revoked_at IS NULL;
+        RETURN;
+    END IF;
+
+    IF v_token.revoked_at IS NOT NULL OR v_token.expires_at <= NOW() THEN
+        RETURN;
+    END IF;
+
+    INSERT INTO refresh_tokens (user_id, token_hash, expires_at)
+    VALUES (v_token.user_id, p_new_token_hash, p_expires_at)
+    RETURNING id INTO v_new_id;
+    UPDATE refresh_tokens
+    SET revoked_at = NOW(), replaced_by = v_new_id
+    WHERE id = v_token.id;
+
+    RETURN QUERY SELECT * FROM users WHERE id = v_token.user_id;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION revoke_refresh_token(p_token_hash TEXT)
+RETURNS BOOLEAN
+LANGUAGE sql
+AS $$
+    WITH revoked AS (
+        UPDATE refresh_tokens
+        SET revoked_at = NOW()
+        WHERE token_hash = p_token_hash AND revoked_at IS NULL
+        RETURNING id
+    )
+    SELECT EXISTS (SELECT 1 FROM revoked);
+$$;
+
+CREATE OR REPLACE FUNCTION revoke_user_refresh_tokens(p_user_id INTEGER)
+RETURNS INTEGER
+LANGUAGE sql
+AS $$
+    WITH revoked AS (
+        UPDATE refresh_tokens
+        SET revoked_at = NOW()
+        WHERE user_id = p_user_id AND revoked_at IS NULL
+        RETURNING id
+    )
+    SELECT COUNT(*)::INTEGER FROM revoked;
+$$;
@@ -0,0 +1,36 @@
+-- Versión de los tokens de acceso de cada usuario.
+--
+-- Los JWT llevan la versión vigente al emitirse (claim "ver"); un token con
+-- una versión distinta de la del usuario se rechaza. El trigger incrementa
+-- la versión cuando cambia el email o la contraseña, de modo que cualquier
+-- actualización de credenciales revoca los tokens emitidos antes.
+
+ALTER TABLE users
+    ADD COLUMN IF NOT EXISTS token_version INTEGER NOT NULL DEFAULT 0;
+
+CREATE OR REPLACE FUNCTION bump_user_token_version()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF NEW.email IS DISTINCT FROM OLD.email
+        OR NEW.password IS DISTINCT FROM OLD.password THEN
+        NEW.token_version := OLD.token_version + 1;
+    END IF;
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS users_token_version ON users;
+CREATE TRIGGER users_token_version
+    BEFORE UPDATE OF email, password ON users
+    FOR EACH ROW
+    EXECUTE FUNCTION bump_user_token_version();
+
+CREATE OR REPLACE FUNCTION get_user_token_version(p_user_id INTEGER)
+RETURNS INTEGER
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT token_version FROM users WHERE id = p_user_id;
+$$;
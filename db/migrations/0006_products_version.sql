@@ -0,0 +1,16 @@
+-- Versión de los productos de un usuario para peticiones condicionales.
+--
+-- Retorna el número de productos del usuario y su última modificación
+-- (COALESCE(updated_at, created_at)). Cualquier creación, actualización o
+-- eliminación cambia al menos uno de los dos valores, por lo que la API los
+-- usa para calcular el ETag del listado sin leer ni serializar las filas.
+
+CREATE OR REPLACE FUNCTION get_products_version(p_user_id INTEGER)
+RETURNS TABLE (row_count BIGINT, last_modified TIMESTAMPTZ)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT COUNT(*), MAX(COALESCE(updated_at, created_at))
+    FROM products
+    WHERE user_id = p_user_id;
+$$;
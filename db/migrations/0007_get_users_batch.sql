@@ -0,0 +1,22 @@
+-- Búsqueda de varios usuarios en una sola consulta.
+--
+-- La API agrupa las búsquedas de usuarios por email (autenticación) y por ID
+-- (versión del token) hechas por peticiones concurrentes y las resuelve con
+-- estas funciones (ver `core.batch_loader`). Las claves que no existen
+-- simplemente no aparecen en el resultado.
+
+CREATE OR REPLACE FUNCTION get_users_by_emails(p_emails TEXT[])
+RETURNS SETOF users
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT * FROM users WHERE email = ANY(p_emails);
+$$;
+
+CREATE OR REPLACE FUNCTION get_users_by_ids(p_ids INTEGER[])
+RETURNS SETOF users
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT * FROM users WHERE id = ANY(p_ids);
+$$;
@@ -0,0 +1,17 @@
+-- Lectura de varios productos de un usuario en una sola consulta.
+--
+-- Usada por `GET /products/batch`: retorna, ordenados por ID, los productos
+-- del usuario cuyos IDs están en la lista. Los IDs que no existen o son de
+-- otro usuario no aparecen en el resultado. La búsqueda usa la clave
+-- primaria.
+
+CREATE OR REPLACE FUNCTION get_products_by_ids(p_ids INTEGER[], p_user_id INTEGER)
+RETURNS SETOF products
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT *
+    FROM products
+    WHERE id = ANY(p_ids) AND user_id = p_user_id
+    ORDER BY id;
+$$;
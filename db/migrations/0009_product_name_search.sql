@@ -0,0 +1,82 @@
+-- Búsqueda de productos por nombre con índices.
+--
+-- `get_search_products` filtra con ILIKE '%...%', que sin índice recorre
+-- todos los productos del usuario. Esta migración añade:
+--
+-- - Un índice GIN de trigramas (pg_trgm) sobre el nombre. Lo usan ILIKE
+--   (también el de `get_search_products`) y el operador de similitud por
+--   palabras `<%`.
+-- - Un índice B-tree (user_id, lower(name)) con `text_pattern_ops` para la
+--   búsqueda por prefijo sin distinguir mayúsculas, que recorre solo el rango
+--   del prefijo y ya en orden alfabético.
+-- - `search_products`, con tres modos:
+--   - "prefix": nombres que empiezan por el texto, en orden alfabético.
+--   - "fuzzy": nombres con alguna palabra parecida al texto (tolera errores
+--     de escritura), de más a menos parecidos. El umbral es
+--     `pg_trgm.word_similarity_threshold` (0.6 por defecto).
+--   - "ranked": unión de las coincidencias parciales y las parecidas,
+--     ordenadas por coincidencia exacta, prefijo y similitud.
+--
+-- Los índices se crean dentro de la transacción de la migración y bloquean
+-- las escrituras sobre `products` mientras se construyen. En tablas grandes
+-- puede preferirse crearlos antes a mano con CREATE INDEX CONCURRENTLY y los
+-- mismos nombres: IF NOT EXISTS los respeta.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS products_name_trgm_idx
+    ON products USING GIN (name gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS products_user_id_lower_name_idx
+    ON products (user_id, lower(name) text_pattern_ops);
+
+CREATE OR REPLACE FUNCTION search_products(
+    p_user_id INTEGER,
+    p_query TEXT,
+    p_mode TEXT,
+    p_limit INTEGER
+)
+RETURNS SETOF products
+LANGUAGE plpgsql
+STABLE
+AS $$
+DECLARE
+    v_query TEXT := lower(btrim(p_query));
+    -- Texto escapado para usarlo literalmente dentro de un patrón ILIKE
+    v_pattern TEXT := replace(replace(replace(
+        lower(btrim(p_query)), '\', '\\'), '%', '\%'), '_', '\_');
+BEGIN
+    IF p_mode = 'prefix' THEN
+        -- Rango [texto, texto || U+10FFFF) en orden de bytes: indexable
+        -- también con el texto como parámetro, a diferencia de LIKE 'x%'
+        RETURN QUERY
+            SELECT p.*
+            FROM products AS p
+            WHERE p.user_id = p_user_id
+                AND lower(p.name) ~>=~ v_query
+                AND lower(p.name) ~<~ (v_query || chr(1114111))
+            ORDER BY lower(p.name) USING ~<~, p.id
+            LIMIT p_limit;
+    ELSIF p_mode = 'fuzzy' THEN
+        RETURN QUERY
+            SELECT p.*
+            FROM products AS p
+            WHERE p.user_id = p_user_id
+                AND v_query <% p.name
+            ORDER BY word_similarity(v_query, p.name) DESC, p.id
+            LIMIT p_limit;
+    ELSE
+        RETURN QUERY
+            SELECT p.*
+            FROM products AS p
+            WHERE p.user_id = p_user_id
+                AND (p.name ILIKE '%' || v_pattern || '%' OR v_query <% p.name)
+            ORDER BY
+                lower(p.name) = v_query DESC,
+                starts_with(lower(p.name), v_query) DESC,
+                word_similarity(v_query, p.name) DESC,
+                p.id
+            LIMIT p_limit;
+    END IF;
+END;
+$$;
@@ -0,0 +1,73 @@
+-- Paginación por cursor dentro de get_products y get_search_products.
+--
+-- Ambas funciones reciben además `p_limit` (máximo de filas, NULL sin
+-- límite) y `p_after_id` (último ID ya entregado, NULL desde el principio) y
+-- aplican `id > p_after_id ORDER BY id LIMIT p_limit` en su propia consulta.
+-- Filtrar y limitar el resultado de la función desde fuera obligaba a
+-- producir todos los productos del usuario en cada página.
+--
+-- El índice (user_id, id) permite leer cada página en orden a partir del
+-- cursor sin recorrer las anteriores.
+--
+-- Las versiones de siete parámetros se conservan para las instancias que
+-- sigan en ejecución durante el despliegue; pueden eliminarse después.
+
+CREATE INDEX IF NOT EXISTS products_user_id_id_idx ON products (user_id, id);
+
+CREATE OR REPLACE FUNCTION get_products(
+    p_name TEXT,
+    p_stock INTEGER,
+    p_price NUMERIC,
+    p_id INTEGER,
+    p_created TIMESTAMPTZ,
+    p_updated TIMESTAMPTZ,
+    p_user_id INTEGER,
+    p_limit INTEGER,
+    p_after_id INTEGER
+)
+RETURNS SETOF products
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT *
+    FROM products
+    WHERE (p_name IS NULL OR name = p_name)
+        AND (p_stock IS NULL OR stock = p_stock)
+        AND (p_price IS NULL OR price = p_price)
+        AND (p_id IS NULL OR id = p_id)
+        AND (p_created IS NULL OR created_at >= p_created)
+        AND (p_updated IS NULL OR updated_at >= p_updated)
+        AND (p_user_id IS NULL OR user_id = p_user_id)
+        AND (p_after_id IS NULL OR id > p_after_id)
+    ORDER BY id
+    LIMIT p_limit;
+$$;
+
+CREATE OR REPLACE FUNCTION get_search_products(
+    p_name TEXT,
+    p_stock INTEGER,
+    p_price NUMERIC,
+    p_id INTEGER,
+    p_created TIMESTAMPTZ,
+    p_updated TIMESTAMPTZ,
+    p_user_id INTEGER,
+    p_limit INTEGER,
+    p_after_id INTEGER
+)
+RETURNS SETOF products
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT *
+    FROM products
+    WHERE (p_name IS NULL OR name ILIKE '%' || p_name || '%')
+        AND (p_stock IS NULL OR stock = p_stock)
+        AND (p_price IS NULL OR price = p_price)
+        AND (p_id IS NULL OR id = p_id)
+        AND (p_created IS NULL OR created_at >= p_created)
+        AND (p_updated IS NULL OR updated_at >= p_updated)
+        AND (p_user_id IS NULL OR user_id = p_user_id)
+        AND (p_after_id IS NULL OR id > p_after_id)
+    ORDER BY id
+    LIMIT p_limit;
+$$;
@@ -0,0 +1,80 @@
+-- Contador de versión de los productos de cada usuario.
+--
+-- El ETag del listado se calculaba con COUNT(*) y
+-- MAX(COALESCE(updated_at, created_at)). Ambos pueden repetirse después de
+-- un cambio: NOW() es la hora de inicio de la transacción, así que una
+-- escritura que empezó antes que la última confirmada no mueve el máximo, y
+-- eliminar un producto y crear otro conserva el número de filas.
+--
+-- `product_versions` guarda un contador por usuario que incrementan, dentro
+-- de la misma transacción que la escritura, los triggers de INSERT, UPDATE y
+-- DELETE sobre `products`. Son de sentencia: una carga masiva incrementa el
+-- contador una vez por usuario afectado, no una por fila. Los contadores se
+-- actualizan en orden de `user_id` para que dos sentencias concurrentes que
+-- afectan a varios usuarios no se bloqueen mutuamente.
+--
+-- `get_products_version` retorna el contador (0 si el usuario aún no ha
+-- escrito nada desde esta migración).
+
+CREATE TABLE IF NOT EXISTS product_versions (
+    user_id INTEGER PRIMARY KEY REFERENCES users (id) ON DELETE CASCADE,
+    version BIGINT NOT NULL
+);
+
+CREATE OR REPLACE FUNCTION bump_product_versions()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO product_versions (user_id, version)
+        SELECT DISTINCT user_id, 1 FROM new_rows ORDER BY user_id
+        ON CONFLICT (user_id)
+            DO UPDATE SET version = product_versions.version + 1;
+    ELSIF TG_OP = 'UPDATE' THEN
+        INSERT INTO product_versions (user_id, version)
+        SELECT user_id, 1
+        FROM (SELECT user_id FROM new_rows UNION SELECT user_id FROM old_rows) AS changed
+        ORDER BY user_id
+        ON CONFLICT (user_id)
+            DO UPDATE SET version = product_versions.version + 1;
+    ELSE
+        INSERT INTO product_versions (user_id, version)
+        SELECT DISTINCT user_id, 1 FROM old_rows ORDER BY user_id
+        ON CONFLICT (user_id)
+            DO UPDATE SET version = product_versions.version + 1;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS products_version_insert ON products;
+CREATE TRIGGER products_version_insert
+    AFTER INSERT ON products
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_product_versions();
+
+DROP TRIGGER IF EXISTS products_version_update ON products;
+CREATE TRIGGER products_version_update
+    AFTER UPDATE ON products
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_product_versions();
+
+DROP TRIGGER IF EXISTS products_version_delete ON products;
+CREATE TRIGGER products_version_delete
+    AFTER DELETE ON products
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_product_versions();
+
+-- Cambia el tipo del resultado: no puede hacerse con CREATE OR REPLACE
+DROP FUNCTION IF EXISTS get_products_version(INTEGER);
+
+CREATE FUNCTION get_products_version(p_user_id INTEGER)
+RETURNS TABLE (version BIGINT)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT COALESCE(
+        (SELECT version FROM product_versions WHERE user_id = p_user_id), 0
+    );
+$$;
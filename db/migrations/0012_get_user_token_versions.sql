@@ -0,0 +1,22 @@
+-- Versión de los tokens de varios usuarios en una sola consulta.
+--
+-- La comprobación de tokens sin estado solo necesita `token_version`. Las
+-- búsquedas por ID de peticiones concurrentes se agrupan (ver
+-- `core.batch_loader`) y se resuelven con esta función, que lee solo el ID y
+-- la versión en lugar de las filas completas de `get_users_by_ids` (que
+-- incluyen el hash de la contraseña). Los IDs que no existen no aparecen en
+-- el resultado.
+--
+-- `get_user_token_version`, la versión de un único usuario, ya no tiene
+-- llamadas y se elimina. `get_users_by_ids` se conserva para las instancias
+-- que sigan en ejecución durante el despliegue; puede eliminarse después.
+
+CREATE OR REPLACE FUNCTION get_user_token_versions(p_ids INTEGER[])
+RETURNS TABLE (id INTEGER, token_version INTEGER)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT u.id, u.token_version FROM users AS u WHERE u.id = ANY(p_ids);
+$$;
+
+DROP FUNCTION IF EXISTS get_user_token_version(INTEGER);
@@ -0,0 +1,103 @@
+"""
+Escucha de notificaciones de PostgreSQL (`LISTEN/NOTIFY`).
+
+`NotificationListener` mantiene una conexión dedicada, fuera del pool, que
+escucha un canal y entrega cada mensaje a un callback. Si la conexión se
+pierde, reintenta conectarse. Los mensajes emitidos mientras estaba
+desconectado se pierden, así que `on_reset` se invoca al perder la conexión
+y al recuperarla, para que quien escucha descarte lo que ya no puede
+garantizar.
+
+La conexión se abre directamente contra `settings.database_url`: `LISTEN`
+no funciona a través de PgBouncer en modo transacción.
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional, Set
+
+import asyncpg
+
+logger = logging.getLogger("db.notifications")
+
+# Segundos entre reintentos de conexión
+RETRY_DELAY = 1.0
+
+
+class NotificationListener:
+    """
+    Escucha un canal de `NOTIFY` con una conexión dedicada.
+
+    Atributos:
+        channel (str): Canal escuchado.
+        on_message (Callable[[str], Awaitable[None]]): Se invoca con el
+            payload de cada notificación.
+        on_reset (Callable[[], Awaitable[None]]): Se invoca al perder y al
+            recuperar la conexión.
+        connected (bool): Si la conexión está activa.
+    """
+
+    def __init__(
+        self,
+        channel: str,
+        on_message: Callable[[str], Awaitable[None]],
+        on_reset: Callable[[], Awaitable[None]],
+    ) -> None:
+        self.channel = channel
+        self.on_message = on_message
+        self.on_reset = on_reset
+        self.connected = False
+        self._task: Optional[asyncio.Task] = None
+        self._pending: Set[asyncio.Task] = set()
+
+    def start(self, dsn: str) -> None:
+        """Empieza a escuchar en segundo plano."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(dsn))
+
+    async def stop(self) -> None:
+        """Deja de escuchar y cierra la conexión."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _notify(
+        self, _conn: asyncpg.Connection, _pid: int, _channel: str, payload: str
+    ) -> None:
+        task = asyncio.create_task(self.on_message(payload))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _run(self, dsn: str) -> None:
+        reconnecting = False
+        while True:
+            try:
+                conn = await asyncpg.connect(dsn)
+            except (OSError, asyncpg.PostgresError) as exc:
+                logger.warning("LISTEN %s: connection failed: %s", self.channel, exc)
+                await asyncio.sleep(RETRY_DELAY)
+                continue
+
+            lost = asyncio.Event()
+            conn.add_termination_listener(lambda _conn: lost.set())
+            try:
+                await conn.add_listener(self.channel, self._notify)
+                self.connected = True
+                if reconnecting:
+                    await self.on_reset()
+                await lost.wait()
+            except (OSError, asyncpg.PostgresError) as exc:
+                logger.warning("LISTEN %s: %s", self.channel, exc)
+            finally:
+                self.connected = False
+                if not conn.is_closed():
+                    await conn.close()
+
+            logger.warning("LISTEN %s: connection lost, reconnecting", self.channel)
+            reconnecting = True
+            await self.on_reset()
+            await asyncio.sleep(RETRY_DELAY)
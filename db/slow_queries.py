@@ -0,0 +1,163 @@
+"""
+Registro de consultas lentas.
+
+`StatementRegistry` informa aquí de la duración de cada sentencia. Las que
+superan `settings.db_slow_query_ms` se escriben en el logger
+`db.slow_queries` junto con sus parámetros, enmascarando emails y hashes de
+contraseña.
+
+Para una fracción (`settings.db_slow_query_explain_rate`) de las consultas
+lentas de solo lectura se captura además su plan con
+`EXPLAIN (ANALYZE, BUFFERS)`. El plan se obtiene en segundo plano, con una
+conexión propia del pool y dentro de una transacción de solo lectura que se
+revierte, de modo que no retrasa la petición original. Solo hay una captura
+en curso a la vez y, si el pool no tiene conexiones libres, se descarta.
+"""
+
+import asyncio
+import logging
+import random
+import re
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+import asyncpg
+
+from core.config import settings
+
+logger = logging.getLogger("db.slow_queries")
+
+EMAIL_RE = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+")
+# Hashes de werkzeug: "<método>$<sal>$<hash>", p. ej. "scrypt:32768:8:1$...$..."
+PASSWORD_HASH_RE = re.compile(r"^[a-z0-9]+(:[\w-]+)*\$[^$]+\$[0-9a-f]+$")
+
+# Segundos máximos de espera por una conexión para capturar un plan
+EXPLAIN_ACQUIRE_TIMEOUT = 1.0
+
+
+def redact(value: Any) -> Any:
+    """
+    Enmascara un parámetro si contiene un email o un hash de contraseña.
+
+    Los arrays (p. ej. los emails de `get_users_by_emails`) se recorren y se
+    enmascara cada elemento.
+
+    Args:
+        value (Any): Parámetro de la sentencia.
+
+    Returns:
+        Any: El valor original, un marcador `<redacted:...>` o, para un
+        array, una lista con cada elemento enmascarado.
+    """
+    if isinstance(value, (list, tuple)):
+        return [redact(item) for item in value]
+    if isinstance(value, str):
+        if PASSWORD_HASH_RE.match(value):
+            return "<redacted:password>"
+        if EMAIL_RE.search(value):
+            return "<redacted:email>"
+    return value
+
+
+class SlowQueryLog:
+    """
+    Registro de consultas lentas con captura muestreada de planes.
+
+    Atributos:
+        threshold (float): Segundos a partir de los que una consulta es lenta
+            (0 desactiva el registro).
+        explain_rate (float): Fracción de consultas lentas de solo lectura de
+            las que se captura el plan.
+        pool (Optional[asyncpg.Pool]): Pool del que se toman conexiones para
+            capturar planes; lo asigna `DBManagement` al conectar.
+        slow_queries (int): Consultas lentas registradas.
+        explains (int): Planes capturados.
+    """
+
+    def __init__(self, threshold_ms: int, explain_rate: float) -> None:
+        self.threshold = threshold_ms / 1000
+        self.explain_rate = explain_rate
+        self.pool: Optional[asyncpg.Pool] = None
+        self.slow_queries = 0
+        self.explains = 0
+        self._tasks: Set[asyncio.Task] = set()
+
+    def observe(
+        self,
+        name: str,
+        sql: str,
+        args: Sequence[Any],
+        elapsed: float,
+        read_only: bool,
+    ) -> None:
+        """
+        Registra la duración de una sentencia.
+
+        Args:
+            name (str): Nombre de la sentencia en el registro.
+            sql (str): SQL ejecutado.
+            args (Sequence[Any]): Parámetros enlazados.
+            elapsed (float): Duración en segundos.
+            read_only (bool): Si la sentencia puede repetirse con EXPLAIN ANALYZE.
+        """
+        if not self.threshold or elapsed < self.threshold:
+            return
+
+        self.slow_queries += 1
+        params = [redact(arg) for arg in args]
+        logger.warning(
+            "Slow query %s took %.1f ms, params=%r", name, elapsed * 1000, params
+        )
+
+        if (
+            read_only
+            and self.pool is not None
+            and not self._tasks
+            and random.random() < self.explain_rate
+        ):
+            task = asyncio.create_task(self._explain(name, sql, args, params))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _explain(
+        self, name: str, sql: str, args: Sequence[Any], params: List[Any]
+    ) -> None:
+        """Captura y registra el plan de ejecución de una consulta lenta."""
+        assert self.pool is not None
+        try:
+            async with self.pool.acquire(timeout=EXPLAIN_ACQUIRE_TIMEOUT) as conn:
+                transaction = conn.transaction(readonly=True)
+                await transaction.start()
+                try:
+                    rows = await conn.fetch(f"EXPLAIN (ANALYZE, BUFFERS) {sql}", *args)
+                finally:
+                    await transaction.rollback()
+        except asyncio.TimeoutError:
+            logger.info("Skipped EXPLAIN for %s: no free connection", name)
+            return
+        except Exception:  # la captura nunca debe afectar a la aplicación
+            logger.exception("EXPLAIN for %s failed", name)
+            return
+
+        self.explains += 1
+        plan = "\n".join(row[0] for row in rows)
+        logger.warning("Plan for %s, params=%r:\n%s", name, params, plan)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna los contadores del registro.
+
+        Returns:
+            Dict[str, Any]: Umbral en ms, consultas lentas y planes capturados.
+        """
+        return {
+            "threshold_ms": self.threshold * 1000,
+            "slow_queries": self.slow_queries,
+            "explains": self.explains,
+        }
+
+
+# Instancia del registro para uso en otros módulos
+slow_query_log = SlowQueryLog(
+    threshold_ms=settings.db_slow_query_ms,
+    explain_rate=settings.db_slow_query_explain_rate,
+)
@@ -0,0 +1,228 @@
+"""
+Registro de sentencias preparadas.
+
+Centraliza las llamadas a las funciones almacenadas de PostgreSQL que usan los
+servicios y permite ejecutarlas por nombre.
+
+asyncpg invalida los objetos `PreparedStatement` al devolver la conexión al
+pool, así que las sentencias se ejecutan a través de la caché de sentencias de
+cada conexión, que sí sobrevive entre adquisiciones: cada sentencia se
+analiza una vez por conexión y después solo se enlaza y ejecuta (PostgreSQL
+decide en cada ejecución si reutiliza un plan genérico, ver
+`plan_cache_mode`). El tamaño de esa caché se ajusta para que las sentencias
+registradas nunca sean desalojadas por consultas puntuales.
+
+Según `settings.db_statement_mode`:
+
+- "session": además, al abrir cada conexión del pool (callback `init`) se
+  preparan todas las sentencias en esa misma caché, de modo que ninguna
+  petición paga su preparación, y se valida que existan las funciones
+  almacenadas (y sus firmas) antes de atender peticiones.
+- "pgbouncer": igual que "session" pero sin preparación en `init`, que en
+  modo transacción podría ejecutarse en otra conexión de servidor. Requiere
+  PgBouncer 1.21 o superior con `max_prepared_statements` activado, que
+  replica las sentencias preparadas a nivel de protocolo en la conexión de
+  servidor que atiende cada transacción.
+- "unprepared": desactiva la caché de sentencias; cada llamada se analiza y
+  planifica de nuevo. Es la opción segura con versiones antiguas de PgBouncer.
+
+Cada ejecución se mide y se informa a `db.slow_queries`, que registra las
+consultas lentas y captura planes de las de solo lectura (`READ_ONLY`).
+"""
+
+import logging
+import time
+from typing import Any, Dict, FrozenSet, List, Optional
+
+import asyncpg
+
+from core.config import settings
+from core.metrics import timed
+from db.slow_queries import slow_query_log
+
+logger = logging.getLogger("db.statements")
+
+# Sentencias registradas, indexadas por nombre
+STATEMENTS: Dict[str, str] = {
+    "get_products": (
+        "SELECT * FROM get_products($1::TEXT, $2::INTEGER, $3::NUMERIC, "
+        "$4::INTEGER, $5::TIMESTAMPTZ, $6::TIMESTAMPTZ, $7::INTEGER, "
+        "$8::INTEGER, $9::INTEGER);"
+    ),
+    "get_search_products": (
+        "SELECT * FROM get_search_products($1::TEXT, $2::INTEGER, $3::NUMERIC, "
+        "$4::INTEGER, $5::TIMESTAMPTZ, $6::TIMESTAMPTZ, $7::INTEGER, "
+        "$8::INTEGER, $9::INTEGER);"
+    ),
+    "search_products": (
+        "SELECT * FROM search_products($1::INTEGER, $2::TEXT, $3::TEXT, $4::INTEGER);"
+    ),
+    "create_product": (
+        "SELECT * FROM create_product($1::TEXT, $2::INTEGER, "
+        "$3::NUMERIC, $4::INTEGER);"
+    ),
+    "update_product": (
+        "SELECT update_product($1::TEXT, $2::INTEGER,"
+        "$3::NUMERIC, $4::INTEGER, $5::INTEGER);"
+    ),
+    "delete_product": "SELECT delete_product($1::INTEGER, $2::INTEGER);",
+    "get_products_version": "SELECT * FROM get_products_version($1::INTEGER);",
+    "get_products_by_ids": (
+        "SELECT * FROM get_products_by_ids($1::INTEGER[], $2::INTEGER);"
+    ),
+    "get_users": (
+        "SELECT * FROM get_users($1::TEXT, $2::TEXT, $3::TEXT, $4::INTEGER);"
+    ),
+    "insert_user": (
+        "SELECT * FROM insert_user($1::TEXT, $2::TEXT, $3::TEXT, $4::TEXT);"
+    ),
+    "update_user": (
+        "SELECT update_user($1::TEXT, $2::TEXT, $3::TEXT, $4::INTEGER, $5::TEXT);"
+    ),
+    "insert_refresh_token": (
+        "SELECT insert_refresh_token($1::INTEGER, $2::TEXT, $3::TIMESTAMPTZ);"
+    ),
+    "rotate_refresh_token": (
+        "SELECT * FROM rotate_refresh_token($1::TEXT, $2::TEXT, $3::TIMESTAMPTZ);"
+    ),
+    "revoke_refresh_token": "SELECT revoke_refresh_token($1::TEXT);",
+    "revoke_user_refresh_tokens": "SELECT revoke_user_refresh_tokens($1::INTEGER);",
+    "get_users_by_emails": "SELECT * FROM get_users_by_emails($1::TEXT[]);",
+    "get_user_token_versions": "SELECT * FROM get_user_token_versions($1::INTEGER[]);",
+    "pg_notify": "SELECT pg_notify($1::TEXT, $2::TEXT);",
+}
+
+# Sentencias sin efectos secundarios, que pueden repetirse con EXPLAIN ANALYZE.
+# `search_products` no está: es PL/pgSQL y su plan solo mostraría un
+# `Function Scan`, sin las consultas internas que la hacen lenta; sus
+# consultas lentas se registran sin plan.
+READ_ONLY: FrozenSet[str] = frozenset(
+    {
+        "get_products",
+        "get_search_products",
+        "get_products_version",
+        "get_products_by_ids",
+        "get_users",
+        "get_users_by_emails",
+        "get_user_token_versions",
+    }
+)
+
+
+class StatementRegistry:
+    """
+    Ejecuta las sentencias registradas por nombre sobre una conexión.
+
+    Atributos:
+        statements (Dict[str, str]): SQL de cada sentencia.
+        mode (str): "session", "pgbouncer" o "unprepared".
+        read_only (FrozenSet[str]): Sentencias de solo lectura.
+    """
+
+    def __init__(
+        self,
+        statements: Dict[str, str],
+        mode: str,
+        read_only: FrozenSet[str] = frozenset(),
+    ) -> None:
+        self.statements = statements
+        self.mode = mode
+        self.read_only = read_only
+
+    def statement_cache_size(self, configured: int) -> int:
+        """
+        Retorna el tamaño de la caché de sentencias a usar en el pool.
+
+        Args:
+            configured (int): Tamaño configurado en `db_statement_cache_size`.
+
+        Returns:
+            int: 0 en modo "unprepared"; si no, el configurado con margen
+            suficiente para todas las sentencias registradas.
+        """
+        if self.mode == "unprepared":
+            return 0
+        return max(configured, 2 * len(self.statements))
+
+    async def init_connection(self, conn: asyncpg.Connection) -> None:
+        """
+        Prepara todas las sentencias en una conexión nueva del pool.
+
+        Solo actúa en modo "session"; se registra como callback `init`.
+        `conn.prepare` no guarda la sentencia en la caché que usan `fetch`,
+        `fetchrow` y `fetchval`, así que se prepara a través de esa caché con
+        `Connection._get_statement`. Es un método privado de asyncpg: si su
+        firma cambia, se usa `conn.prepare`, que al menos valida las
+        sentencias, y se avisa en el log.
+
+        Args:
+            conn (asyncpg.Connection): Conexión recién abierta.
+        """
+        if self.mode != "session":
+            return
+        # API privada: firma _get_statement(query, timeout, ...) de asyncpg
+        # 0.30 (versión fijada en requirements.txt) a 0.32
+        get_statement = getattr(conn, "_get_statement", None)
+        for sql in self.statements.values():
+            if get_statement is not None:
+                try:
+                    await get_statement(sql, None)
+                    continue
+                except TypeError:
+                    logger.warning(
+                        "asyncpg Connection._get_statement changed; "
+                        "statements are validated but not cached on connect"
+                    )
+                    get_statement = None
+            await conn.prepare(sql)
+
+    async def _execute(
+        self, method: str, conn: asyncpg.Connection, name: str, args: Any
+    ) -> Any:
+        """
+        Ejecuta la sentencia `name` con el método `method` de la conexión.
+
+        Mide la ejecución (también si falla, p. ej. por statement_timeout) e
+        informa de su duración al registro de consultas lentas.
+        """
+        sql = self.statements[name]
+        start = time.perf_counter()
+        try:
+            with timed("sql"):
+                return await getattr(conn, method)(sql, *args)
+        finally:
+            slow_query_log.observe(
+                name, sql, args, time.perf_counter() - start, name in self.read_only
+            )
+
+    async def fetch(
+        self, conn: asyncpg.Connection, name: str, *args: Any
+    ) -> List[asyncpg.Record]:
+        """Ejecuta la sentencia `name` y retorna todas sus filas."""
+        return await self._execute("fetch", conn, name, args)
+
+    async def fetchrow(
+        self, conn: asyncpg.Connection, name: str, *args: Any
+    ) -> Optional[asyncpg.Record]:
+        """Ejecuta la sentencia `name` y retorna su primera fila."""
+        return await self._execute("fetchrow", conn, name, args)
+
+    async def fetchval(self, conn: asyncpg.Connection, name: str, *args: Any) -> Any:
+        """Ejecuta la sentencia `name` y retorna un único valor."""
+        return await self._execute("fetchval", conn, name, args)
+
+    def cursor(
+        self, conn: asyncpg.Connection, name: str, *args: Any, prefetch: int
+    ) -> Any:
+        """
+        Retorna un cursor del servidor sobre la sentencia `name`.
+
+        Debe usarse dentro de una transacción e iterarse con `async for`.
+        """
+        return conn.cursor(self.statements[name], *args, prefetch=prefetch)
+
+
+# Instancia del registro para uso en otros módulos
+statement_registry = StatementRegistry(
+    STATEMENTS, settings.db_statement_mode, READ_ONLY
+)
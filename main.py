@@ -8,26 +8,47 @@ Routers incluidos:
 - auth: Gestión de autenticación (login y registro de usuarios).
 - user: Gestión de usuarios y perfil.
 - product: Gestión de productos (CRUD y búsquedas).
+- internal: Estadísticas internas y `/metrics` (solo si `metrics_enabled`).
 
 - CORS:
 - origins, methods, credentials, headers
 
+Métricas:
+- `TimingMiddleware` mide cada petición por ruta y etapa (solo si
+  `metrics_enabled`).
+
+Respuestas:
+- `FastJSONResponse` (orjson) es la clase de respuesta por defecto; una ruta
+  puede usar `response_class=JSONResponse` para volver a la estándar.
+
 Ciclo de vida de la aplicación:
 - Conexión a la base de datos al iniciar la aplicación.
+- Escucha de invalidaciones de la caché de productos de otros workers.
 - Desconexión de la base de datos al cerrar la aplicación.
 
+Errores:
+- Si no hay conexiones libres en el pool a tiempo se responde 503.
+
 Endpoint principal:
 - GET / : Retorna un mensaje de prueba.
 """
 
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
-from api.routers import auth, product, user
+from api.routers import auth, internal, product, user
 from core.config import settings
-from db.connnection import db_management
+from core.etag import ETAG_HEADER
+from core.hashing import password_hasher
+from core.metrics import request_metrics
+from core.middleware import TimingMiddleware
+from core.pagination import NEXT_CURSOR_HEADER
+from core.responses import FastJSONResponse
+from db.connnection import PoolAcquireTimeout, db_management
+from services.product_cache import product_cache_listener
 
 
 @asynccontextmanager
@@ -36,7 +57,8 @@ async def lifespan(_app: FastAPI):
     Administra el ciclo de vida de la aplicación.
 
     - Conecta a la base de datos al iniciar la app.
-    - Desconecta la base de datos al cerrar la app.
+    - Escucha las invalidaciones de la caché de productos (si es local).
+    - Desconecta la base de datos y detiene el ejecutor de hash al cerrar la app.
 
     Args:
         app (FastAPI): Instancia de la aplicación FastAPI.
@@ -45,12 +67,17 @@ async def lifespan(_app: FastAPI):
         None
     """
     await db_management.connect_to_db()
+    if product_cache_listener is not None:
+        product_cache_listener.start(settings.database_url)
     yield
+    if product_cache_listener is not None:
+        await product_cache_listener.stop()
     await db_management.disconnect_from_db()
+    password_hasher.shutdown()
 
 
 # Inicialización de la aplicación FastAPI
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
 
 # Configuracion cors
 app.add_middleware(
@@ -58,14 +85,37 @@ app.add_middleware(
     allow_origins=settings.allowed_origins,
     allow_methods=settings.allowed_methods,
     allow_headers=settings.allowed_headers,
-    allow_credentials=settings.allowed_credentials
+    allow_credentials=settings.allowed_credentials,
+    expose_headers=[NEXT_CURSOR_HEADER, ETAG_HEADER],
 )
 
+# Medición de latencias por ruta y etapa
+if settings.metrics_enabled:
+    app.add_middleware(TimingMiddleware, metrics=request_metrics)
+
 
 # Inclusión de routers
 app.include_router(auth.router)
 app.include_router(user.router)
 app.include_router(product.router)
+if settings.metrics_enabled:
+    app.include_router(internal.router)
+    app.include_router(internal.metrics_router)
+
+
+@app.exception_handler(PoolAcquireTimeout)
+async def pool_timeout_handler(_request: Request, _exc: PoolAcquireTimeout):
+    """
+    Responde 503 cuando el pool de conexiones está saturado.
+
+    Returns:
+        JSONResponse: Mensaje de error con la cabecera Retry-After.
+    """
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Database busy, try again later."},
+        headers={"Retry-After": "1"},
+    )
 
 
 @app.get("/")
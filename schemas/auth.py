@@ -1,8 +1,8 @@
 """
 Schemas de autenticación y tokens para la API.
 
-Define modelos Pydantic para login, registro de usuarios
-y la respuesta de tokens JWT.
+Define modelos Pydantic para login, registro de usuarios,
+renovación de tokens y la respuesta de tokens JWT.
 """
 
 from typing import Optional
@@ -18,6 +18,7 @@ class TokenResponse(BaseModel):
         access_token (str): Token de acceso.
         token_type (str): Tipo de token (ej. "Bearer").
         expire (int): Tiempo de expiración en segundos o minutos.
+        refresh_token (Optional[str]): Token de refresco para `/auth/refresh`.
     """
 
     access_token: str = Field(
@@ -25,6 +26,21 @@ class TokenResponse(BaseModel):
     )
     token_type: str = Field(..., description="Token Type required when response a user")
     expire: int = Field(..., description="Expire required when response a user")
+    refresh_token: Optional[str] = Field(
+        None, description="Refresh Token to obtain a new access token"
+    )
+
+
+class RefreshRequest(BaseModel):
+    """
+    Modelo para renovar o revocar un token de refresco.
+
+    Atributos:
+        refresh_token (str): Token de refresco emitido en login, registro o
+            en una renovación anterior.
+    """
+
+    refresh_token: str = Field(..., description="Refresh Token issued by the API")
 
 
 class LoginAuth(BaseModel):
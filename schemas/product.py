@@ -1,15 +1,41 @@
 """
 Schemas de productos para la API.
 
-Define modelos Pydantic para filtrado, inserción, actualización,
-eliminación y salida de productos.
+Define modelos Pydantic para filtrado, búsqueda, inserción, actualización,
+eliminación, carga masiva y salida de productos.
 """
 
 from datetime import datetime
 from decimal import Decimal
-from typing import Optional
+from enum import Enum
+from typing import List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
+
+from core.responses import JSONDecimal
+
+
+class ExportFormat(str, Enum):
+    """
+    Formatos disponibles para la exportación del inventario.
+    """
+
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+class SearchMode(str, Enum):
+    """
+    Modos de la búsqueda de productos por nombre.
+
+    - PREFIX: nombres que empiezan por el texto, en orden alfabético.
+    - FUZZY: nombres con alguna palabra parecida al texto, por similitud.
+    - RANKED: coincidencias parciales y parecidas, ordenadas por relevancia.
+    """
+
+    PREFIX = "prefix"
+    FUZZY = "fuzzy"
+    RANKED = "ranked"
 
 
 class ProductFilterBase(BaseModel):
@@ -35,9 +61,16 @@ class ProductFilterBase(BaseModel):
 class ProductFilter(ProductFilterBase):
     """
     Modelo de filtrado extendido que incluye el ID del usuario.
+
+    También transporta la paginación por cursor: `limit` acota el número de
+    filas y `after_id` indica el último ID ya entregado.
     """
 
     user_id: Optional[int] = Field(None, description="Filter by user ID (owner)")
+    limit: Optional[int] = Field(None, ge=1, description="Maximum rows to return")
+    after_id: Optional[int] = Field(
+        None, description="Return only products with an ID greater than this one"
+    )
 
 
 class BaseProduct(BaseModel):
@@ -47,14 +80,15 @@ class BaseProduct(BaseModel):
     Atributos:
         name (str): Nombre del producto.
         stock (int): Cantidad en inventario (>= 0).
-        price (Decimal): Precio del producto (>= 0.00).
+        price (Decimal): Precio del producto (>= 0.00); su salida JSON sigue
+            `json_decimal_mode`.
     """
 
     name: str = Field(..., description="Product name")
     stock: int = Field(
         0, ge=0, description="Number of items in stock (must be non-negative)"
     )
-    price: Decimal = Field(
+    price: JSONDecimal = Field(
         Decimal("0.00"),
         ge=Decimal("0.00"),
         description="Product price (must be zero or positive)",
@@ -105,3 +139,76 @@ class ProductOut(ProductUpdate):
     updated_at: Optional[datetime] = Field(
         None, description="Timestamp when the product was last updated"
     )
+
+
+# Adaptador que valida y serializa listas de productos en una sola pasada
+product_list_adapter: TypeAdapter[List[ProductOut]] = TypeAdapter(List[ProductOut])
+
+
+class ProductMutationStatus(str, Enum):
+    """
+    Resultado de una operación de escritura sobre un producto.
+    """
+
+    CREATED = "created"
+    UPDATED = "updated"
+    DELETED = "deleted"
+    NOT_FOUND = "not_found"
+    CONFLICT = "conflict"
+
+
+class BulkProductResult(BaseModel):
+    """
+    Resultado de un elemento de la carga masiva.
+
+    Atributos:
+        index (int): Posición del elemento en la petición.
+        name (str): Nombre del producto.
+        status (ProductMutationStatus): created, updated o conflict.
+        id (Optional[int]): ID del producto, salvo en caso de conflicto.
+    """
+
+    index: int = Field(..., description="Position of the item in the request")
+    name: str = Field(..., description="Product name")
+    status: ProductMutationStatus = Field(..., description="Outcome for this item")
+    id: Optional[int] = Field(None, description="Product ID (absent on conflict)")
+
+
+class BulkProductOut(BaseModel):
+    """
+    Modelo de salida de la carga masiva de productos.
+
+    Incluye los totales por resultado y el detalle de cada elemento.
+    """
+
+    created: int = Field(..., description="Number of products created")
+    updated: int = Field(..., description="Number of products updated")
+    conflicts: int = Field(..., description="Number of items rejected as duplicates")
+    results: List[BulkProductResult] = Field(..., description="Per-item results")
+
+
+class ProductBatchOut(BaseModel):
+    """
+    Modelo de salida de la lectura de varios productos por ID.
+
+    Atributos:
+        items (List[ProductOut]): Productos encontrados, ordenados por ID.
+        missing (List[int]): IDs pedidos que no existen o no son del usuario,
+            en el orden de la petición.
+    """
+
+    items: List[ProductOut] = Field(..., description="Products found, by ID")
+    missing: List[int] = Field(..., description="Requested IDs not found")
+
+
+class ProductsVersion(BaseModel):
+    """
+    Versión de los productos de un usuario, usada para calcular el ETag del
+    listado y la clave de su caché.
+
+    Atributos:
+        version (int): Contador que incrementa cada creación, actualización o
+            eliminación de productos del usuario.
+    """
+
+    version: int = Field(..., description="Products change counter")
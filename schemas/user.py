@@ -55,16 +55,28 @@ class UserFilter(UserBase):
     id: Optional[int] = Field(None, description="User ID filter")
 
 
-class UserOut(UserBase):
+class UserClaims(UserBase):
     """
-    Modelo de salida de usuario.
+    Modelo del usuario autenticado tal como viaja en el token de acceso.
 
-    Incluye información de identificación y timestamps.
+    Incluye el ID y la versión de los tokens del usuario, que cambia al
+    actualizar el email o la contraseña.
     """
 
     id: int = Field(..., description="Unique user identifier")
+    token_version: int = Field(0, description="Current version of the user's tokens")
+
+
+class UserOut(UserClaims):
+    """
+    Modelo de salida de usuario.
+
+    Incluye información de identificación y timestamps. El hash de la
+    contraseña se excluye siempre al serializar.
+    """
+
     password: Optional[str] = Field(
-        None, description="Normally not returned for security reasons"
+        None, exclude=True, description="Normally not returned for security reasons"
     )
     created_at: datetime = Field(..., description="Timestamp when the user was created")
     updated_at: Optional[datetime] = Field(
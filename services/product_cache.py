@@ -0,0 +1,193 @@
+"""
+Caché de resultados de las consultas de productos.
+
+Guarda los resultados de `get_products` y `get_search_products` por usuario,
+con la clave `(user_id, sentencia, ProductFilter normalizado)`. Cada método
+de escritura de `ProductService` invalida los resultados del usuario
+afectado mediante `invalidate_products`.
+
+El listado (`GET /products/`) añade a la clave la versión de los productos
+del usuario con la que calculó su ETag (`ProductsVersion`): el cuerpo
+servido desde la caché de un worker corresponde siempre a esa versión,
+aunque la invalidación de una escritura en otro worker aún no haya llegado.
+
+Las consultas idénticas concurrentes que no están en caché se agrupan con
+`product_flight` (ver `core.singleflight`), de modo que una ráfaga de
+peticiones iguales ejecuta una sola consulta.
+
+Con el almacenamiento en memoria (`settings.product_cache_backend =
+"memory"`) cada worker tiene su propia caché. La invalidación se difunde con
+`NOTIFY` en el canal `settings.product_cache_channel`, en la misma conexión
+que hizo la escritura (dentro de una transacción, se entrega al confirmarla).
+`product_cache_listener` recibe las de los demás workers. Con "redis" la
+caché y sus generaciones son compartidas y no hace falta difundir nada; con
+"none" no se guarda ningún resultado.
+"""
+
+import logging
+import uuid
+from typing import Awaitable, Callable, List, Optional
+
+import asyncpg
+
+from core.config import settings
+from core.result_cache import (MemoryBackend, RedisBackend, ResultCache,
+                               ResultCacheBackend)
+from core.singleflight import SingleFlight
+from db.connnection import db_management
+from db.notifications import NotificationListener
+from db.statements import statement_registry
+from schemas.product import ProductFilter, ProductOut, product_list_adapter
+
+logger = logging.getLogger("services.product_cache")
+
+# Identificador de este proceso, para ignorar sus propias notificaciones
+ORIGIN = uuid.uuid4().hex
+
+
+def create_backend() -> Optional[ResultCacheBackend]:
+    """
+    Crea el almacenamiento indicado en `settings.product_cache_backend`.
+
+    Returns:
+        Optional[ResultCacheBackend]: El almacenamiento, o None si la caché
+        está desactivada.
+
+    Raises:
+        RuntimeError: Si se pide "redis" sin URL o sin el paquete `redis`.
+    """
+    if settings.product_cache_backend == "none":
+        return None
+    if settings.product_cache_backend == "redis":
+        if not settings.product_cache_redis_url:
+            raise RuntimeError("product_cache_redis_url is required for redis")
+        try:
+            from redis import asyncio as redis
+        except ImportError as exc:
+            raise RuntimeError("The redis product cache requires 'redis'") from exc
+        return RedisBackend(
+            redis.from_url(settings.product_cache_redis_url),
+            dumps=product_list_adapter.dump_json,
+            loads=product_list_adapter.validate_json,
+            prefix="products",
+        )
+    return MemoryBackend(
+        maxsize=settings.product_cache_max_size,
+        ttl=settings.product_cache_ttl_seconds,
+    )
+
+
+def cache_key(
+    statement: str, filters: ProductFilter, version: Optional[int] = None
+) -> str:
+    """
+    Calcula la clave de un resultado dentro de los del usuario.
+
+    Args:
+        statement (str): Sentencia del registro que se ejecuta.
+        filters (ProductFilter): Filtros de la consulta.
+        version (Optional[int]): Versión de los productos del usuario leída
+            antes de la consulta, si se conoce.
+
+    Returns:
+        str: Sentencia, versión y filtros informados, en JSON con orden fijo.
+    """
+    if version is not None:
+        statement = f"{statement}@{version}"
+    return f"{statement}:{filters.model_dump_json(exclude_none=True)}"
+
+
+async def cached_products(
+    statement: str,
+    filters: ProductFilter,
+    loader: Callable[[], Awaitable[List[ProductOut]]],
+    version: Optional[int] = None,
+) -> List[ProductOut]:
+    """
+    Retorna el resultado de una consulta de productos, desde la caché si está.
+
+    Si no está, la consulta se agrupa con las idénticas que estén en curso.
+    Las consultas sin `user_id` no se guardan: no habría a quién invalidar.
+
+    Args:
+        statement (str): Sentencia del registro que ejecuta `loader`.
+        filters (ProductFilter): Filtros de la consulta.
+        loader (Callable[[], Awaitable[List[ProductOut]]]): Consulta a la base
+            de datos.
+        version (Optional[int]): Versión de los productos del usuario leída
+            antes de la consulta; forma parte de la clave.
+
+    Returns:
+        List[ProductOut]: Productos; la lista no debe modificarse.
+    """
+    key = cache_key(statement, filters, version)
+
+    async def load() -> List[ProductOut]:
+        return await product_flight.do((filters.user_id, key), loader)
+
+    if product_cache is None or filters.user_id is None:
+        return await load()
+    return await product_cache.get_or_load(filters.user_id, key, load)
+
+
+async def invalidate_products(
+    user_id: int, conn: Optional[asyncpg.Connection] = None
+) -> None:
+    """
+    Invalida los resultados de un usuario en esta y en las demás instancias.
+
+    También desvincula sus consultas en curso: las posteriores a la escritura
+    no deben recibir un resultado leído antes.
+
+    Args:
+        user_id (int): ID del usuario cuyos productos cambiaron.
+        conn (Optional[asyncpg.Connection]): Conexión que hizo la escritura;
+            si es None se toma una del pool para notificar.
+    """
+    product_flight.forget(user_id)
+    if product_cache is None:
+        return
+    await product_cache.invalidate(user_id)
+    if product_cache.backend.shared:
+        return
+    async with db_management.get_connection(conn) as conn:
+        await statement_registry.fetchval(
+            conn, "pg_notify", settings.product_cache_channel, f"{ORIGIN}:{user_id}"
+        )
+
+
+async def _on_notification(payload: str) -> None:
+    """Invalida los resultados del usuario notificado por otra instancia."""
+    origin, _, user_id = payload.partition(":")
+    if origin == ORIGIN or product_cache is None:
+        return
+    try:
+        await product_cache.invalidate(int(user_id))
+    except ValueError:
+        logger.warning("Ignoring malformed product cache notification: %r", payload)
+
+
+async def _on_reset() -> None:
+    """Descarta toda la caché: pudo perderse alguna notificación."""
+    if product_cache is not None:
+        await product_cache.clear()
+
+
+# Agrupación de consultas de productos concurrentes, por usuario
+product_flight = SingleFlight("products")
+
+# Instancia de la caché para uso en otros módulos (None si está desactivada)
+_backend = create_backend()
+product_cache: Optional[ResultCache] = (
+    ResultCache(_backend, ttl=settings.product_cache_ttl_seconds)
+    if _backend is not None
+    else None
+)
+
+# Escucha de invalidaciones de otros workers; solo hace falta si la caché no
+# es compartida
+product_cache_listener: Optional[NotificationListener] = (
+    NotificationListener(settings.product_cache_channel, _on_notification, _on_reset)
+    if _backend is not None and not _backend.shared
+    else None
+)
@@ -3,13 +3,29 @@ Servicio de productos.
 
 Provee métodos para CRUD y búsquedas de productos utilizando la base de datos
 y los schemas definidos en ProductOut, ProductFilter, ProductUpdate, ProductDelete, ProductInsert.
+
+Los listados se validan de una sola vez con `product_list_adapter` en lugar de
+construir un `ProductOut` por fila, lo que evita el coste de cada validación
+individual en los resultados grandes.
+
+Los resultados de `get_products` y `get_search_products` se guardan por
+usuario en `services.product_cache`; cada método de escritura invalida los
+del usuario afectado cuando algo cambió.
 """
 
-from typing import List, Optional
+from typing import AsyncIterator, Dict, List, Optional
+
+import asyncpg
 
+from core.metrics import timed
 from db.connnection import db_management
-from schemas.product import (ProductDelete, ProductFilter, ProductInsert,
-                             ProductOut, ProductUpdate)
+from db.statements import statement_registry
+from schemas.product import (BaseProduct, BulkProductResult, ProductDelete,
+                             ProductFilter, ProductInsert,
+                             ProductMutationStatus, ProductOut,
+                             ProductsVersion, ProductUpdate, SearchMode,
+                             product_list_adapter)
+from services.product_cache import cached_products, invalidate_products
 
 
 class ProductService:
@@ -18,98 +34,322 @@ class ProductService:
     """
 
     @staticmethod
-    async def get_products(filters: ProductFilter) -> List[ProductOut]:
+    async def get_products(
+        filters: ProductFilter,
+        conn: Optional[asyncpg.Connection] = None,
+        version: Optional[int] = None,
+    ) -> List[ProductOut]:
         """
         Retorna una lista de productos filtrados según los criterios proporcionados.
 
+        Los resultados se ordenan por ID; `filters.limit` y `filters.after_id`
+        permiten paginarlos por cursor.
+
         Args:
             filters (ProductFilter): Filtros para la consulta.
+            conn (Optional[asyncpg.Connection]): Conexión de la petición; si es
+                None se toma una del pool.
+            version (Optional[int]): Versión de los productos del usuario
+                (`get_products_version`) leída antes; si se indica, el
+                resultado en caché es el de esa versión.
 
         Returns:
-            List[ProductOut]: Lista de productos.
+            List[ProductOut]: Lista de productos (compartida con la caché: no
+            debe modificarse).
         """
-        query = (
-            "SELECT * FROM get_products($1::TEXT, $2::INTEGER, $3::NUMERIC, "
-            "$4::INTEGER, $5::TIMESTAMPTZ, $6::TIMESTAMPTZ, $7::INTEGER);"
-        )
         params = list(filters.model_dump().values())
-        async with db_management.get_connection() as conn:
-            rows = await conn.fetch(query, *params)
-            return [ProductOut(**dict(row)) for row in rows]
+
+        async def load() -> List[ProductOut]:
+            async with db_management.get_connection(conn) as db_conn:
+                rows = await statement_registry.fetch(db_conn, "get_products", *params)
+                return product_list_adapter.validate_python([dict(row) for row in rows])
+
+        return await cached_products("get_products", filters, load, version)
 
     @staticmethod
-    async def get_search_products(filters: ProductFilter) -> List[ProductOut]:
+    async def get_products_version(
+        user_id: int, conn: Optional[asyncpg.Connection] = None
+    ) -> ProductsVersion:
+        """
+        Retorna la versión de los productos de un usuario sin leer las filas.
+
+        Args:
+            user_id (int): ID del usuario propietario.
+            conn (Optional[asyncpg.Connection]): Conexión de la petición; si es
+                None se toma una del pool.
+
+        Returns:
+            ProductsVersion: Contador de cambios de sus productos.
+        """
+        async with db_management.get_connection(conn) as conn:
+            row = await statement_registry.fetchrow(
+                conn, "get_products_version", user_id
+            )
+            return ProductsVersion(**dict(row))
+
+    @staticmethod
+    async def get_products_by_ids(
+        product_ids: List[int],
+        user_id: int,
+        conn: Optional[asyncpg.Connection] = None,
+    ) -> List[ProductOut]:
+        """
+        Retorna los productos de un usuario con los IDs indicados en una sola
+        consulta.
+
+        Args:
+            product_ids (List[int]): IDs a leer.
+            user_id (int): ID del usuario propietario.
+            conn (Optional[asyncpg.Connection]): Conexión de la petición; si es
+                None se toma una del pool.
+
+        Returns:
+            List[ProductOut]: Productos encontrados, ordenados por ID.
+        """
+        async with db_management.get_connection(conn) as conn:
+            rows = await statement_registry.fetch(
+                conn, "get_products_by_ids", product_ids, user_id
+            )
+            return product_list_adapter.validate_python([dict(row) for row in rows])
+
+    @staticmethod
+    async def iter_products(
+        filters: ProductFilter,
+        prefetch: int,
+        conn: Optional[asyncpg.Connection] = None,
+    ) -> AsyncIterator[ProductOut]:
+        """
+        Recorre los productos filtrados mediante un cursor del lado del servidor.
+
+        A diferencia de `get_products`, no carga el resultado completo en
+        memoria: las filas se leen de `prefetch` en `prefetch` dentro de una
+        transacción, que es requisito de los cursores de PostgreSQL.
+
+        Args:
+            filters (ProductFilter): Filtros para la consulta.
+            prefetch (int): Filas leídas por cada ida y vuelta al servidor.
+            conn (Optional[asyncpg.Connection]): Conexión de la petición; si es
+                None se toma una del pool.
+
+        Yields:
+            ProductOut: Cada producto, en orden de ID.
+        """
+        params = list(filters.model_dump().values())
+        async with db_management.get_connection(conn) as conn:
+            async with conn.transaction(readonly=True):
+                async for row in statement_registry.cursor(
+                    conn, "get_products", *params, prefetch=prefetch
+                ):
+                    yield ProductOut(**dict(row))
+
+    @staticmethod
+    async def get_search_products(
+        filters: ProductFilter, conn: Optional[asyncpg.Connection] = None
+    ) -> List[ProductOut]:
         """
         Retorna productos utilizando una búsqueda más flexible según los filtros.
 
+        Los resultados se ordenan por ID y admiten la misma paginación por
+        cursor que `get_products`.
+
         Args:
             filters (ProductFilter): Filtros de búsqueda.
+            conn (Optional[asyncpg.Connection]): Conexión de la petición; si es
+                None se toma una del pool.
 
         Returns:
-            List[ProductOut]: Lista de productos que coinciden con los filtros.
+            List[ProductOut]: Lista de productos que coinciden con los filtros
+            (compartida con la caché: no debe modificarse).
         """
-        query = (
-            "SELECT * FROM get_search_products($1::TEXT, $2::INTEGER, $3::NUMERIC, "
-            "$4::INTEGER, $5::TIMESTAMPTZ, $6::TIMESTAMPTZ, $7::INTEGER);"
-        )
         params = list(filters.model_dump().values())
-        async with db_management.get_connection() as conn:
-            rows = await conn.fetch(query, *params)
-            return [ProductOut(**dict(row)) for row in rows]
+
+        async def load() -> List[ProductOut]:
+            async with db_management.get_connection(conn) as db_conn:
+                rows = await statement_registry.fetch(
+                    db_conn, "get_search_products", *params
+                )
+                return product_list_adapter.validate_python([dict(row) for row in rows])
+
+        return await cached_products("get_search_products", filters, load)
+
+    @staticmethod
+    async def search_products(
+        user_id: int,
+        query: str,
+        mode: SearchMode,
+        limit: int,
+        conn: Optional[asyncpg.Connection] = None,
+    ) -> List[ProductOut]:
+        """
+        Busca productos de un usuario por nombre con la función
+        `search_products`, apoyada en los índices de trigramas y de prefijo.
+
+        Args:
+            user_id (int): ID del usuario propietario.
+            query (str): Texto a buscar.
+            mode (SearchMode): Prefijo, similitud o por relevancia.
+            limit (int): Máximo de resultados.
+            conn (Optional[asyncpg.Connection]): Conexión de la petición; si es
+                None se toma una del pool.
+
+        Returns:
+            List[ProductOut]: Productos en el orden del modo de búsqueda.
+        """
+        async with db_management.get_connection(conn) as conn:
+            rows = await statement_registry.fetch(
+                conn, "search_products", user_id, query, mode.value, limit
+            )
+            return product_list_adapter.validate_python([dict(row) for row in rows])
 
     @staticmethod
-    async def insert_product(product_insert: ProductInsert) -> Optional[int]:
+    async def create_product(
+        product_insert: ProductInsert, conn: Optional[asyncpg.Connection] = None
+    ) -> Optional[ProductOut]:
         """
-        Inserta un nuevo producto en la base de datos.
+        Crea un producto y lo retorna completo en una sola sentencia.
+
+        La detección de duplicados la resuelve el índice único
+        `(user_id, name)`, por lo que no hace falta consultarlos antes.
 
         Args:
-            product_insert (ProductInsert): Datos del producto a insertar.
+            product_insert (ProductInsert): Datos del producto a crear.
+            conn (Optional[asyncpg.Connection]): Conexión de la petición; si es
+                None se toma una del pool.
 
         Returns:
-            Optional[int]: ID del nuevo producto si se creó correctamente.
+            Optional[ProductOut]: El producto creado, o None si ya existe
+            otro con el mismo nombre para el usuario.
         """
-        query = "SELECT * FROM insert_products($1, $2, $3, $4);"
         params = list(product_insert.model_dump().values())
-        async with db_management.get_connection() as conn:
-            new_id = await conn.fetchval(query, *params)
-            return new_id
+        async with db_management.get_connection(conn) as conn:
+            row = await statement_registry.fetchrow(conn, "create_product", *params)
+            if row is None:
+                return None
+            await invalidate_products(product_insert.user_id, conn)
+            return ProductOut(**dict(row))
 
     @staticmethod
-    async def update_product(product_update: ProductUpdate) -> bool:
+    async def bulk_upsert_products(
+        user_id: int,
+        products: List[BaseProduct],
+        conn: Optional[asyncpg.Connection] = None,
+    ) -> List[BulkProductResult]:
         """
-        Actualiza un producto existente.
+        Crea o actualiza varios productos de un usuario en una sola transacción.
+
+        Los productos se copian con `COPY` a una tabla temporal y se vuelcan con
+        un único `INSERT ... ON CONFLICT (user_id, name) DO UPDATE`, de modo que
+        el coste no crece en idas y vueltas con el número de elementos. Si un
+        nombre se repite dentro de la petición, solo se aplica la primera
+        aparición y el resto se marca como conflicto.
 
         Args:
-            product_update (ProductUpdate): Datos del producto a actualizar.
+            user_id (int): ID del usuario propietario.
+            products (List[BaseProduct]): Productos a crear o actualizar.
+            conn (Optional[asyncpg.Connection]): Conexión de la petición; si es
+                None se toma una del pool.
 
         Returns:
-            bool: True si se actualizó correctamente, False si no.
+            List[BulkProductResult]: Resultado de cada elemento, en el orden recibido.
         """
+        results: List[BulkProductResult] = []
+        first_index: Dict[str, int] = {}
+        records = []
+        for index, product in enumerate(products):
+            if product.name in first_index:
+                status = ProductMutationStatus.CONFLICT
+            else:
+                first_index[product.name] = index
+                records.append((product.name, product.stock, product.price))
+                status = ProductMutationStatus.CREATED
+            results.append(
+                BulkProductResult(index=index, name=product.name, status=status)
+            )
+
+        if not records:
+            return results
+
         query = (
-            "SELECT * FROM update_products($1::TEXT, $2::INTEGER,"
-            "$3::NUMERIC, $4::INTEGER, $5::INTEGER);"
+            "INSERT INTO products (name, stock, price, user_id) "
+            "SELECT name, stock, price, $1::INTEGER FROM products_staging "
+            "ON CONFLICT (user_id, name) DO UPDATE "
+            "SET stock = EXCLUDED.stock, price = EXCLUDED.price, updated_at = NOW() "
+            "RETURNING id, name, (xmax = 0) AS created;"
         )
+        async with db_management.get_connection(conn) as conn:
+            with timed("sql"):
+                async with conn.transaction():
+                    await conn.execute(
+                        "CREATE TEMP TABLE products_staging "
+                        "(name TEXT, stock INTEGER, price NUMERIC) ON COMMIT DROP;"
+                    )
+                    await conn.copy_records_to_table(
+                        "products_staging",
+                        records=records,
+                        columns=["name", "stock", "price"],
+                    )
+                    rows = await conn.fetch(query, user_id)
+            if rows:
+                await invalidate_products(user_id, conn)
+
+        for row in rows:
+            result = results[first_index[row["name"]]]
+            result.id = row["id"]
+            if not row["created"]:
+                result.status = ProductMutationStatus.UPDATED
+        return results
+
+    @staticmethod
+    async def update_product(
+        product_update: ProductUpdate, conn: Optional[asyncpg.Connection] = None
+    ) -> ProductMutationStatus:
+        """
+        Actualiza un producto existente.
+
+        La propiedad del producto, la unicidad del nombre y la modificación se
+        resuelven en una sola sentencia.
+
+        Args:
+            product_update (ProductUpdate): Datos del producto a actualizar.
+            conn (Optional[asyncpg.Connection]): Conexión de la petición; si es
+                None se toma una del pool.
+
+        Returns:
+            ProductMutationStatus: UPDATED, NOT_FOUND si el producto no existe
+            para el usuario, o CONFLICT si el nombre ya está en uso.
+        """
         params = list(product_update.model_dump().values())
-        async with db_management.get_connection() as conn:
-            updated = await conn.fetchval(query, *params)
-            return bool(updated)
+        async with db_management.get_connection(conn) as conn:
+            result = ProductMutationStatus(
+                await statement_registry.fetchval(conn, "update_product", *params)
+            )
+            if result is ProductMutationStatus.UPDATED:
+                await invalidate_products(product_update.user_id, conn)
+            return result
 
     @staticmethod
-    async def delete_product(product_delete: ProductDelete) -> bool:
+    async def delete_product(
+        product_delete: ProductDelete, conn: Optional[asyncpg.Connection] = None
+    ) -> ProductMutationStatus:
         """
         Elimina un producto según su ID y el ID del usuario propietario.
 
         Args:
             product_delete (ProductDelete): Datos del producto a eliminar.
+            conn (Optional[asyncpg.Connection]): Conexión de la petición; si es
+                None se toma una del pool.
 
         Returns:
-            bool: True si se eliminó correctamente, False si no.
+            ProductMutationStatus: DELETED, o NOT_FOUND si el producto no
+            existe para el usuario.
         """
-        query = "SELECT * FROM delete_products($1::INTEGER, $2::INTEGER);"
         params = list(product_delete.model_dump().values())
-        async with db_management.get_connection() as conn:
-            deleted = await conn.fetchval(query, *params)
-            return bool(deleted)
+        async with db_management.get_connection(conn) as conn:
+            deleted = await statement_registry.fetchval(conn, "delete_product", *params)
+            if deleted:
+                await invalidate_products(product_delete.user_id, conn)
+                return ProductMutationStatus.DELETED
+            return ProductMutationStatus.NOT_FOUND
 
 
 # Instancia del servicio para uso en otros módulos
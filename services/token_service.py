@@ -0,0 +1,122 @@
+"""
+Servicio de tokens de refresco.
+
+Emite, rota y revoca los tokens de refresco guardados en `refresh_tokens`.
+Los tokens se entregan en claro una sola vez; la base de datos solo conoce su
+SHA-256, de modo que una fuga de la tabla no permite renovar sesiones.
+"""
+
+from typing import Optional, Tuple
+
+import asyncpg
+
+from core.token import create_refresh_token, hash_refresh_token
+from db.connnection import db_management
+from db.statements import statement_registry
+from schemas.user import UserOut
+
+
+class TokenService:
+    """
+    Clase de servicio para operaciones relacionadas con tokens de refresco.
+    """
+
+    @staticmethod
+    async def issue_refresh_token(
+        user_id: int, conn: Optional[asyncpg.Connection] = None
+    ) -> str:
+        """
+        Emite un nuevo token de refresco para un usuario.
+
+        Args:
+            user_id (int): ID del usuario.
+            conn (Optional[asyncpg.Connection]): Conexión de la petición; si es
+                None se toma una del pool.
+
+        Returns:
+            str: Token de refresco en claro.
+        """
+        token, token_hash, expires_at = create_refresh_token()
+        async with db_management.get_connection(conn) as conn:
+            await statement_registry.fetchval(
+                conn, "insert_refresh_token", user_id, token_hash, expires_at
+            )
+        return token
+
+    @staticmethod
+    async def rotate_refresh_token(
+        token: str, conn: Optional[asyncpg.Connection] = None
+    ) -> Optional[Tuple[UserOut, str]]:
+        """
+        Canjea un token de refresco por uno nuevo.
+
+        El token usado queda revocado. Si ya había sido canjeado antes, se
+        revocan todos los tokens del usuario.
+
+        Args:
+            token (str): Token de refresco en claro.
+            conn (Optional[asyncpg.Connection]): Conexión de la petición; si es
+                None se toma una del pool.
+
+        Returns:
+            Optional[Tuple[UserOut, str]]: El usuario dueño del token y el
+            nuevo token, o None si el token no es válido.
+        """
+        new_token, new_token_hash, expires_at = create_refresh_token()
+        async with db_management.get_connection(conn) as conn:
+            row = await statement_registry.fetchrow(
+                conn,
+                "rotate_refresh_token",
+                hash_refresh_token(token),
+                new_token_hash,
+                expires_at,
+            )
+        if row is None:
+            return None
+        return UserOut(**dict(row)), new_token
+
+    @staticmethod
+    async def revoke_refresh_token(
+        token: str, conn: Optional[asyncpg.Connection] = None
+    ) -> bool:
+        """
+        Revoca un token de refresco.
+
+        Args:
+            token (str): Token de refresco en claro.
+            conn (Optional[asyncpg.Connection]): Conexión de la petición; si es
+                None se toma una del pool.
+
+        Returns:
+            bool: True si el token existía y estaba activo.
+        """
+        async with db_management.get_connection(conn) as conn:
+            revoked = await statement_registry.fetchval(
+                conn, "revoke_refresh_token", hash_refresh_token(token)
+            )
+            return bool(revoked)
+
+    @staticmethod
+    async def revoke_user_tokens(
+        user_id: int, conn: Optional[asyncpg.Connection] = None
+    ) -> int:
+        """
+        Revoca todos los tokens de refresco activos de un usuario.
+
+        Args:
+            user_id (int): ID del usuario.
+            conn (Optional[asyncpg.Connection]): Conexión de la petición; si es
+                None se toma una del pool.
+
+        Returns:
+            int: Número de tokens revocados.
+        """
+        async with db_management.get_connection(conn) as conn:
+            revoked = await statement_registry.fetchval(
+                conn, "revoke_user_refresh_tokens", user_id
+            )
+            return revoked or 0
+
+
+# Instancia del servicio para uso en otros módulos
+token_service = TokenService()
@@ -3,11 +3,25 @@ Servicio de usuarios.
 
 Provee métodos para CRUD de usuarios utilizando la base de datos
 y los schemas definidos en UserOut, UserFilter, UserInsert, UserUpdate.
+
+Las consultas `get_users` idénticas y concurrentes (p. ej. una ráfaga de
+peticiones con el mismo token) se agrupan en una sola con `user_flight`.
+
+Las búsquedas de un usuario por email y de la versión de sus tokens por ID
+de peticiones concurrentes se resuelven en lotes con una sola consulta
+`= ANY($1)` (`users_by_email` y `token_versions_by_id`, ver
+`core.batch_loader`).
 """
 
-from typing import List, Optional
+from typing import Dict, List, Optional
+
+import asyncpg
 
+from core.batch_loader import BatchLoader
+from core.config import settings
+from core.singleflight import SingleFlight
 from db.connnection import db_management
+from db.statements import statement_registry
 from schemas.user import UserFilter, UserInsert, UserOut, UserUpdate
 
 
@@ -17,58 +31,181 @@ class UserService:
     """
 
     @staticmethod
-    async def get_users(filters: UserFilter) -> List[UserOut]:
+    async def get_users(
+        filters: UserFilter, conn: Optional[asyncpg.Connection] = None
+    ) -> List[UserOut]:
         """
         Retorna una lista de usuarios filtrados según los criterios proporcionados.
 
+        Si ya hay una consulta idéntica en curso, espera su resultado en lugar
+        de ejecutar otra.
+
         Args:
             filters (UserFilter): Filtros para la consulta.
+            conn (Optional[asyncpg.Connection]): Conexión de la petición; si es
+                None se toma una del pool.
 
         Returns:
-            List[UserOut]: Lista de usuarios.
+            List[UserOut]: Lista de usuarios (compartida con las llamadas
+            agrupadas: no debe modificarse).
         """
-        query = "SELECT * FROM get_users($1::TEXT, $2::TEXT, $3::TEXT, $4::INTEGER);"
         params = list(filters.model_dump().values())
-        async with db_management.get_connection() as conn:
-            rows = await conn.fetch(query, *params)
-            return [UserOut(**dict(row)) for row in rows]
+
+        async def load() -> List[UserOut]:
+            async with db_management.get_connection(conn) as db_conn:
+                rows = await statement_registry.fetch(db_conn, "get_users", *params)
+                return [UserOut(**dict(row)) for row in rows]
+
+        return await user_flight.do((filters.email, *params), load)
+
+    @staticmethod
+    async def get_users_by_emails(
+        emails: List[str], conn: Optional[asyncpg.Connection] = None
+    ) -> Dict[str, UserOut]:
+        """
+        Retorna los usuarios con los emails indicados en una sola consulta.
+
+        Args:
+            emails (List[str]): Emails a buscar.
+            conn (Optional[asyncpg.Connection]): Conexión de la petición; si es
+                None se toma una del pool.
+
+        Returns:
+            Dict[str, UserOut]: Usuarios encontrados por email.
+        """
+        async with db_management.get_connection(conn) as conn:
+            rows = await statement_registry.fetch(conn, "get_users_by_emails", emails)
+            return {row["email"]: UserOut(**dict(row)) for row in rows}
+
+    @staticmethod
+    async def get_token_versions(
+        user_ids: List[int], conn: Optional[asyncpg.Connection] = None
+    ) -> Dict[int, int]:
+        """
+        Retorna la versión de los tokens de varios usuarios en una sola
+        consulta, sin leer el resto de sus datos.
+
+        Args:
+            user_ids (List[int]): IDs a buscar.
+            conn (Optional[asyncpg.Connection]): Conexión de la petición; si es
+                None se toma una del pool.
+
+        Returns:
+            Dict[int, int]: Versión de los tokens por ID de usuario encontrado.
+        """
+        async with db_management.get_connection(conn) as conn:
+            rows = await statement_registry.fetch(
+                conn, "get_user_token_versions", user_ids
+            )
+            return {row["id"]: row["token_version"] for row in rows}
 
     @staticmethod
-    async def insert_user(user_insert: UserInsert) -> Optional[int]:
+    async def get_user_by_email(
+        email: str, conn: Optional[asyncpg.Connection] = None
+    ) -> Optional[UserOut]:
+        """
+        Retorna un usuario por su email.
+
+        La búsqueda se resuelve en lote con las de otras peticiones
+        concurrentes y, si ya hay una en curso para el mismo email, espera su
+        resultado.
+
+        Dentro de una transacción se consulta por separado, con la conexión
+        indicada.
+
+        Args:
+            email (str): Email del usuario.
+            conn (Optional[asyncpg.Connection]): Conexión de la petición; si es
+                None se toma una del pool.
+
+        Returns:
+            Optional[UserOut]: El usuario (no debe modificarse), o None si no
+            existe.
+        """
+        if conn is not None and conn.is_in_transaction():
+            return await users_by_email.load(email, conn)
+        return await user_flight.do(
+            (email, "by_email"), lambda: users_by_email.load(email, conn)
+        )
+
+    @staticmethod
+    async def insert_user(
+        user_insert: UserInsert, conn: Optional[asyncpg.Connection] = None
+    ) -> Optional[int]:
         """
         Inserta un nuevo usuario en la base de datos.
 
         Args:
             user_insert (UserInsert): Datos del usuario a insertar.
+            conn (Optional[asyncpg.Connection]): Conexión de la petición; si es
+                None se toma una del pool.
 
         Returns:
             Optional[int]: ID del nuevo usuario si se creó correctamente.
         """
-        query = "SELECT * FROM insert_user($1::TEXT, $2::TEXT, $3::TEXT, $4::TEXT);"
         params = list(user_insert.model_dump().values())
-        async with db_management.get_connection() as conn:
-            new_id = await conn.fetchval(query, *params)
+        async with db_management.get_connection(conn) as conn:
+            new_id = await statement_registry.fetchval(conn, "insert_user", *params)
             return new_id
 
     @staticmethod
-    async def update_user(user_update: UserUpdate) -> bool:
+    async def update_user(
+        user_update: UserUpdate, conn: Optional[asyncpg.Connection] = None
+    ) -> bool:
         """
         Actualiza un usuario existente.
 
         Args:
             user_update (UserUpdate): Datos del usuario a actualizar.
+            conn (Optional[asyncpg.Connection]): Conexión de la petición; si es
+                None se toma una del pool.
 
         Returns:
             bool: True si se actualizó correctamente, False si no.
         """
-        query = (
-            "SELECT update_user($1::TEXT, $2::TEXT, $3::TEXT, $4::INTEGER, $5::TEXT);"
-        )
         params = list(user_update.model_dump().values())
-        async with db_management.get_connection() as conn:
-            updated = await conn.fetchval(query, *params)
+        async with db_management.get_connection(conn) as conn:
+            updated = await statement_registry.fetchval(conn, "update_user", *params)
             return bool(updated)
 
+    @staticmethod
+    async def get_token_version(
+        user_id: int, conn: Optional[asyncpg.Connection] = None
+    ) -> Optional[int]:
+        """
+        Retorna la versión vigente de los tokens de un usuario.
+
+        La búsqueda se resuelve en lote con las de otras peticiones
+        concurrentes.
+
+        Args:
+            user_id (int): ID del usuario.
+            conn (Optional[asyncpg.Connection]): Conexión de la petición; si es
+                None se toma una del pool.
+
+        Returns:
+            Optional[int]: Versión del token, o None si el usuario no existe.
+        """
+        return await token_versions_by_id.load(user_id, conn)
+
+
+# Agrupación de consultas de usuarios concurrentes, por email filtrado
+user_flight = SingleFlight("users")
+
+# Búsquedas concurrentes resueltas en lote: usuarios por email y versiones de
+# sus tokens por ID
+users_by_email: BatchLoader[str, UserOut] = BatchLoader(
+    "users_by_email",
+    UserService.get_users_by_emails,
+    window=settings.user_batch_window_seconds,
+    max_batch_size=settings.user_batch_max_size,
+)
+token_versions_by_id: BatchLoader[int, int] = BatchLoader(
+    "token_versions_by_id",
+    UserService.get_token_versions,
+    window=settings.user_batch_window_seconds,
+    max_batch_size=settings.user_batch_max_size,
+)
 
 # Instancia del servicio para uso en otros módulos
 user_service = UserService()